@@ -0,0 +1,54 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Access token of the triage. The token manager is the one of hwval,
+hwval/utils/auth.py, so both tools keep, refresh, and save the token the same
+way and share the --token-cache file.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+import config
+from utils.auth import getAuthenticationToken
+from utils.debug import setDbgLevel as setAuthDbgLevel
+
+# config here is hwval's, not the kubernetes config of k8s.py
+__all__ = ["gatewayURL", "getAuthenticationToken", "setAPIGateway",
+        "setAuthDbgLevel", "setTokenCacheFile"]
+
+def setAPIGateway(url):
+    r""" setAPIGateway(url) - reach Keycloak and HSM through the API gateway
+    at url. Cached tokens are only reused for the gateway they came from. """
+    config.apiGateway = url.rstrip('/')
+
+def gatewayURL(path):
+    r""" gatewayURL(path) - returns the URL of path on the API gateway """
+    return config.apiGateway + path
+
+def setTokenCacheFile(filename):
+    r""" setTokenCacheFile(filename) - save the access token in filename,
+    None keeps it in memory only """
+    config.tokenCacheFile = filename
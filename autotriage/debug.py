@@ -41,7 +41,14 @@ def setDbgLevel(lvl):
     global dbgLevel
     dbgLevel = lvl
 
-def dbgPrint(lvl, msg):
+def dbgPrint(lvl, msg, *args):
+    r""" dbgPrint(lvl, msg, *args) - prints msg % args if the debug level is
+    at least lvl. msg may also be a callable returning the message. Nothing is
+    formatted when the message is not printed. """
     global dbgLevel
     if dbgLevel >= lvl:
+        if callable(msg):
+            msg = msg()
+        elif args:
+            msg = msg % args
         print(msg)
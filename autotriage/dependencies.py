@@ -64,40 +64,40 @@ Any new service that is added to the services list will need to be verified that
 the pods can be located in one of the methods below.
 """
 def getPodName(svc):
-    dbgPrint(dbgMed, "getPodName " + svc)
+    dbgPrint(dbgMed, "getPodName %s", svc)
     retArray = []
 
     if svc == "cray-vault":
         label = "app=vault"
     else:
         label = "app=" + svc
-    dbgPrint(dbgMed, "Service: " + svc + " Label: " + label)
+    dbgPrint(dbgMed, "Service: %s Label: %s", svc, label)
     pods = getK8sClient().list_pod_for_all_namespaces(label_selector=label, watch=False)
     if len(pods.items) > 0:
         for i in pods.items:
             retArray.append(i)
-            dbgPrint(dbgHigh, "\t%s\t%s" % (i.metadata.namespace,
-                                            i.metadata.name))
+            dbgPrint(dbgHigh, "\t%s\t%s", i.metadata.namespace,
+                    i.metadata.name)
 
     if len(retArray) == 0:
         label = "app.kubernetes.io/name=" + svc
-        dbgPrint(dbgMed, "Service: " + svc + " Label: " + label)
+        dbgPrint(dbgMed, "Service: %s Label: %s", svc, label)
         pods = getK8sClient().list_pod_for_all_namespaces(label_selector=label, watch=False)
         if len(pods.items) > 0:
             for i in pods.items:
                 retArray.append(i)
-                dbgPrint(dbgHigh, "\t%s\t%s" %
-                            (i.metadata.namespace, i.metadata.name))
+                dbgPrint(dbgHigh, "\t%s\t%s", i.metadata.namespace,
+                        i.metadata.name)
 
     if len(retArray) == 0:
         label = "job-name=" + svc
-        dbgPrint(dbgMed, "Service: " + svc + " Label: " + label)
+        dbgPrint(dbgMed, "Service: %s Label: %s", svc, label)
         pods = getK8sClient().list_pod_for_all_namespaces(label_selector=label, watch=False)
         if len(pods.items) > 0:
             for i in pods.items:
                 retArray.append(i)
-                dbgPrint(dbgHigh, "\t%s\t%s" %
-                            (i.metadata.namespace, i.metadata.name))
+                dbgPrint(dbgHigh, "\t%s\t%s", i.metadata.namespace,
+                        i.metadata.name)
 
     return retArray
 
@@ -111,7 +111,7 @@ the container statuses for the unhealthy pods is displayed along with the list
 of pods that are OK.
 """
 def validateService(svc):
-    dbgPrint(dbgMed, "validateService " + svc)
+    dbgPrint(dbgMed, "validateService %s", svc)
     podArray = getPodName(svc)
 
     if len(podArray) == 0:
@@ -30,6 +30,7 @@ from os import path
 
 from debug import *
 from k8s import *
+from auth import *
 
 """
 Triage modules
@@ -56,6 +57,13 @@ def main():
             help='Increase output verbosity.')
     parser.add_argument('-V', '--version', action="store_true",
             help='Print the script version information and exit.')
+    parser.add_argument('--token-cache', action="store_true",
+            help='Save the access token in ~/.cache/hms-tools/token.json, '
+               'readable by the owner only, so later runs reuse it until it '
+               'expires.')
+    parser.add_argument('--api-gateway', default=gatewayURL(""),
+            help='Base URL of the API gateway for HSM and Keycloak. '
+               'Default: %s' % gatewayURL(""))
     args = parser.parse_args()
 
     if args.version is True:
@@ -67,6 +75,11 @@ def main():
 
     if args.verbose is not None:
         setDbgLevel(args.verbose)
+        setAuthDbgLevel(args.verbose)
+
+    setAPIGateway(args.api_gateway)
+    if args.token_cache:
+        setTokenCacheFile(path.expanduser("~/.cache/hms-tools/token.json"))
 
     # if args.host is not None:
     #     un = input('Enter username to connect to ' + args.host + ': ')
@@ -81,7 +94,7 @@ def main():
 
     idx = 0
     while idx < len(triageModules):
-        dbgPrint(dbgMed, "Calling: %d %s" % (idx, triageModules[idx].__name__))
+        dbgPrint(dbgMed, "Calling: %d %s", idx, triageModules[idx].__name__)
         triageModules[idx]()
         idx = idx + 1
 
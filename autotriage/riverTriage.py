@@ -26,12 +26,12 @@ import json
 import requests
 
 from os import path
-from base64 import b64decode
 from re import search
 
 from debug import *
 from health import *
 from k8s import *
+from auth import *
 
 maasBridgeFile = "cray_reds_maas_bridge.json"
 maasBridgeDir = "/etc/ansible/hosts/host_files/ncn-w001/cray_reds"
@@ -79,7 +79,7 @@ def checkConfigMaps():
 
 
 def checkForFile(dir, file):
-    dbgPrint(dbgMed, "checkForFile " + dir + "/" + file)
+    dbgPrint(dbgMed, "checkForFile %s/%s", dir, file)
     fullPath = dir + "/" + file
     msg = ""
     if path.exists(fullPath) == False:
@@ -135,7 +135,7 @@ def checkForNodeDiscovery(nList, auth_token):
             }
 
     for n in nList:
-        URL = "https://api-gw-service-nmn.local/apis/smd/hsm/v2/State/Components/" + n
+        URL = gatewayURL("/apis/smd/hsm/v2/State/Components/" + n)
         r = requests.get(url = URL, headers = getHeaders)
         if r.status_code >= 500:
             printNotHealthy(n)
@@ -282,32 +282,6 @@ def checkConsoleLog(nodeList):
 
 
 
-def getAuthenticationToken():
-    dbgPrint(dbgMed, "getAuthenticationToken")
-
-    URL = "https://api-gw-service-nmn.local/keycloak/realms/shasta/protocol/openid-connect/token"
-
-    kSecret = getK8sClient().read_namespaced_secret("admin-client-auth", "default")
-    secret = b64decode(kSecret.data['client-secret']).decode("utf-8")
-    dbgPrint(dbgMed, "\tSecret: " + secret)
-
-    DATA = {
-            "grant_type": "client_credentials",
-            "client_id": "admin-client",
-            "client_secret": secret
-            }
-
-    try:
-        r = requests.post(url = URL, data = DATA)
-    except OSError:
-        return ""
-
-    result = json.loads(r.text)
-
-    dbgPrint(dbgMed, result['access_token'])
-    return result['access_token']
-
-
 def triageRiverDiscovery():
     dbgPrint(dbgMed, "triageRiverDiscovery")
 
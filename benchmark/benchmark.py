@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Run the hms-tools scripts against simulated Redfish BMCs and report how long
+they take and how much load they put on the BMCs.
+
+The BMCs are simulated in this process by mock_redfish.py. Each scenario runs
+its script as a subprocess and is measured separately:
+
+    hwval              hwval.py with the redfish tests on all BMCs at once
+    power-capping      validation/test_power_capping.py on all BMCs at once
+    power-control      validation/test_power_control.py on all BMCs at once,
+                       without pauses between the power changes
+    rf-subscriptions   utils/rf-subscriptions.py create, list, and delete on
+                       each BMC
+    streaming-telemetry
+                       validation/test_streaming_telemetry.py on all BMCs at
+                       once, only Olympus BMCs stream telemetry
+
+Functions:
+    main() -> int
+    print_report(list)
+    run_commands(list, int) -> int
+    run_scenario(string, list, object) -> object
+    scenario_commands(string, list, object) -> list
+"""
+
+# pylint: disable=invalid-name
+
+import argparse
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_redfish import add_mock_arguments, start_mock_bmcs, server_stats
+from mock_redfish import make_self_signed_cert
+from mock_redfish import logger, standard_out
+
+VERSION = "1.3.0"
+
+TOP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ["hwval", "power-capping", "power-control", "rf-subscriptions",
+             "streaming-telemetry"]
+
+# The event tests need a listener on the vlan004 interface
+HWVAL_TESTS = [
+    "checkRedfishURIs",
+    "checkRedfishChassis",
+    "checkRedfishManagers",
+    "checkRedfishEventService",
+    "checkRedfishSystems",
+    "checkRedfishUpdateService",
+    "telemetryPoll",
+]
+
+
+def scenario_commands(scenario, servers, args):
+    """
+    Build the commands of a scenario.
+
+    Parameters:
+        scenario (string): One of SCENARIOS.
+        servers (list): Running MockBMCServers.
+        args (object): Command line arguments.
+
+    Returns:
+        commands (list): Lists of commands. The lists run in parallel, the
+                         commands of a list one after the other.
+    """
+    bmcs = [f"{args.address}:{s.server_address[1]}" for s in servers]
+    # The scripts refuse to run without credentials, the mock BMCs only
+    # check them when started with --user
+    creds = ['-u', args.user or "root", '-p', args.passwd or "benchmark"]
+
+    ports = f"{servers[0].server_address[1]}-{servers[-1].server_address[1]}"
+    if scenario == "hwval":
+        tests = ','.join(f"redfish:{t}" for t in HWVAL_TESTS)
+        return [[[sys.executable, os.path.join(TOP, "hwval", "hwval.py"),
+                  '-i', f"{args.address}:[{ports}]", '-t', tests] + creds +
+                 shlex.split(args.hwval_args)]]
+
+    if scenario == "streaming-telemetry":
+        script = os.path.join(TOP, "validation", "test_streaming_telemetry.py")
+        return [[[sys.executable, script, '-b', f"{args.address}:[{ports}]",
+                  '-i', args.address, '-r', str(args.listen_port),
+                  '-l', args.logdir] + creds]]
+
+    if scenario == "power-capping":
+        script = os.path.join(TOP, "validation", "test_power_capping.py")
+        return [[[sys.executable, script, '-b', f"{args.address}:[{ports}]",
+                  '-l', args.logdir] + creds]]
+
+    if scenario == "power-control":
+        # The event server of the https BMCs needs a certificate too
+        certfile, keyfile = make_self_signed_cert(args.logdir)
+        script = os.path.join(TOP, "validation", "test_power_control.py")
+        return [[[sys.executable, script, '-b', f"{args.address}:[{ports}]",
+                  '-i', args.address, '-r', str(args.listen_port),
+                  '--cert', certfile, '--key', keyfile, '--stagger', "0",
+                  '--poll-interval', "0.5", '--off-dwell', "0",
+                  '--on-dwell', "0", '-l', args.logdir] + creds]]
+
+    script = os.path.join(TOP, "utils", "rf-subscriptions.py")
+    return [[[sys.executable, script, command, '-b', bmc, '-i', args.address,
+              '-r', str(args.listen_port)] + creds
+             for command in ("create", "list", "delete")]
+            for bmc in bmcs]
+
+
+def run_commands(commands, jobs):
+    """
+    Run lists of commands, up to jobs lists at a time.
+
+    Parameters:
+        commands (list): Lists of commands, see scenario_commands().
+        jobs (int): Lists to run at the same time.
+
+    Returns:
+        failures (int): Number of commands that exited with non-zero status.
+    """
+    def run_list(cmds):
+        failed = 0
+        for cmd in cmds:
+            logger.debug("Running: %s", shlex.join(cmd))
+            rsp = subprocess.run(cmd, stdout=subprocess.PIPE,
+                                 stderr=subprocess.STDOUT, check=False)
+            if rsp.returncode != 0:
+                failed += 1
+                logger.debug("%s exited with %d:\n%s", cmd[1],
+                             rsp.returncode, rsp.stdout.decode(errors='replace'))
+        return failed
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return sum(pool.map(run_list, commands))
+
+
+def run_scenario(scenario, servers, args):
+    """
+    Run a scenario and measure it.
+
+    Parameters:
+        scenario (string): One of SCENARIOS.
+        servers (list): Running MockBMCServers.
+        args (object): Command line arguments.
+
+    Returns:
+        result (object): Wall time, request rate, server side latency, and
+                         failed commands of the scenario.
+    """
+    commands = scenario_commands(scenario, servers, args)
+    server_stats(servers)
+
+    start = time.monotonic()
+    failures = run_commands(commands, args.jobs)
+    wall = time.monotonic() - start
+
+    stats = server_stats(servers)
+    return {
+        'scenario': scenario,
+        'bmcs': len(servers),
+        'wall': wall,
+        'requests': stats['requests'],
+        'rate': stats['requests'] / wall if wall else 0,
+        'errors': stats['errors'],
+        'p50': stats['p50'],
+        'p99': stats['p99'],
+        'peak_connections': stats['peak_connections'],
+        'refused': stats['refused'],
+        'events': stats['events_sent'],
+        'failures': failures,
+    }
+
+
+def print_report(results):
+    """
+    Print a table of scenario results.
+
+    Parameters:
+        results (list): Results from run_scenario().
+    """
+    logger.info("%-20s %6s %9s %9s %9s %7s %9s %9s %6s %8s", "Scenario",
+                "BMCs", "Wall(s)", "Requests", "Req/s", "Errors",
+                "p50(ms)", "p99(ms)", "Conns", "Failures")
+    for r in results:
+        logger.info("%-20s %6d %9.2f %9d %9.1f %7d %9.2f %9.2f %6d %8d",
+                    r['scenario'], r['bmcs'], r['wall'], r['requests'],
+                    r['rate'], r['errors'], r['p50'] * 1000, r['p99'] * 1000,
+                    r['peak_connections'], r['failures'])
+
+
+def main(argslist=None):
+    """Main program"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark hms-tools against mock Redfish BMCs.')
+    add_mock_arguments(parser)
+    parser.add_argument('-s', '--scenarios', default=','.join(SCENARIOS),
+                        help='Comma separated scenarios to run: '
+                        f'{",".join(SCENARIOS)}.')
+    parser.add_argument('-j', '--jobs', type=int, default=8,
+                        help='Scripts to run at the same time in the '
+                        'per-BMC scenarios.')
+    parser.add_argument('--hwval-args', default="",
+                        help='Extra hwval.py options, such as "-P 8".')
+    parser.add_argument('--listen-port', type=int, default=8080,
+                        help='Event listener port put in rf-subscriptions '
+                        'destinations and listened on by streaming-telemetry '
+                        'and power-control.')
+    parser.add_argument('-l', '--logdir',
+                        help='Log directory of the scripts, a temporary '
+                        'directory if not given.')
+    parser.add_argument('-o', '--output',
+                        help='Write the results as JSON to this file.')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Show script output of failures.')
+    parser.add_argument('-V', '--version', action="store_true",
+                        help='Print the script version information and exit.')
+    args = parser.parse_args(argslist)
+
+    if args.version is True:
+        logger.info("%s: %s", __file__, VERSION)
+        return 0
+
+    if args.verbose:
+        standard_out.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
+
+    scenarios = args.scenarios.split(',')
+    for scenario in scenarios:
+        if scenario not in SCENARIOS:
+            logger.error("FAIL: Unknown scenario %s.", scenario)
+            return 1
+
+    if not args.logdir:
+        args.logdir = tempfile.mkdtemp(prefix="hms-benchmark-")
+
+    try:
+        servers = start_mock_bmcs(args)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        logger.error("FAIL: Could not start the mock BMCs: %s", e)
+        return 1
+
+    results = []
+    try:
+        for scenario in scenarios:
+            logger.info("Running %s.", scenario)
+            results.append(run_scenario(scenario, servers, args))
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if any(r['failures'] for r in results):
+        logger.error("FAIL: Some scripts failed, run with -v for their output.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result)
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Measure how the hwval capmc validations scale with the number of nodes.
+
+A simulated API gateway with synthetic nodes is started in this process by
+mock_gateway.py. hwval.py -t capmc is then run against the first N nodes for
+every size given, once for every set of hwval options given, and the wall time
+and gateway load of each run are reported.
+
+Functions:
+    main() -> int
+    print_report(list)
+    run_hwval(list, object, string, object) -> object
+"""
+
+# pylint: disable=invalid-name
+
+import argparse
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_gateway import add_gateway_arguments, start_mock_gateway
+from mock_gateway import synthetic_xnames
+from mock_redfish import logger, standard_out
+
+TOP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(TOP, "hwval"))
+from utils.hostlist import compress # pylint: disable=wrong-import-position
+
+VERSION = "1.0.0"
+
+
+def run_hwval(xnames, server, hwval_args, args):
+    """
+    Run the hwval capmc validations of xnames and measure them.
+
+    Parameters:
+        xnames (list): Xnames to validate.
+        server (object): Running MockGatewayServer.
+        hwval_args (string): Extra hwval.py options.
+        args (object): Command line arguments.
+
+    Returns:
+        result (object): Wall time, gateway requests, latency, and exit
+                         status of the run.
+    """
+    cmd = [sys.executable, os.path.join(TOP, "hwval", "hwval.py"),
+           '-x', compress(xnames), '-t', args.tests,
+           '--api-gateway', server.url,
+           '--client-secret-file', args.secret_file,
+           '--hsm-cache-age', "0"] + shlex.split(hwval_args)
+
+    server.gateway.stats()
+    logger.debug("Running: %s", shlex.join(cmd))
+
+    start = time.monotonic()
+    rsp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                         check=False)
+    wall = time.monotonic() - start
+
+    output = rsp.stdout.decode(errors='replace')
+    if rsp.returncode != 0 or "PASSED" not in output:
+        logger.debug("hwval.py exited with %d:\n%s", rsp.returncode, output)
+
+    stats = server.gateway.stats()
+    return {
+        'nodes': len(xnames),
+        'hwval_args': hwval_args,
+        'wall': wall,
+        'per_node': wall / len(xnames),
+        'requests': stats['requests'],
+        'rate': stats['requests'] / wall if wall else 0,
+        'errors': stats['errors'],
+        'p50': stats['p50'],
+        'p99': stats['p99'],
+        'apis': stats['apis'],
+        'passed': rsp.returncode == 0 and "PASSED" in output,
+    }
+
+
+def print_report(results):
+    """
+    Print a table of run results.
+
+    Parameters:
+        results (list): Results from run_hwval().
+    """
+    logger.info("%-20s %7s %9s %12s %9s %9s %7s %9s %9s %7s", "hwval options",
+                "Nodes", "Wall(s)", "ms/node", "Requests", "Req/s", "Errors",
+                "p50(ms)", "p99(ms)", "Result")
+    for r in results:
+        logger.info("%-20s %7d %9.2f %12.3f %9d %9.1f %7d %9.2f %9.2f %7s",
+                    r['hwval_args'] or "(serial)", r['nodes'], r['wall'],
+                    r['per_node'] * 1000, r['requests'], r['rate'],
+                    r['errors'], r['p50'] * 1000, r['p99'] * 1000,
+                    "PASS" if r['passed'] else "FAIL")
+
+
+def main(argslist=None):
+    """Main program"""
+    parser = argparse.ArgumentParser(
+        description='Benchmark hwval capmc validations against a mock gateway.')
+    add_gateway_arguments(parser)
+    parser.add_argument('-S', '--sizes', default="10,100,1000,10000",
+                        help='Comma separated node counts to validate.')
+    parser.add_argument('-H', '--hwval-args', action='append',
+                        help='hwval.py options to compare, such as "-b" or '
+                        '"-P 16". Repeat to compare several, "" runs serially. '
+                        'Default: -b')
+    parser.add_argument('-t', '--tests', default="capmc",
+                        help='hwval.py tests to run. Default: capmc')
+    parser.add_argument('-o', '--output',
+                        help='Write the results as JSON to this file.')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Show hwval output of failed runs.')
+    parser.add_argument('-V', '--version', action="store_true",
+                        help='Print the script version information and exit.')
+    args = parser.parse_args(argslist)
+
+    if args.version is True:
+        logger.info("%s: %s", __file__, VERSION)
+        return 0
+
+    if args.verbose:
+        standard_out.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(',')]
+    except ValueError:
+        logger.error("FAIL: Invalid sizes %s.", args.sizes)
+        return 1
+
+    args.nodes = max(args.nodes, max(sizes))
+    if args.client_secret is None:
+        args.client_secret = "benchmark"
+
+    with tempfile.NamedTemporaryFile("w", prefix="hms-benchmark-",
+                                     delete=False) as f:
+        f.write(args.client_secret)
+        args.secret_file = f.name
+
+    try:
+        server = start_mock_gateway(args)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.error("FAIL: Could not start the mock gateway: %s", e)
+        os.unlink(args.secret_file)
+        return 1
+
+    xnames = synthetic_xnames(max(sizes))
+    results = []
+    try:
+        for hwval_args in args.hwval_args or ["-b"]:
+            for size in sizes:
+                logger.info("Running hwval %s on %d nodes.",
+                            hwval_args or "(serial)", size)
+                results.append(run_hwval(xnames[:size], server, hwval_args, args))
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.unlink(args.secret_file)
+
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not all(r['passed'] for r in results):
+        logger.error("FAIL: Some runs failed, run with -v for their output.")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result)
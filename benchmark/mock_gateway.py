@@ -0,0 +1,562 @@
+#!/usr/bin/python3
+
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Serve a simulated Shasta API gateway for offline testing and benchmarking of
+the hwval capmc validations.
+
+The gateway serves the Keycloak token endpoint, HSM State/Components, and the
+CAPMC v1 APIs hwval uses, for a set of synthetic nodes. Power caps that are set
+read back. Latency, latency per nid of a CAPMC request, error rate, and the
+client secret can be configured.
+
+Classes:
+    MockGateway
+    MockGatewayHandler
+    MockGatewayServer
+
+Functions:
+    main() -> int
+    start_mock_gateway(object) -> object
+    synthetic_xnames(int) -> list
+
+Misc Variables:
+    TOKEN_PATH, HSM_PATH, CAPMC_PATH - The paths the gateway serves
+"""
+
+# pylint: disable=invalid-name
+
+import argparse
+import json
+import logging
+import random
+import secrets
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from mock_redfish import logger, standard_out, percentile, make_self_signed_cert
+
+VERSION = "1.0.0"
+
+TOKEN_PATH = "/keycloak/realms/shasta/protocol/openid-connect/token"
+HSM_PATH = "/apis/smd/hsm/v2/State/Components"
+CAPMC_PATH = "/apis/capmc/capmc/v1/"
+
+# Power cap range of every synthetic node
+CAP_MIN = 350
+CAP_MAX = 925
+
+
+def synthetic_xnames(count):
+    """
+    Returns count node xnames, filling cabinets of 8 chassis with 8 slots of
+    2 nodes each, starting at x3000.
+
+    Parameters:
+        count (int): Number of xnames.
+
+    Returns:
+        xnames (list): Node xnames in nid order.
+    """
+    xnames = []
+    for i in range(count):
+        node = i % 2
+        slot = i // 2 % 8
+        chassis = i // 16 % 8
+        cabinet = 3000 + i // 128
+        xnames.append(f"x{cabinet}c{chassis}s{slot}b0n{node}")
+    return xnames
+
+
+class MockGateway:
+    """
+    State and statistics of the simulated gateway: the nodes, their power
+    caps, and the access tokens that were handed out.
+    """
+
+    def __init__(self, args):
+        self.lock = threading.Lock()
+        self.xnames = synthetic_xnames(args.nodes)
+        self.nids = {x: i + 1 for i, x in enumerate(self.xnames)}
+        self.caps = {nid: CAP_MAX for nid in self.nids.values()}
+        self.secret = args.client_secret
+        self.tokens = set()
+        self.token_lifetime = args.token_lifetime
+        self.latency = args.latency / 1000.0
+        self.jitter = args.jitter / 1000.0
+        self.nid_latency = args.nid_latency / 1000.0
+        self.error_rate = args.error_rate
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the request statistics."""
+        with self.lock:
+            self.latencies = {}
+            self.statuses = {}
+            self.nid_counts = {}
+
+    def record(self, api, status, latency, nid_count):
+        """Count a completed request."""
+        with self.lock:
+            self.latencies.setdefault(api, []).append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.nid_counts[api] = self.nid_counts.get(api, 0) + nid_count
+
+    def stats(self):
+        """
+        Returns the statistics of each API and resets them.
+
+        Returns:
+            stats (object): Total requests, errors, and per API the request
+                            count, nids requested, and p50/p99 latency in
+                            seconds.
+        """
+        with self.lock:
+            latencies = self.latencies
+            statuses = self.statuses
+            nid_counts = self.nid_counts
+        self.reset_stats()
+
+        apis = {}
+        for api, values in latencies.items():
+            values.sort()
+            apis[api] = {
+                'requests': len(values),
+                'nids': nid_counts.get(api, 0),
+                'p50': percentile(values, 50),
+                'p99': percentile(values, 99),
+            }
+
+        every = sorted(v for values in latencies.values() for v in values)
+        return {
+            'requests': len(every),
+            'errors': sum(c for s, c in statuses.items() if s >= 400),
+            'p50': percentile(every, 50),
+            'p99': percentile(every, 99),
+            'apis': apis,
+        }
+
+    def token(self, form):
+        """Handle a client_credentials token request."""
+        if form.get('grant_type') != "client_credentials":
+            return 400, {'error': "unsupported_grant_type"}
+        if self.secret is not None and form.get('client_secret') != self.secret:
+            return 401, {'error': "unauthorized_client"}
+
+        token = secrets.token_urlsafe(32)
+        with self.lock:
+            self.tokens.add(token)
+        return 200, {
+            'access_token': token,
+            'expires_in': self.token_lifetime,
+            'token_type': "bearer",
+        }
+
+    def authorized(self, header):
+        """True if header carries a token this gateway handed out."""
+        if not header or not header.startswith("Bearer "):
+            return False
+        with self.lock:
+            return header[len("Bearer "):] in self.tokens
+
+    def components(self, query):
+        """Handle an HSM State/Components GET."""
+        types = query.get('type')
+        if types and "Node" not in types:
+            return 200, {'Components': []}
+        return 200, {'Components': [{
+            'ID': xname,
+            'Type': "Node",
+            'State': "Ready",
+            'Flag': "OK",
+            'Enabled': True,
+            'Role': "Compute",
+            'NID': nid,
+            'NetType': "Sling",
+            'Arch': "X86",
+            'Class': "Mountain",
+        } for xname, nid in self.nids.items()]}
+
+    def capmc(self, api, body):
+        """
+        Handle a CAPMC API request.
+
+        Parameters:
+            api (string): CAPMC API name.
+            body (object): Decoded request body.
+
+        Returns:
+            status (int): HTTP status.
+            payload (object): Response body.
+        """
+        handler = getattr(self, "capmc_" + api, None)
+        if handler is None:
+            return 404, {'e': 404, 'err_msg': "Unknown API " + api}
+        if not isinstance(body, dict):
+            return 400, {'e': 400, 'err_msg': "Bad request body"}
+        return handler(body)
+
+    def known_nids(self, body):
+        """Returns the known and unknown nids of a request."""
+        known = []
+        unknown = []
+        valid = set(self.nids.values())
+        for nid in body.get('nids') or []:
+            if isinstance(nid, dict):
+                nid = nid.get('nid')
+            (known if nid in valid else unknown).append(nid)
+        return known, unknown
+
+    @staticmethod
+    def unknown_entries(unknown):
+        """Returns the per nid errors of unknown nids."""
+        return [{'nid': nid, 'e': 22, 'err_msg': "Invalid NID"} for nid in unknown]
+
+    def capmc_get_power_cap_capabilities(self, body):
+        """get_power_cap_capabilities: one group for all nodes."""
+        known, unknown = self.known_nids(body)
+        groups = []
+        if known:
+            groups.append({
+                'name': "3_AuthenticAMD_64c_256GiB_3200MHz_NodeAccel.NVIDIA",
+                'desc': "Mock compute node",
+                'host_limit_max': CAP_MAX,
+                'host_limit_min': CAP_MIN,
+                'static': 0,
+                'supply': CAP_MAX,
+                'powerup': 0,
+                'nids': known,
+                'controls': [{
+                    'name': "Node Power Limit",
+                    'desc': "Node Power Limit",
+                    'max': CAP_MAX,
+                    'min': CAP_MIN,
+                }],
+            })
+        return 200, {
+            'e': 22 if unknown else 0,
+            'err_msg': "Invalid NIDs: %s" % unknown if unknown else "",
+            'groups': groups,
+            'nids': self.unknown_entries(unknown),
+        }
+
+    def capmc_get_power_cap(self, body):
+        """get_power_cap: the current node cap of each nid."""
+        known, unknown = self.known_nids(body)
+        with self.lock:
+            entries = [{
+                'nid': nid,
+                'e': 0,
+                'err_msg': "",
+                'controls': [{'name': "node", 'val': self.caps[nid]}],
+            } for nid in known]
+        return 200, {
+            'e': 0,
+            'err_msg': "",
+            'nids': entries + self.unknown_entries(unknown),
+        }
+
+    def capmc_set_power_cap(self, body):
+        """set_power_cap: set the node cap of each nid, 0 removes the cap."""
+        valid = set(self.nids.values())
+        entries = []
+        with self.lock:
+            for entry in body.get('nids') or []:
+                nid = entry.get('nid')
+                if nid not in valid:
+                    entries.extend(self.unknown_entries([nid]))
+                    continue
+                for control in entry.get('controls') or []:
+                    if control.get('name') != "node":
+                        continue
+                    val = control.get('val')
+                    if val == 0:
+                        self.caps[nid] = CAP_MAX
+                    elif not isinstance(val, int) or not CAP_MIN <= val <= CAP_MAX:
+                        entries.append({'nid': nid, 'e': 22,
+                                        'err_msg': "Value out of range"})
+                        break
+                    else:
+                        self.caps[nid] = val
+        return 200, {'e': 0, 'err_msg': "", 'nids': entries}
+
+    @staticmethod
+    def energy(nid):
+        """Returns the simulated energy in Joules of a nid over an hour."""
+        return 1200000 + nid % 1000 * 100
+
+    def capmc_get_node_energy(self, body):
+        """get_node_energy: energy of each nid in the time window."""
+        known, unknown = self.known_nids(body)
+        now = datetime.today().strftime('%Y-%m-%d %H:%M:%S')
+        return 200, {
+            'e': 0,
+            'err_msg': "",
+            'nid_count': len(known),
+            'time': 3600.0,
+            'nodes': [{'nid': nid, 'energy': self.energy(nid), 'time': now}
+                      for nid in known] + self.unknown_entries(unknown),
+        }
+
+    def capmc_get_node_energy_stats(self, body):
+        """get_node_energy_stats: energy totals over all nids."""
+        known, unknown = self.known_nids(body)
+        if not known:
+            return 200, {'e': 22, 'err_msg': "No data in time window",
+                         'energy_total': 0}
+        energy = [(self.energy(nid), nid) for nid in known]
+        total = sum(e for e, _ in energy)
+        return 200, {
+            'e': 22 if unknown else 0,
+            'err_msg': "Invalid NIDs: %s" % unknown if unknown else "",
+            'energy_total': total,
+            'energy_avg': total / len(energy),
+            'energy_std': 0.0,
+            'energy_max': [max(energy)[1], max(energy)[0]],
+            'energy_min': [min(energy)[1], min(energy)[0]],
+            'nid_count': len(known),
+            'time': 3600.0,
+        }
+
+    def capmc_get_node_energy_counter(self, body):
+        """get_node_energy_counter: energy counter of each nid."""
+        known, unknown = self.known_nids(body)
+        now = datetime.today().strftime('%Y-%m-%d %H:%M:%S')
+        return 200, {
+            'e': 0,
+            'err_msg': "",
+            'nid_count': len(known),
+            'nodes': [{'nid': nid, 'energy_ctr': 50 * self.energy(nid),
+                       'time': now} for nid in known] +
+                     self.unknown_entries(unknown),
+        }
+
+    def capmc_get_xname_status(self, body):
+        """get_xname_status: every known node is on."""
+        xnames = body.get('xnames') or []
+        on = [x for x in xnames if x in self.nids]
+        undefined = [x for x in xnames if x not in self.nids]
+        rsp = {'e': -1 if undefined else 0, 'err_msg': "", 'on': on}
+        if undefined:
+            rsp['undefined'] = undefined
+            rsp['err_msg'] = "Errors encountered with %d components" % len(undefined)
+        return 200, rsp
+
+
+class MockGatewayHandler(BaseHTTPRequestHandler):
+    """Serves the token, HSM, and CAPMC requests of the server's MockGateway."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without this the body waits
+    # for the client's delayed ACK of the headers
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        logger.debug("gateway: " + format, *args)
+
+    def send_json(self, status, payload):
+        """Send a response with a JSON body."""
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def serve(self, method):
+        """Handle a request with the configured latency and error rate."""
+        gateway = self.server.gateway
+        start = time.monotonic()
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b""
+
+        api = url.path
+        nid_count = 0
+        if method == "POST" and url.path == TOKEN_PATH:
+            api = "token"
+            form = {k: v[0] for k, v in parse_qs(raw.decode(errors='replace')).items()}
+            status, payload = gateway.token(form)
+        elif not gateway.authorized(self.headers.get('Authorization')):
+            status, payload = 401, {'detail': "Unauthorized"}
+        elif method == "GET" and url.path == HSM_PATH:
+            api = "State/Components"
+            status, payload = gateway.components(parse_qs(url.query))
+        elif method == "POST" and url.path.startswith(CAPMC_PATH):
+            api = url.path[len(CAPMC_PATH):]
+            try:
+                body = json.loads(raw or b"null")
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                nid_count = len(body.get('nids') or body.get('xnames') or [])
+            status, payload = gateway.capmc(api, body)
+        else:
+            status, payload = 404, {'detail': "Not found"}
+
+        delay = gateway.latency + gateway.nid_latency * nid_count
+        if gateway.jitter:
+            delay = max(0.0, delay + random.gauss(0, gateway.jitter))
+        if delay:
+            time.sleep(delay)
+
+        if gateway.error_rate and random.random() < gateway.error_rate:
+            status, payload = 503, {'detail': "Service Unavailable"}
+
+        self.send_json(status, payload)
+        gateway.record(api, status, time.monotonic() - start, nid_count)
+
+    def do_GET(self):
+        """Handler for GETs."""
+        self.serve("GET")
+
+    def do_POST(self):
+        """Handler for POSTs."""
+        self.serve("POST")
+
+
+class MockGatewayServer(ThreadingHTTPServer):
+    """HTTP(S) server of the simulated gateway."""
+
+    daemon_threads = True
+
+    def __init__(self, address, gateway, context=None):
+        super().__init__(address, MockGatewayHandler)
+        self.gateway = gateway
+        if context is not None:
+            self.socket = context.wrap_socket(self.socket, server_side=True,
+                                              do_handshake_on_connect=False)
+
+
+def start_mock_gateway(args):
+    """
+    Start the simulated gateway.
+
+    Parameters:
+        args (object): Command line arguments, see add_gateway_arguments().
+
+    Returns:
+        server (object): The running MockGatewayServer. Its url attribute is
+                         the base URL to give hwval.py --api-gateway.
+    """
+    context = None
+    scheme = "http"
+    if args.tls:
+        certfile, keyfile = args.cert, args.key
+        if not certfile:
+            certfile, keyfile = make_self_signed_cert(tempfile.mkdtemp())
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        scheme = "https"
+
+    server = MockGatewayServer((args.address, args.port), MockGateway(args),
+                               context)
+    server.url = f"{scheme}://{args.address}:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    logger.info("Started mock API gateway with %d nodes at %s.",
+                args.nodes, server.url)
+    return server
+
+
+def add_gateway_arguments(parser):
+    """Add the options of the simulated gateway to parser."""
+    parser.add_argument('-N', '--nodes', type=int, default=10000,
+                        help='Number of synthetic nodes.')
+    parser.add_argument('-a', '--address', default="127.0.0.1",
+                        help='Address to listen on.')
+    parser.add_argument('-r', '--port', type=int, default=0,
+                        help='Port to listen on, any free port if not given.')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Milliseconds added to every request.')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Standard deviation of the latency in milliseconds.')
+    parser.add_argument('--nid-latency', type=float, default=0,
+                        help='Milliseconds added per nid or xname of a CAPMC '
+                        'request.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Fraction of requests answered with 503.')
+    parser.add_argument('--client-secret',
+                        help='Client secret to require for tokens.')
+    parser.add_argument('--token-lifetime', type=int, default=300,
+                        help='Seconds until access tokens expire.')
+    parser.add_argument('--tls', action='store_true',
+                        help='Serve https instead of http.')
+    parser.add_argument('--cert', help='TLS certificate file. A self-signed '
+                        'certificate is created if not given.')
+    parser.add_argument('--key', help='TLS private key file.')
+
+
+def main(argslist=None):
+    """Main program"""
+    parser = argparse.ArgumentParser(description='Mock Shasta API gateway.')
+    add_gateway_arguments(parser)
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Log every request.')
+    parser.add_argument('-V', '--version', action="store_true",
+                        help='Print the script version information and exit.')
+    args = parser.parse_args(argslist)
+
+    if args.version is True:
+        logger.info("%s: %s", __file__, VERSION)
+        return 0
+
+    if args.verbose:
+        standard_out.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        server = start_mock_gateway(args)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.error("FAIL: Could not start the mock gateway: %s", e)
+        return 1
+
+    try:
+        while True:
+            time.sleep(10)
+            stats = server.gateway.stats()
+            if stats['requests']:
+                logger.info("%d requests, %d errors, p50 %.1f ms, p99 %.1f ms",
+                            stats['requests'], stats['errors'],
+                            stats['p50'] * 1000, stats['p99'] * 1000)
+    except KeyboardInterrupt:
+        pass
+
+    server.shutdown()
+    server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result)
@@ -0,0 +1,1113 @@
+#!/usr/bin/python3
+
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Serve simulated Redfish BMCs for offline testing and benchmarking.
+
+Each simulated BMC listens on its own port of the same address and serves a
+Redfish tree modeled on one BMC type. The trees contain what hwval.py,
+test_power_capping.py, and rf-subscriptions.py use. GETs, subscription
+POST/DELETE, PATCHes (including the Olympus Controls.Deep PATCH), and the power
+capping, power control, and test event actions are supported. Latency, error rate, connection
+limit, TLS, and basic authentication can be configured. The latency can grow
+over time, and the Power and Thermal readings can vary on every GET, to soak
+test telemetry polling.
+
+HPE, Gigabyte, and OpenBMC service roots advertise ProtocolFeaturesSupported
+and expand collection members for $expand; Gigabyte and OpenBMC also honor
+$select. Olympus and Intel BMCs ignore query parameters like older firmware.
+
+Subscribers receive events like from a real BMC: SubmitTestEvent sends the test
+event to every subscription, and Olympus BMCs stream CrayTelemetry events to
+the subscriptions that asked for them. ComputerSystem.Reset moves the system
+through PoweringOn or PoweringOff to On or Off after --power-delay seconds and
+then sends a StatusChange event for it. Each BMC sends its events from one
+thread over a kept-alive connection per destination.
+
+Classes:
+    EventSender
+    MockBMC
+    MockBMCServer
+    MockRedfishHandler
+
+Functions:
+    build_tree(string, int, int, int) -> object
+    deep_merge(object, object)
+    vary_readings(object, float) -> object
+    main() -> int
+    make_self_signed_cert(string) -> string, string
+    percentile(list, float) -> float
+    start_mock_bmcs(object) -> list
+
+Misc Variables:
+    BMC_TYPES - The simulated BMC types and their chassis ids
+    PROTOCOL_FEATURES - The query parameters each BMC type supports
+    RESET_STATES - The PowerState each ResetType ends in
+    SENSOR_READINGS - The reading fields of the Power and Thermal sensors
+"""
+
+# pylint: disable=invalid-name
+
+import argparse
+import base64
+import http.client
+import json
+import logging
+import os
+import queue
+import random
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+VERSION = "1.4.0"
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+standard_out = logging.StreamHandler(sys.stdout)
+standard_out.setLevel(logging.INFO)
+logger.addHandler(standard_out)
+
+# BMC type -> (chassis id, system id, manufacturer)
+BMC_TYPES = {
+    "olympus": ("Enclosure", "Node0", "HPE"),
+    "hpe": ("1", "1", "HPE"),
+    "gigabyte": ("Self", "Self", "Gigabyte"),
+    "intel": ("RackMount", "RackMount", "Intel Corporation"),
+    "openbmc": ("BMC_0", "BMC_0", "Foxconn"),
+}
+
+# BMC type -> the ProtocolFeaturesSupported of its service root. The other
+# types do not advertise query parameters and ignore them.
+# The lists of sensors in Power and Thermal, and the field of each reading
+SENSOR_READINGS = {
+    'Voltages': 'ReadingVolts',
+    'PowerSupplies': 'LineInputVoltage',
+    'Fans': 'Reading',
+    'Temperatures': 'ReadingCelsius',
+}
+
+PROTOCOL_FEATURES = {
+    "hpe": {
+        'ExpandQuery': {'ExpandAll': False, 'Levels': True, 'Links': False,
+                        'NoLinks': True, 'MaxLevels': 1},
+        'SelectQuery': False,
+    },
+    "gigabyte": {
+        'ExpandQuery': {'ExpandAll': True, 'Levels': True, 'Links': True,
+                        'NoLinks': True, 'MaxLevels': 2},
+        'SelectQuery': True,
+    },
+    "openbmc": {
+        'ExpandQuery': {'ExpandAll': True, 'Levels': True, 'Links': True,
+                        'NoLinks': True, 'MaxLevels': 6},
+        'SelectQuery': True,
+    },
+}
+
+# ResetType -> the PowerState the system ends up in
+RESET_STATES = {
+    "On": "On",
+    "ForceOn": "On",
+    "ForceRestart": "On",
+    "GracefulRestart": "On",
+    "PowerCycle": "On",
+    "Off": "Off",
+    "ForceOff": "Off",
+    "GracefulShutdown": "Off",
+}
+
+
+def odata_id(path):
+    """Returns a Redfish link to path."""
+    return {'@odata.id': path}
+
+
+def collection(path, members):
+    """Returns a Redfish collection resource of the member paths."""
+    return {
+        '@odata.id': path,
+        'Name': path.rsplit('/', 1)[-1] + " Collection",
+        'Members': [odata_id(m) for m in members],
+        'Members@odata.count': len(members),
+    }
+
+
+def power_resource(path, bmc_type, index):
+    """Returns the Power resource of a chassis."""
+    power = {
+        '@odata.id': path,
+        'Name': "Power",
+        'PowerControl': [{
+            'Name': "Chassis Power Control",
+            'PhysicalContext': "Intake",
+            'PowerCapacityWatts': 900,
+            'PowerLimit': {'LimitInWatts': 900},
+            'PowerMetrics': {
+                'AverageConsumedWatts': 350 + index % 50,
+                'MinConsumedWatts': 300,
+                'MaxConsumedWatts': 700,
+            },
+        }],
+        'Voltages': [{
+            'Name': "P12V",
+            'PhysicalContext': "PowerSupply",
+            'ReadingVolts': 12.1,
+        }],
+        'PowerSupplies': [{
+            'Name': "PSU%d" % i,
+            'LineInputVoltage': 208,
+        } for i in range(2)],
+    }
+    if bmc_type == "gigabyte":
+        power['PowerControl'][0]['Oem'] = {
+            'Vendor': {'PowerLimit': {'Min': 300, 'Max': 900}},
+        }
+        power['Actions'] = {
+            '#Power.LimitTrigger': {
+                'target': path + "/Actions/LimitTrigger",
+            },
+        }
+    if bmc_type == "hpe":
+        power['Oem'] = {'Hpe': {}}
+    return power
+
+
+def thermal_resource(path, index):
+    """Returns the Thermal resource of a chassis."""
+    return {
+        '@odata.id': path,
+        'Name': "Thermal",
+        'Fans': [{
+            'Name': "Fan%d" % i,
+            'PhysicalContext': "Fan",
+            'Reading': 5000 + 10 * i + index % 10,
+            'ReadingUnits': "RPM",
+        } for i in range(4)],
+        'Temperatures': [{
+            'Name': "Temp%d" % i,
+            'PhysicalContext': "Intake",
+            'ReadingCelsius': 25 + i,
+            'Status': {'State': "Enabled"},
+        } for i in range(4)],
+    }
+
+
+def build_tree(bmc_type, dimms=16, cpus=2, firmware=20, index=0):
+    """
+    Build the Redfish tree of a simulated BMC.
+
+    Parameters:
+        bmc_type (string): One of BMC_TYPES.
+        dimms (int): Number of Memory members.
+        cpus (int): Number of Processors members.
+        firmware (int): Number of FirmwareInventory members.
+        index (int): Number of the BMC, used to vary serial numbers.
+
+    Returns:
+        tree (object): Resources keyed by their path.
+    """
+    chassis_id, system_id, manufacturer = BMC_TYPES[bmc_type]
+    tree = {}
+
+    root = "/redfish/v1"
+    tree[root] = {
+        '@odata.id': root + "/",
+        '@odata.type': "#ServiceRoot.v1_5_0.ServiceRoot",
+        'Name': "Root Service",
+        'RedfishVersion': "1.7.0",
+        'Chassis': odata_id(root + "/Chassis"),
+        'EventService': odata_id(root + "/EventService"),
+        'Managers': odata_id(root + "/Managers"),
+        'Registries': odata_id(root + "/Registries"),
+        'Systems': odata_id(root + "/Systems"),
+        'UpdateService': odata_id(root + "/UpdateService"),
+    }
+    if bmc_type in PROTOCOL_FEATURES:
+        tree[root]['ProtocolFeaturesSupported'] = PROTOCOL_FEATURES[bmc_type]
+
+    chassis = [chassis_id]
+    if bmc_type == "olympus":
+        chassis.append(system_id)
+    tree[root + "/Chassis"] = collection(root + "/Chassis",
+                                         [root + "/Chassis/" + c for c in chassis])
+
+    for c in chassis:
+        path = root + "/Chassis/" + c
+        resource = {
+            '@odata.id': path,
+            'Id': c,
+            'Name': c,
+            'ChassisType': "RackMount",
+            'Manufacturer': manufacturer,
+            'Model': "Mock %s" % bmc_type,
+            'PartNumber': "PN-%s-%04d" % (bmc_type, index),
+            'SerialNumber': "SN%08d" % index,
+            'Power': odata_id(path + "/Power"),
+            'Thermal': odata_id(path + "/Thermal"),
+        }
+        if bmc_type == "olympus":
+            if c == chassis_id:
+                resource['ChassisType'] = "Enclosure"
+            else:
+                resource['ChassisType'] = "Blade"
+                resource['Controls'] = odata_id(path + "/Controls")
+                tree[path + "/Controls"] = collection(
+                    path + "/Controls", [path + "/Controls/NodePowerLimit"])
+                tree[path + "/Controls/NodePowerLimit"] = {
+                    '@odata.id': path + "/Controls/NodePowerLimit",
+                    'Id': "NodePowerLimit",
+                    'ControlMode': "Disabled",
+                    'SetPoint': 0,
+                    'SettingRangeMin': 350,
+                    'SettingRangeMax': 925,
+                }
+        tree[path] = resource
+        tree[path + "/Power"] = power_resource(path + "/Power", bmc_type, index)
+        tree[path + "/Thermal"] = thermal_resource(path + "/Thermal", index)
+
+    tree[root + "/Managers"] = collection(root + "/Managers",
+                                          [root + "/Managers/BMC"])
+    tree[root + "/Managers/BMC"] = {
+        '@odata.id': root + "/Managers/BMC",
+        'Id': "BMC",
+        'Name': "Manager",
+        'ManagerType': "BMC",
+        'Actions': {
+            '#Manager.Reset': {'target': root + "/Managers/BMC/Actions/Manager.Reset"},
+        },
+        'NetworkProtocol': odata_id(root + "/Managers/BMC/NetworkProtocol"),
+    }
+
+    system = root + "/Systems/" + system_id
+    tree[root + "/Systems"] = collection(root + "/Systems", [system])
+    tree[system] = {
+        '@odata.id': system,
+        'Id': system_id,
+        'Name': "System",
+        'Actions': {
+            '#ComputerSystem.Reset': {
+                'target': system + "/Actions/ComputerSystem.Reset",
+                'ResetType@Redfish.AllowableValues': ["On", "ForceOff",
+                                                      "GracefulShutdown"],
+            },
+        },
+        'Bios': odata_id(system + "/BIOS"),
+        'BiosVersion': "1.0.%d" % (index % 10),
+        'EthernetInterfaces': odata_id(system + "/EthernetInterfaces"),
+        'Manufacturer': manufacturer,
+        'Memory': odata_id(system + "/Memory"),
+        'MemorySummary': {'TotalSystemMemoryGiB': 16 * dimms},
+        'Model': "Mock %s" % bmc_type,
+        'PartNumber': "PN-SYS-%04d" % index,
+        'PowerState': "On",
+        'Processors': odata_id(system + "/Processors"),
+        'SerialNumber': "SYS%08d" % index,
+        'SKU': "SKU-%s" % bmc_type,
+        'Status': {'State': "Enabled", 'Health': "OK"},
+    }
+    tree[system + "/BIOS"] = {'@odata.id': system + "/BIOS", 'Attributes': {}}
+    tree[system + "/BIOS/settings"] = {
+        '@odata.id': system + "/BIOS/settings",
+        'Attributes': {'DynamicPowerCapping': "Disabled"},
+    }
+
+    tree[system + "/Memory"] = collection(
+        system + "/Memory", ["%s/Memory/DIMM%d" % (system, i) for i in range(dimms)])
+    for i in range(dimms):
+        path = "%s/Memory/DIMM%d" % (system, i)
+        tree[path] = {
+            '@odata.id': path,
+            'Id': "DIMM%d" % i,
+            'CapacityMiB': 16384,
+            'MemoryDeviceType': "DDR4",
+            'Manufacturer': "Mock",
+            'PartNumber': "DIMM-PN",
+            'SerialNumber': "DIMM%04d%04d" % (index, i),
+            'OperatingSpeedMhz': 3200,
+            'Status': {'State': "Enabled"},
+        }
+
+    tree[system + "/Processors"] = collection(
+        system + "/Processors", ["%s/Processors/CPU%d" % (system, i) for i in range(cpus)])
+    for i in range(cpus):
+        path = "%s/Processors/CPU%d" % (system, i)
+        tree[path] = {
+            '@odata.id': path,
+            'Id': "CPU%d" % i,
+            'Manufacturer': "Mock",
+            'Model': "Mock CPU",
+            'SerialNumber': "CPU%04d%04d" % (index, i),
+            'TotalCores': 64,
+            'TotalThreads': 128,
+            'MaxSpeedMHz': 3500,
+        }
+
+    tree[root + "/EventService"] = {
+        '@odata.id': root + "/EventService",
+        '@odata.type': "#EventService.v1_5_0.EventService",
+        'Name': "Event Service",
+        'RegistryPrefixes': ["Base", "ResourceEvent"] +
+                            (["CrayTelemetry"] if bmc_type == "olympus" else []),
+        'ResourceTypes': ["Chassis", "ComputerSystem"],
+        'Subscriptions': odata_id(root + "/EventService/Subscriptions"),
+        'Actions': {
+            '#EventService.SubmitTestEvent': {
+                'target': root + "/EventService/Actions/EventService.SubmitTestEvent",
+            },
+        },
+    }
+    tree[root + "/EventService/Subscriptions"] = collection(
+        root + "/EventService/Subscriptions", [])
+
+    fw = root + "/UpdateService/FirmwareInventory"
+    tree[root + "/UpdateService"] = {
+        '@odata.id': root + "/UpdateService",
+        'Name': "Update Service",
+        'Actions': {
+            '#UpdateService.SimpleUpdate': {
+                '@Redfish.ActionInfo': root + "/UpdateService/SimpleUpdateActionInfo",
+                'target': root + "/UpdateService/Actions/SimpleUpdate",
+            },
+        },
+        'FirmwareInventory': odata_id(fw),
+    }
+    tree[fw] = collection(fw, ["%s/FW%d" % (fw, i) for i in range(firmware)])
+    for i in range(firmware):
+        tree["%s/FW%d" % (fw, i)] = {
+            '@odata.id': "%s/FW%d" % (fw, i),
+            'Id': "FW%d" % i,
+            'Name': "Firmware %d" % i,
+            'Version': "1.%d.%d" % (i, index % 100),
+        }
+
+    registries = []
+    if bmc_type == "hpe":
+        registries.append(root + "/Registries/iLO")
+    if bmc_type == "openbmc":
+        registries.append(root + "/Registries/OpenBMC")
+    tree[root + "/Registries"] = collection(root + "/Registries", registries)
+    for registry in registries:
+        tree[registry] = {'@odata.id': registry, 'Id': registry.rsplit('/', 1)[-1]}
+
+    # PATCH clients send the etag back in If-Match
+    for resource in tree.values():
+        resource['@odata.etag'] = 'W/"%08x"' % index
+
+    return tree
+
+
+def vary_readings(resource, noise):
+    """
+    Returns a copy of a Power or Thermal resource with every reading, and the
+    AverageConsumedWatts, off by up to the fraction noise, like sensors that
+    are refreshed between GETs.
+    """
+    def vary(value):
+        return round(value * (1 + random.uniform(-noise, noise)), 2)
+
+    resource = dict(resource)
+    for name, field in SENSOR_READINGS.items():
+        if name in resource:
+            resource[name] = [dict(sensor, **{field: vary(sensor[field])})
+                              if isinstance(sensor.get(field), (int, float))
+                              else sensor for sensor in resource[name]]
+    if 'PowerControl' in resource:
+        controls = []
+        for control in resource['PowerControl']:
+            metrics = control.get('PowerMetrics', {})
+            if 'AverageConsumedWatts' in metrics:
+                control = dict(control, PowerMetrics=dict(
+                    metrics, AverageConsumedWatts=vary(metrics['AverageConsumedWatts'])))
+            controls.append(control)
+        resource['PowerControl'] = controls
+    return resource
+
+
+def deep_merge(target, patch):
+    """
+    Apply a Redfish PATCH body to a resource. Objects are merged, lists of
+    objects are merged element by element, and anything else is replaced.
+
+    Parameters:
+        target (object): Resource to update.
+        patch (object): PATCH body.
+    """
+    for key, value in patch.items():
+        current = target.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            deep_merge(current, value)
+        elif (isinstance(value, list) and isinstance(current, list) and
+              all(isinstance(v, dict) for v in value)):
+            for i, v in enumerate(value):
+                if i < len(current) and isinstance(current[i], dict):
+                    deep_merge(current[i], v)
+                else:
+                    current.append(v)
+        else:
+            target[key] = value
+
+
+def percentile(values, pct):
+    """
+    Returns the pct percentile of values, which must be sorted.
+
+    Parameters:
+        values (list): Sorted values.
+        pct (float): Percentile between 0 and 100.
+
+    Returns:
+        value (float): The percentile, 0 if there are no values.
+    """
+    if not values:
+        return 0
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+class MockBMC:
+    """
+    State and statistics of one simulated BMC. The tree is changed by POST,
+    PATCH, and DELETE requests, so every BMC has its own copy.
+    """
+
+    def __init__(self, bmc_type, index, args):
+        self.bmc_type = bmc_type
+        self.tree = build_tree(bmc_type, args.dimms, args.cpus, args.firmware,
+                               index)
+        self.lock = threading.Lock()
+        self.latency = args.latency / 1000.0
+        self.jitter = args.jitter / 1000.0
+        self.latency_drift = args.latency_drift / 1000.0
+        self.sensor_noise = args.sensor_noise
+        self.started = time.monotonic()
+        self.error_rate = args.error_rate
+        self.power_delay = args.power_delay
+        self.max_connections = args.max_connections
+        self.auth = None
+        if args.user:
+            creds = f"{args.user}:{args.passwd or ''}".encode()
+            self.auth = "Basic " + base64.b64encode(creds).decode()
+        self.next_subscription = 1
+        self.events = queue.Queue()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Clear the request statistics."""
+        with self.lock:
+            self.latencies = []
+            self.statuses = {}
+            self.connections = 0
+            self.peak_connections = 0
+            self.refused = 0
+            self.events_sent = 0
+            self.events_failed = 0
+
+    def current_latency(self):
+        """Returns the latency in seconds, grown by the drift since the start."""
+        return self.latency + self.latency_drift * (time.monotonic() - self.started) / 60
+
+    def record(self, status, latency):
+        """Count a completed request."""
+        with self.lock:
+            self.latencies.append(latency)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def connect(self):
+        """Count a new connection, returns False if the limit is reached."""
+        with self.lock:
+            if self.max_connections and self.connections >= self.max_connections:
+                self.refused += 1
+                return False
+            self.connections += 1
+            self.peak_connections = max(self.peak_connections, self.connections)
+            return True
+
+    def disconnect(self):
+        """Count a closed connection."""
+        with self.lock:
+            self.connections -= 1
+
+    def subscriptions(self, registry=None):
+        """
+        Returns the subscriptions that receive events of registry, those that
+        did not ask for particular RegistryPrefixes receive everything but
+        CrayTelemetry.
+        """
+        subs_path = "/redfish/v1/EventService/Subscriptions"
+        with self.lock:
+            subs = [dict(self.tree[m['@odata.id']])
+                    for m in self.tree[subs_path]['Members']]
+        if registry is None:
+            return subs
+        return [sub for sub in subs if registry in sub.get('RegistryPrefixes', [])
+                or (not sub.get('RegistryPrefixes') and registry != "CrayTelemetry")]
+
+    def handle(self, method, path, body, query=None):
+        """
+        Apply a request to the tree.
+
+        Parameters:
+            method (string): GET, POST, PATCH, or DELETE.
+            path (string): Resource path without query string.
+            body (object): Decoded request body or None.
+            query (object): Parsed query string of a GET.
+
+        Returns:
+            status (int): HTTP status.
+            payload (object): Response body or None.
+        """
+        path = path.rstrip('/') or "/"
+        with self.lock:
+            if method == "GET":
+                if path not in self.tree:
+                    return 404, None
+                if self.sensor_noise and path.endswith(("/Power", "/Thermal")):
+                    return 200, vary_readings(self.tree[path], self.sensor_noise)
+                return 200, self.query(self.tree[path], query or {})
+
+            if method == "DELETE":
+                if path not in self.tree or "/Subscriptions/" not in path:
+                    return 405 if path in self.tree else 404, None
+                del self.tree[path]
+                subs = self.tree["/redfish/v1/EventService/Subscriptions"]
+                subs['Members'] = [m for m in subs['Members']
+                                   if m['@odata.id'] != path]
+                subs['Members@odata.count'] = len(subs['Members'])
+                return 200, {}
+
+            if method == "POST":
+                return self.post(path, body)
+
+            if method == "PATCH":
+                if path.endswith(".Deep"):
+                    for member in (body or {}).get('Members', []):
+                        target = self.tree.get(member.get('@odata.id'))
+                        if target is None:
+                            return 400, None
+                        deep_merge(target, {k: v for k, v in member.items()
+                                            if k != '@odata.id'})
+                    return 200, {}
+                if path not in self.tree:
+                    return 404, None
+                deep_merge(self.tree[path], body or {})
+                return 200, self.tree[path]
+
+        return 405, None
+
+    def query(self, resource, query):
+        """
+        Apply $expand and $select to resource if the BMC supports them,
+        called with the lock held. Only the members of a collection are
+        expanded.
+        """
+        features = PROTOCOL_FEATURES.get(self.bmc_type)
+        if not features or 'Members' not in resource:
+            return resource
+        if '$expand' in query:
+            resource = dict(resource)
+            resource['Members'] = [self.tree.get(m['@odata.id'], m)
+                                   for m in resource['Members']]
+        if '$select' in query and features['SelectQuery']:
+            fields = set(query['$select'][0].split(','))
+            fields.update(('Members', 'Members@odata.count'))
+
+            def select(item):
+                return {k: v for k, v in item.items()
+                        if k in fields or k.startswith('@odata')}
+
+            resource = select(dict(resource, Members=[
+                select(m) for m in resource['Members']]))
+        return resource
+
+    def post(self, path, body):
+        """Handle a POST, called with the lock held."""
+        subs_path = "/redfish/v1/EventService/Subscriptions"
+        if path == subs_path:
+            sub_path = "%s/%d" % (subs_path, self.next_subscription)
+            self.next_subscription += 1
+            sub = dict(body or {})
+            sub['@odata.id'] = sub_path
+            sub['Id'] = sub_path.rsplit('/', 1)[-1]
+            self.tree[sub_path] = sub
+            subs = self.tree[subs_path]
+            subs['Members'].append(odata_id(sub_path))
+            subs['Members@odata.count'] = len(subs['Members'])
+            return 201, sub
+
+        if path.endswith("/Actions/LimitTrigger"):
+            return 200, {}
+
+        if path.endswith("/Actions/EventService.SubmitTestEvent"):
+            self.events.put((None, dict(body or {})))
+            return 204, None
+
+        if path.endswith("/Actions/ComputerSystem.Reset"):
+            return self.reset(path.rsplit("/Actions/", 1)[0], body)
+
+        if "/Actions/" in path:
+            return 204, None
+
+        return 405, None
+
+    def reset(self, system, body):
+        """
+        Handle a ComputerSystem.Reset of system, called with the lock held.
+        The system is PoweringOn or PoweringOff until the power_delay is over.
+        """
+        target = RESET_STATES.get((body or {}).get('ResetType'))
+        if system not in self.tree or target is None:
+            return 400, None
+        if self.tree[system]['PowerState'] == target:
+            return 204, None
+        self.tree[system]['PowerState'] = "Powering" + target
+        timer = threading.Timer(self.power_delay, self.power_changed,
+                                (system, target))
+        timer.daemon = True
+        timer.start()
+        return 204, None
+
+    def power_changed(self, system, state):
+        """Finish a reset of system and send the event for it."""
+        with self.lock:
+            if self.tree[system]['PowerState'] != "Powering" + state:
+                return
+            self.tree[system]['PowerState'] = state
+        self.events.put(("ResourceEvent", {
+            'EventType': "StatusChange",
+            'EventTimestamp': datetime.now(timezone.utc).isoformat(),
+            'Severity': "OK",
+            'MessageId': "ResourceEvent.1.0.ResourceChanged",
+            'Message': f"The power state of {system} changed to {state}.",
+            'MessageArgs': [],
+            'OriginOfCondition': odata_id(system),
+        }))
+
+
+class EventSender(threading.Thread):
+    """
+    Sends the events of a MockBMC to its subscribers: queued test and power
+    events at once and, for Olympus BMCs, a CrayTelemetry event every interval
+    seconds.
+    """
+
+    def __init__(self, bmc, location, interval):
+        super().__init__(daemon=True)
+        self.bmc = bmc
+        self.location = location
+        self.interval = interval if bmc.bmc_type == "olympus" else 0
+        self.connections = {}
+        self.event_id = 0
+
+    def run(self):
+        next_telemetry = time.monotonic() + self.interval
+        while True:
+            timeout = None
+            if self.interval:
+                timeout = max(0.0, next_telemetry - time.monotonic())
+            try:
+                registry, queued = self.bmc.events.get(timeout=timeout)
+                for sub in self.bmc.subscriptions(registry):
+                    self.send(sub, [queued])
+            except queue.Empty:
+                pass
+
+            if self.interval and time.monotonic() >= next_telemetry:
+                self.send_telemetry()
+                next_telemetry = max(next_telemetry + self.interval,
+                                     time.monotonic())
+
+    def send_telemetry(self):
+        """Send a CrayTelemetry event to its subscribers."""
+        subs = self.bmc.subscriptions("CrayTelemetry")
+        now = datetime.now(timezone.utc).isoformat()
+        for sub in subs:
+            self.send(sub, [{
+                'EventTimestamp': now,
+                'MessageId': "CrayTelemetry.Temperature",
+                'Oem': {
+                    'TelemetrySource': "Mock",
+                    'Sensors': [{
+                        'Timestamp': now,
+                        'Location': self.location,
+                        'PhysicalContext': "Chassis",
+                        'Index': i,
+                        'Value': "%.1f" % random.uniform(30, 60),
+                    } for i in range(4)],
+                },
+            }])
+
+        # Close the connections of deleted subscriptions
+        destinations = {sub.get('Destination') for sub in subs}
+        for destination in list(self.connections):
+            if destination not in destinations:
+                self.connections.pop(destination).close()
+
+    def send(self, sub, events):
+        """POST an event with events to the destination of sub."""
+        destination = sub.get('Destination')
+        if not destination:
+            return
+        self.event_id += 1
+        payload = {
+            '@odata.type': "#Event.v1_3_0.Event",
+            'Id': str(self.event_id),
+            'Name': "Events",
+            'Context': sub.get('Context', ""),
+            'Events': events,
+            'Events@odata.count': len(events),
+        }
+        parts = urlsplit(destination)
+        try:
+            conn = self.connections.get(destination)
+            if conn is None:
+                if parts.scheme == "https":
+                    conn = http.client.HTTPSConnection(
+                        parts.netloc, timeout=5,
+                        context=ssl._create_unverified_context()) # pylint: disable=protected-access
+                else:
+                    conn = http.client.HTTPConnection(parts.netloc, timeout=5)
+                self.connections[destination] = conn
+            conn.request("POST", parts.path or "/", json.dumps(payload),
+                         {'Content-Type': "application/json"})
+            conn.getresponse().read()
+        except (OSError, http.client.HTTPException) as e:
+            logger.debug("%s: event to %s failed: %s", self.bmc.bmc_type,
+                         destination, e)
+            conn = self.connections.pop(destination, None)
+            if conn is not None:
+                conn.close()
+            with self.bmc.lock:
+                self.bmc.events_failed += 1
+            return
+        with self.bmc.lock:
+            self.bmc.events_sent += 1
+
+
+class MockRedfishHandler(BaseHTTPRequestHandler):
+    """Serves the Redfish tree of the server's MockBMC."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, without this the body waits
+    # for the client's delayed ACK of the headers
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        logger.debug("%s: " + format, self.server.bmc.bmc_type, *args)
+
+    def send_json(self, status, payload):
+        """Send a response with a JSON body."""
+        data = b""
+        if payload is not None:
+            data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def serve(self, method):
+        """Handle a request with the configured latency and error rate."""
+        bmc = self.server.bmc
+        start = time.monotonic()
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = None
+
+        delay = bmc.current_latency()
+        if bmc.jitter:
+            delay = max(0.0, random.gauss(delay, bmc.jitter))
+        if delay:
+            time.sleep(delay)
+
+        if bmc.auth and self.headers.get('Authorization') != bmc.auth:
+            status, payload = 401, None
+        elif bmc.error_rate and random.random() < bmc.error_rate:
+            status, payload = 503, None
+        else:
+            path, _, query = self.path.partition('?')
+            status, payload = bmc.handle(method, path, body, parse_qs(query))
+
+        if status >= 400:
+            payload = {'error': {'code': "Base.1.0.GeneralError",
+                                 'message': self.responses.get(status, ("",))[0]}}
+
+        self.send_json(status, payload)
+        bmc.record(status, time.monotonic() - start)
+
+    def do_GET(self):
+        """Handler for GETs."""
+        self.serve("GET")
+
+    def do_POST(self):
+        """Handler for POSTs."""
+        self.serve("POST")
+
+    def do_PATCH(self):
+        """Handler for PATCHes."""
+        self.serve("PATCH")
+
+    def do_DELETE(self):
+        """Handler for DELETEs."""
+        self.serve("DELETE")
+
+
+class MockBMCServer(ThreadingHTTPServer):
+    """HTTPS server of one simulated BMC, limiting its open connections."""
+
+    daemon_threads = True
+
+    def __init__(self, address, bmc, context=None):
+        super().__init__(address, MockRedfishHandler)
+        self.bmc = bmc
+        self.accepted = set()
+        if context is not None:
+            # The TLS handshake is done by the connection's thread so a slow
+            # client does not block accepting other connections
+            self.socket = context.wrap_socket(self.socket, server_side=True,
+                                              do_handshake_on_connect=False)
+
+    def verify_request(self, request, client_address):
+        if not self.bmc.connect():
+            return False
+        self.accepted.add(id(request))
+        return True
+
+    def shutdown_request(self, request):
+        # Refused connections are shut down too, only count accepted ones
+        if id(request) in self.accepted:
+            self.accepted.discard(id(request))
+            self.bmc.disconnect()
+        super().shutdown_request(request)
+
+
+def make_self_signed_cert(directory):
+    """
+    Create a self-signed certificate with openssl.
+
+    Parameters:
+        directory (string): Directory to write tls.crt and tls.key to.
+
+    Returns:
+        certfile (string): Certificate file.
+        keyfile (string): Private key file.
+    """
+    certfile = os.path.join(directory, "tls.crt")
+    keyfile = os.path.join(directory, "tls.key")
+    subprocess.run(["openssl", "req", "-newkey", "rsa:2048", "-x509",
+                    "-sha256", "-days", "1", "-nodes", "-subj", "/CN=localhost",
+                    "-out", certfile, "-keyout", keyfile],
+                   check=True, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL)
+    return certfile, keyfile
+
+
+def start_mock_bmcs(args):
+    """
+    Start args.count simulated BMCs on consecutive ports starting at
+    args.port, cycling through args.types.
+
+    Parameters:
+        args (object): Command line arguments, see add_mock_arguments().
+
+    Returns:
+        servers (list): The running MockBMCServers.
+    """
+    context = None
+    if not args.no_tls:
+        certfile, keyfile = args.cert, args.key
+        if not certfile:
+            certfile, keyfile = make_self_signed_cert(tempfile.mkdtemp())
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+
+    types = args.types.split(',')
+    for bmc_type in types:
+        if bmc_type not in BMC_TYPES:
+            raise ValueError(f"Unknown BMC type {bmc_type}, expected one of "
+                             f"{','.join(BMC_TYPES)}")
+
+    servers = []
+    for i in range(args.count):
+        bmc = MockBMC(types[i % len(types)], i, args)
+        server = MockBMCServer((args.address, args.port + i), bmc, context)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        server.sender = EventSender(bmc, f"x3000c0s{i}b0",
+                                    args.telemetry_interval)
+        server.sender.start()
+        servers.append(server)
+
+    logger.info("Started %d mock BMCs on %s:%d-%d.", len(servers),
+                args.address, args.port, args.port + len(servers) - 1)
+    return servers
+
+
+def server_stats(servers):
+    """
+    Combine the statistics of servers and reset them.
+
+    Parameters:
+        servers (list): MockBMCServers.
+
+    Returns:
+        stats (object): Request count, errors, latency percentiles in
+                        seconds, peak connections, refused connections, and
+                        events sent and failed.
+    """
+    latencies = []
+    statuses = {}
+    peak = 0
+    refused = 0
+    events_sent = 0
+    events_failed = 0
+    for server in servers:
+        bmc = server.bmc
+        with bmc.lock:
+            latencies.extend(bmc.latencies)
+            for status, count in bmc.statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+            peak = max(peak, bmc.peak_connections)
+            refused += bmc.refused
+            events_sent += bmc.events_sent
+            events_failed += bmc.events_failed
+        bmc.reset_stats()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(c for s, c in statuses.items() if s >= 400),
+        'statuses': statuses,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'peak_connections': peak,
+        'refused': refused,
+        'events_sent': events_sent,
+        'events_failed': events_failed,
+    }
+
+
+def add_mock_arguments(parser):
+    """Add the options of the simulated BMCs to parser."""
+    parser.add_argument('-n', '--count', type=int, default=1,
+                        help='Number of BMCs to simulate.')
+    parser.add_argument('-a', '--address', default="127.0.0.1",
+                        help='Address to listen on.')
+    parser.add_argument('-r', '--port', type=int, default=9443,
+                        help='Port of the first BMC, the others follow.')
+    parser.add_argument('-T', '--types', default="olympus",
+                        help='Comma separated BMC types to cycle through: '
+                        f'{",".join(BMC_TYPES)}.')
+    parser.add_argument('--latency', type=float, default=0,
+                        help='Milliseconds added to every request.')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='Standard deviation of the latency in milliseconds.')
+    parser.add_argument('--latency-drift', type=float, default=0,
+                        help='Milliseconds the latency grows by every minute.')
+    parser.add_argument('--sensor-noise', type=float, default=0,
+                        help='Fraction the Power and Thermal readings vary by '
+                        'on every GET, 0 for constant readings.')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Fraction of requests answered with 503.')
+    parser.add_argument('--max-connections', type=int, default=0,
+                        help='Open connections each BMC accepts, 0 for no limit.')
+    parser.add_argument('--dimms', type=int, default=16,
+                        help='Memory members of each system.')
+    parser.add_argument('--cpus', type=int, default=2,
+                        help='Processors members of each system.')
+    parser.add_argument('--firmware', type=int, default=20,
+                        help='FirmwareInventory members of each BMC.')
+    parser.add_argument('-u', '--user', help='Redfish user name to require.')
+    parser.add_argument('-p', '--passwd', help='Redfish password to require.')
+    parser.add_argument('--cert', help='TLS certificate file. A self-signed '
+                        'certificate is created if not given.')
+    parser.add_argument('--key', help='TLS private key file.')
+    parser.add_argument('--no-tls', action='store_true',
+                        help='Serve plain http.')
+    parser.add_argument('--telemetry-interval', type=float, default=1.0,
+                        help='Seconds between the CrayTelemetry events an '
+                        'Olympus BMC sends to each subscription, 0 for none.')
+    parser.add_argument('--power-delay', type=float, default=1.0,
+                        help='Seconds a ComputerSystem.Reset takes to change '
+                        'the power state.')
+
+
+def main(argslist=None):
+    """Main program"""
+    parser = argparse.ArgumentParser(description='Mock Redfish BMCs.')
+    add_mock_arguments(parser)
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Log every request.')
+    parser.add_argument('-V', '--version', action="store_true",
+                        help='Print the script version information and exit.')
+    args = parser.parse_args(argslist)
+
+    if args.version is True:
+        logger.info("%s: %s", __file__, VERSION)
+        return 0
+
+    if args.verbose:
+        standard_out.setLevel(logging.DEBUG)
+        logger.setLevel(logging.DEBUG)
+
+    try:
+        servers = start_mock_bmcs(args)
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        logger.error("FAIL: Could not start the mock BMCs: %s", e)
+        return 1
+
+    try:
+        while True:
+            time.sleep(10)
+            stats = server_stats(servers)
+            if stats['requests']:
+                logger.info("%d requests, %d errors, p50 %.1f ms, p99 %.1f ms",
+                            stats['requests'], stats['errors'],
+                            stats['p50'] * 1000, stats['p99'] * 1000)
+            if stats['events_sent'] or stats['events_failed']:
+                logger.info("%d events sent, %d failed", stats['events_sent'],
+                            stats['events_failed'])
+    except KeyboardInterrupt:
+        pass
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    result = main()
+    sys.exit(result)
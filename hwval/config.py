@@ -1,3 +1,72 @@
 #!/usr/bin/python3
+from os import path
+
+# Base URL of the API gateway that CAPMC, HSM, and Keycloak are reached through
+apiGateway = "https://api-gw-service-nmn.local"
+# Keycloak admin-client secret, None reads it from the admin-client-auth
+# kubernetes secret
+clientSecret = None
 rfUser = None
-rfPass = None
\ No newline at end of file
+rfPass = None
+# Maximum number of pooled connections, and so concurrent requests, per BMC
+rfPoolSize = 4
+# Seconds a Redfish GET response is reused from the cache, 0 disables caching
+rfCacheTTL = 300
+# Fetch the members of a Redfish collection with the collection, using $expand
+# and $select if the BMC's service root says it supports them
+rfExpand = True
+# Maximum number of nids sent in one CAPMC request in --batch mode
+capmcBatchSize = 1000
+# File the HSM nid/xname index is saved in, and the seconds it is reused for
+# by later runs, 0 disables the file
+hsmCacheFile = path.expanduser("~/.cache/hms-tools/hsm-index.json")
+hsmCacheMaxAge = 3600
+# File the profiles of the BMCs (vendor, event scheme, supported query
+# parameters, and power capping) are saved in, shared with the other HMS tools,
+# and the seconds they are reused for by later runs, 0 disables the file
+bmcProfileFile = path.expanduser("~/.cache/hms-tools/bmc-profiles.json")
+bmcProfileMaxAge = 86400
+# Seconds between writes of newly probed BMC profiles to bmcProfileFile
+bmcProfileSaveInterval = 5
+# Seconds before it expires that the access token is replaced
+tokenRefreshMargin = 30
+# File the access token is saved in for later runs, None keeps it in memory
+# only. --token-cache sets it to tokenCachePath.
+tokenCacheFile = None
+tokenCachePath = path.expanduser("~/.cache/hms-tools/token.json")
+# Seconds to wait for a BMC to accept a connection and complete the TLS
+# handshake, and to send a response
+rfConnectTimeout = 5
+rfReadTimeout = 30
+# Times a Redfish GET is retried after a 429, 502, 503, or 504 response, and at
+# most rfTimeoutRetries of them after it failed to connect or timed out, since
+# each of those can take rfConnectTimeout or rfReadTimeout seconds. Requests
+# that are not GETs are only retried if they failed to connect. The backoff
+# before retry n is up to rfBackoff * 2^n seconds, randomized, or the BMC's
+# Retry-After, at most rfRetryAfterMax seconds.
+rfRetries = 3
+rfTimeoutRetries = 1
+rfBackoff = 0.5
+rfRetryAfterMax = 30
+# Consecutive failed connections after which the remaining requests to a BMC
+# are skipped, and the seconds until the BMC is tried again
+rfBreakerThreshold = 2
+rfBreakerCooldown = 300
+# Seconds eventTest waits for the BMC to deliver its Redfish test event
+eventTimeout = 30
+# Seconds between the polls of the Power and Thermal telemetry of each BMC in
+# --soak mode, and the latest polls kept per sensor for the rolling statistics
+soakInterval = 10
+soakSamples = 360
+# Seconds a reading may stay the same before its sensor is reported stale. A
+# BMC none of whose readings changed for as long fails.
+soakStaleAfter = 600
+# Polls whose mean response time is a BMC's baseline, the first ones, and its
+# recent response time, the latest ones. A BMC fails if the recent response
+# time is soakDriftLimit times the baseline and at least soakDriftMin seconds
+# longer.
+soakBaseline = 10
+soakDriftLimit = 2.0
+soakDriftMin = 0.25
+# Seconds between the interim reports of a soak
+soakReportInterval = 300
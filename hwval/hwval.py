@@ -28,24 +28,68 @@ import json
 import requests
 
 from os import path
+from concurrent.futures import ThreadPoolExecutor
 
-from utils.hostlist import expand
+from utils.hostlist import expand, iter_expand, compress
 from utils.debug import dbgPrint, dbgMed, dbgHigh, setDbgLevel
+from utils.debug import outPrint, startOutputBuffer, flushOutputBuffer
 from utils.auth import getAuthenticationToken
 from utils.conversions import nidsToXnames
+from utils.redfish import closeRedfishSessions, getRedfishCacheStats
+from utils.results import setResultContext, addResultSink, closeResultSinks
+from utils.results import JSONLinesSink, SummarySink
+from utils.timing import enableProfile, profileReport, writeProfileTrace
 import config
 
 """
 HW Validation modules
 """
-from validations.capmc import capmc
-from validations.redfish import redfish
+from validations.capmc import capmc, capmcBatch
+from validations.redfish import redfish, redfishSoak
 
 hwValidationModule = [
         capmc,
         redfish
         ]
 
+"""
+Batch functions of the HW Validation modules that can validate all xnames up
+front, used with --batch
+"""
+hwValidationBatch = {
+        capmc: capmcBatch
+        }
+
+def validateXname(xname, tests, args):
+    r""" validateXname(xname, tests, args) - runs all requested validation
+    modules against a single xname and returns the number of failures """
+    failures = 0
+    if tests:
+        for m in tests.keys():
+            for module in hwValidationModule:
+                if m == module.__name__:
+                    outPrint("\033[1;36m%s(%s):\033[0m" % (module.__name__, xname))
+                    setResultContext(module.__name__, xname)
+                    ret = module(xname, tests[m], None, args)
+                    failures = failures + ret
+    else:
+        for module in hwValidationModule:
+            outPrint("\033[1;36m%s(%s):\033[0m" % (module.__name__, xname))
+            setResultContext(module.__name__, xname)
+            ret = module(xname, None, False, args)
+            failures = failures + ret
+
+    return failures
+
+def validateXnameBuffered(xname, tests, args):
+    r""" validateXnameBuffered(xname, tests, args) - same as validateXname()
+    but all output for the xname is emitted as one block when it completes """
+    startOutputBuffer()
+    try:
+        return validateXname(xname, tests, args)
+    finally:
+        flushOutputBuffer()
+
 def main():
     parser = argparse.ArgumentParser(description='Automatic hardware validation tool.')
     parser.add_argument('-l', '--list', 
@@ -76,6 +120,70 @@ def main():
     parser.add_argument('-p', '--passwd',
             help='Password for Redfish validation. All --xnames must have the '
                'same password for their BMC.')
+    parser.add_argument('-P', '--parallel', type=int, default=1,
+            help='Number of xnames to validate concurrently. Output for each '
+               'xname is printed as a block once its validation completes.')
+    parser.add_argument('--pool-size', type=int, default=config.rfPoolSize,
+            help='Maximum number of kept-alive connections, and so concurrent '
+               'requests, per BMC. Default: %d' % config.rfPoolSize)
+    parser.add_argument('--cache-ttl', type=int, default=config.rfCacheTTL,
+            help='Seconds a Redfish response is reused by other validations '
+               'of the same BMC, 0 disables caching. Default: %d' %
+               config.rfCacheTTL)
+    parser.add_argument('--no-expand', action="store_true",
+            help='Fetch the members of Redfish collections one at a time '
+               'even if the BMC supports $expand.')
+    parser.add_argument('--timeout', type=int, default=config.rfReadTimeout,
+            help='Seconds to wait for a Redfish response. Default: %d' %
+               config.rfReadTimeout)
+    parser.add_argument('--retries', type=int, default=config.rfRetries,
+            help='Times a Redfish GET is retried after a 429, 502, 503, or '
+               '504 response. After %d requests in a row could not reach a '
+               'BMC its remaining tests are skipped. Default: %d' %
+               (config.rfBreakerThreshold, config.rfRetries))
+    parser.add_argument('-b', '--batch', action="store_true",
+            help='Query all xnames in as few CAPMC requests as possible '
+               'before reporting the results of each xname.')
+    parser.add_argument('--batch-size', type=int, default=config.capmcBatchSize,
+            help='Maximum number of nids per CAPMC request with --batch. '
+               'Default: %d' % config.capmcBatchSize)
+    parser.add_argument('--hsm-cache-age', type=int,
+            default=config.hsmCacheMaxAge,
+            help='Seconds the nid/xname index fetched from HSM is reused by '
+               'later runs, 0 disables the cache file. Default: %d' %
+               config.hsmCacheMaxAge)
+    parser.add_argument('--bmc-cache-age', type=int,
+            default=config.bmcProfileMaxAge,
+            help='Seconds the vendor and features probed from a BMC are '
+               'reused by later runs, 0 disables the cache file. Default: %d' %
+               config.bmcProfileMaxAge)
+    parser.add_argument('--token-cache', action="store_true",
+            help='Save the access token in %s, readable by the owner only, '
+               'so later runs reuse it until it expires.' % config.tokenCachePath)
+    parser.add_argument('--api-gateway', default=config.apiGateway,
+            help='Base URL of the API gateway for CAPMC, HSM, and Keycloak. '
+               'Default: %s' % config.apiGateway)
+    parser.add_argument('--client-secret-file',
+            help='File with the Keycloak admin-client secret, instead of '
+               'reading the admin-client-auth kubernetes secret.')
+    parser.add_argument('--jsonl',
+            help='Also write every result as a JSON object per line to JSONL.')
+    parser.add_argument('-s', '--summary', action="store_true",
+            help='Print a table of the result counts of each test at the end.')
+    parser.add_argument('--profile', action="store_true",
+            help='Print a report of the time spent in Redfish requests by URI, '
+               'test, and BMC vendor at the end.')
+    parser.add_argument('--soak', type=int, default=0, metavar='SECONDS',
+            help='Instead of the validations, poll the Power and Thermal '
+               'telemetry of the BMCs for SECONDS and report the rolling '
+               'min/max/mean of every sensor, the stale sensors, and the '
+               'response time drift of every BMC.')
+    parser.add_argument('--soak-interval', type=float,
+            default=config.soakInterval,
+            help='Seconds between the telemetry polls of a BMC with --soak. '
+               'Default: %g' % config.soakInterval)
+    parser.add_argument('--trace',
+            help='Write the Redfish requests to TRACE as Chrome trace events.')
     args = parser.parse_args()
 
     if args.version is True:
@@ -111,27 +219,50 @@ def main():
         print("%s: error: missing argument" % path.basename(__file__))
         return 1
 
-    xnames = None
-    if args.nids is not None:
-        nids = expand(args.nids)
-        xnames = nidsToXnames(nids)
+    config.hsmCacheMaxAge = args.hsm_cache_age
+    config.apiGateway = args.api_gateway.rstrip('/')
+    if args.client_secret_file:
+        try:
+            with open(args.client_secret_file, "r") as f:
+                config.clientSecret = f.read().strip()
+        except OSError as e:
+            print("%s: error: %s" % (path.basename(__file__), e))
+            return 1
+    if args.token_cache:
+        config.tokenCacheFile = config.tokenCachePath
 
-    if args.xnames is not None:
-        if xnames is not None:
-            args.xnames = args.xnames + ',' + xnames
-        xnames = expand(args.xnames)
+    xnames = []
+    try:
+        if args.nids is not None:
+            nids = expand(args.nids)
+            nidXnames, unknownNids = nidsToXnames(nids)
+            if nidXnames is None:
+                print("%s: error: could not look up the nids in HSM at %s" %
+                        (path.basename(__file__), config.apiGateway))
+                return 1
+            if unknownNids:
+                print("%s: warning: unknown nids: %s" % (path.basename(__file__),
+                        compress([str(n) for n in unknownNids])))
+            if nidXnames:
+                xnames.extend(nidXnames.split(','))
 
-    if args.ips is not None:
-        if xnames is not None:
-            args.ips = args.ips + ',' + xnames
-        xnames = expand(args.ips)
+        if args.xnames is not None:
+            xnames.extend(iter_expand(args.xnames))
 
-    dbgPrint(dbgMed, "Nodes to validate: %s" % xnames)
+        if args.ips is not None:
+            xnames.extend(iter_expand(args.ips))
+    except ValueError as e:
+        parser.print_usage()
+        print("%s: error: %s" % (path.basename(__file__), e))
+        return 1
 
-    # Convert into a list and remove duplicates
-    xnames = xnames.split(',')
-    xnames_set = set(xnames)
-    xnames = (list(xnames_set))
+    # Remove duplicates, keeping the order given
+    xnames = list(dict.fromkeys(xnames))
+    if not xnames:
+        print("%s: error: no nodes to validate" % path.basename(__file__))
+        return 1
+
+    dbgPrint(dbgMed, lambda: "Nodes to validate: %s" % compress(xnames))
 
     tests = {}
     if args.tests:
@@ -149,31 +280,77 @@ def main():
             else:
                 tests[kv[0]].append(kv[1])
 
-    dbgPrint(dbgMed, "Tests to execute: %s" % tests)
+    dbgPrint(dbgMed, "Tests to execute: %s", tests)
 
     failures = 0
+    failed = []
+
+    if args.jsonl:
+        addResultSink(JSONLinesSink(args.jsonl))
+    if args.summary:
+        addResultSink(SummarySink())
+    if args.profile or args.trace:
+        enableProfile()
 
     config.rfUser = args.user
     config.rfPass = args.passwd
+    config.rfPoolSize = max(args.pool_size, 1)
+    config.rfCacheTTL = args.cache_ttl
+    config.rfExpand = not args.no_expand
+    config.bmcProfileMaxAge = args.bmc_cache_age
+    config.rfReadTimeout = max(args.timeout, 1)
+    config.rfRetries = max(args.retries, 0)
+    config.capmcBatchSize = max(args.batch_size, 1)
 
-    for xname in xnames:
-        if tests:
-            for m in tests.keys():
-                for module in hwValidationModule:
-                    if m == module.__name__:
-                        print("\033[1;36m%s(%s):\033[0m" % (module.__name__, xname))
-                        ret = module(xname, tests[m], None, args)
-                        failures = failures + ret
+    try:
+        if args.batch and args.soak <= 0:
+            for module, batch in hwValidationBatch.items():
+                if tests and module.__name__ not in tests:
+                    continue
+                dbgPrint(dbgMed, "Batch: %s", module.__name__)
+                batch(xnames, tests.get(module.__name__), args)
+
+        if args.soak > 0:
+            results = redfishSoak(xnames, args)
+            failed = [name for name, n in results.items() if n]
+            failures = sum(results.values())
+        elif args.parallel > 1 and len(xnames) > 1:
+            with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+                results = [pool.submit(validateXnameBuffered, xname, tests, args)
+                            for xname in xnames]
+                for xname, r in zip(xnames, results):
+                    ret = r.result()
+                    if ret:
+                        failed.append(xname)
+                    failures = failures + ret
         else:
-            for module in hwValidationModule:
-                print("\033[1;36m%s(%s):\033[0m" % (module.__name__, xname))
-                ret = module(xname, None, False, args)
+            for xname in xnames:
+                ret = validateXname(xname, tests, args)
+                if ret:
+                    failed.append(xname)
                 failures = failures + ret
+    finally:
+        closeRedfishSessions()
+        closeResultSinks()
 
     if failures == 0:
         print("All validations PASSED")
     else:
         print("%d Validations did not pass cleanly" % failures)
+        print("Failed: %s" % compress(failed))
+
+    hits, misses = getRedfishCacheStats()
+    if hits + misses > 0:
+        print("Redfish cache: %d hits, %d misses" % (hits, misses))
+
+    if args.profile:
+        for line in profileReport():
+            print(line)
+    if args.trace:
+        try:
+            writeProfileTrace(args.trace)
+        except OSError as e:
+            print("Could not write %s: %s" % (args.trace, e))
 
     print("Done")
 
@@ -21,21 +21,90 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 
 import json
+import os
 import requests
+import threading
+import time
 
-from base64 import b64decode
+from base64 import b64decode, urlsafe_b64decode
 
 from utils.k8s import getK8sClient
 from utils.debug import dbgPrint, dbgMed, dbgHigh
+import config
 
-def getAuthenticationToken():
-    dbgPrint(dbgMed, "getAuthenticationToken")
+"""
+The current access token and the time.time() it expires at. Do not access this
+directly, use getAuthenticationToken().
+"""
+tokenLock = threading.Lock()
+tokenCache = {
+        'access_token': None,
+        'expires_at': 0,
+        }
+
+def tokenExpiry(result):
+    r""" tokenExpiry(result) - returns the time.time() the token in a Keycloak
+    response expires at, from expires_in or else the exp claim of the token """
+    if 'expires_in' in result:
+        return time.time() + int(result['expires_in'])
 
-    URL = "https://api-gw-service-nmn.local/keycloak/realms/shasta/protocol/openid-connect/token"
+    try:
+        claims = result['access_token'].split('.')[1]
+        claims = claims + '=' * (-len(claims) % 4)
+        return int(json.loads(urlsafe_b64decode(claims))['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time()
+
+def tokenValid(token):
+    r""" tokenValid(token) - True if token does not expire within
+    config.tokenRefreshMargin seconds """
+    return (token.get('access_token') and
+            token.get('expires_at', 0) - config.tokenRefreshMargin > time.time())
 
-    kSecret = getK8sClient().read_namespaced_secret("admin-client-auth", "default")
-    secret = b64decode(kSecret.data['client-secret']).decode("utf-8")
-    dbgPrint(dbgHigh, "\tSecret: " + secret)
+def readTokenCache():
+    r""" readTokenCache() - returns the token saved in config.tokenCacheFile, or
+    None if there is none or it is for another API gateway """
+    if not config.tokenCacheFile:
+        return None
+
+    try:
+        with open(config.tokenCacheFile, "r") as f:
+            token = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if token.get('gateway') != config.apiGateway:
+        return None
+
+    return token
+
+def writeTokenCache(token):
+    r""" writeTokenCache(token) - saves the token in config.tokenCacheFile,
+    readable by the owner only """
+    if not config.tokenCacheFile:
+        return
+
+    tmpFile = config.tokenCacheFile + ".%d" % os.getpid()
+    try:
+        os.makedirs(os.path.dirname(config.tokenCacheFile), mode=0o700,
+                exist_ok=True)
+        fd = os.open(tmpFile, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(token, f)
+        os.replace(tmpFile, config.tokenCacheFile)
+    except OSError as e:
+        dbgPrint(dbgMed, "Could not write token cache: %s", e)
+
+def fetchAuthenticationToken():
+    r""" fetchAuthenticationToken() - gets a new token from Keycloak, returns
+    the token and its expiry time or None on failure """
+    URL = config.apiGateway + "/keycloak/realms/shasta/protocol/openid-connect/token"
+
+    secret = config.clientSecret
+    if secret is None:
+        kSecret = getK8sClient().read_namespaced_secret("admin-client-auth", "default")
+        secret = b64decode(kSecret.data['client-secret']).decode("utf-8")
+    dbgPrint(dbgHigh, "\tSecret: %s", secret)
 
     DATA = {
             "grant_type": "client_credentials",
@@ -46,11 +115,36 @@ def getAuthenticationToken():
     try:
         r = requests.post(url = URL, data = DATA)
     except OSError:
-        return ""
+        return None
 
     result = json.loads(r.text)
 
     dbgPrint(dbgHigh, result['access_token'])
-    return result['access_token']
 
+    return {
+            'access_token': result['access_token'],
+            'expires_at': tokenExpiry(result),
+            'gateway': config.apiGateway,
+            }
+
+def getAuthenticationToken():
+    r""" getAuthenticationToken() - returns an access token, reusing the last
+    one until it is about to expire """
+    dbgPrint(dbgMed, "getAuthenticationToken")
+
+    with tokenLock:
+        if tokenValid(tokenCache):
+            return tokenCache['access_token']
+
+        token = readTokenCache()
+        if token is None or not tokenValid(token):
+            token = fetchAuthenticationToken()
+            if token is None:
+                return ""
+            writeTokenCache(token)
+        else:
+            dbgPrint(dbgMed, "Token from %s", config.tokenCacheFile)
+
+        tokenCache.update(token)
 
+        return tokenCache['access_token']
@@ -0,0 +1,324 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+BMC profiles shared by the HMS tools.
+
+A profile records what the tools need to know about a BMC before talking to
+it: the vendor, the scheme its events must be sent with, the Redfish query
+parameters it supports, and how its power is capped. It is probed once, with
+the GETs of the tool that asks for it, and saved in a file so later runs of any
+tool reuse it until it is config.bmcProfileMaxAge seconds old. The file and
+its age are those of hwval's config.py, read at each use. expand_query() returns the
+$expand and $select query a collection is fetched with from a BMC, by its
+profile.
+
+Functions:
+    disable_expand(string)
+    expand_query(string, function, list) -> string
+    forget_profile(string)
+    get_profile(string, function) -> object
+    is_expanded(object) -> bool
+    probe(function) -> object
+    save_profiles()
+
+Misc Variables:
+    CHASSIS_VENDORS - Vendor of a BMC by the URI of its chassis
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+import config
+
+CRAY = "Cray"
+GIGABYTE = "Gigabyte"
+HPE = "HPE"
+INTEL = "Intel"
+OPENBMC = "OpenBmc" # Foxconn Paradise
+UNKNOWN = "Unknown"
+
+CHASSIS_VENDORS = {
+    "/redfish/v1/Chassis/Enclosure": CRAY,
+    "/redfish/v1/Chassis/Self": GIGABYTE,
+    "/redfish/v1/Chassis/1": HPE,
+    "/redfish/v1/Chassis/RackMount": INTEL,
+    "/redfish/v1/Chassis/BMC_0": OPENBMC,
+}
+
+# Power capping mechanisms
+CONTROLS = "Controls"                   # Chassis/{id}/Controls, Deep PATCH
+POWERCTL = "PowerControl"               # Chassis/{id}/Power .PowerControl
+POWERSVC = "HpeServerAccPowerLimit"     # Chassis/{id}/Power .Oem.Hpe
+
+
+def probe_features(root):
+    """
+    The $expand value that expands the members of a collection, or None, and
+    whether $select is supported, from the service root.
+    """
+    supported = root.get('ProtocolFeaturesSupported', {})
+    expand_query = supported.get('ExpandQuery', {})
+    expand = None
+    if expand_query.get('NoLinks') is True:
+        expand = "."
+    elif expand_query.get('ExpandAll') is True:
+        expand = "*"
+    if expand is not None and expand_query.get('Levels') is True:
+        expand += "($levels=1)"
+    return expand, supported.get('SelectQuery') is True
+
+
+def probe_power_cap(get, chassis_uri):
+    """
+    The power capping mechanism of a node chassis and the URI it is used with,
+    or None, None.
+    """
+    chassis = get(chassis_uri)
+    if chassis is None:
+        return None, None
+
+    if "Controls" in chassis:
+        controls = get(chassis['Controls']['@odata.id'])
+        for member in (controls or {}).get('Members', []):
+            if "NodePowerLimit" in member['@odata.id']:
+                return CONTROLS, member['@odata.id']
+
+    if "Power" not in chassis:
+        return None, None
+    power_uri = chassis['Power']['@odata.id']
+    power = get(power_uri)
+    if power is None:
+        return None, None
+
+    links = power.get('Oem', {}).get('Hpe', {}).get('Links', {})
+    if "PowerLimit" in links:
+        power_limit = get(links['PowerLimit']['@odata.id'])
+        if power_limit is None:
+            return None, None
+        action = power_limit['Actions']['#HpeServerAccPowerLimit.ConfigurePowerLimit']
+        return POWERSVC, action['target']
+
+    return POWERCTL, power_uri
+
+
+def probe(get):
+    """
+    Probe a BMC.
+
+    Parameters:
+        get (function): GETs a Redfish URI of the BMC and returns the parsed
+            response, or None on failure.
+
+    Returns:
+        profile (object): vendor, scheme, expand, select, chassis (the node
+            chassis used for power capping), power_cap and power_cap_uri, or
+            None if the service root could not be read.
+    """
+    root = get("/redfish/v1/")
+    if root is None:
+        return None
+    expand, select = probe_features(root)
+
+    vendor = UNKNOWN
+    node = None
+    chassis = get("/redfish/v1/Chassis") or {}
+    for member in chassis.get('Members', []):
+        uri = member['@odata.id']
+        if vendor == UNKNOWN and uri in CHASSIS_VENDORS:
+            vendor = CHASSIS_VENDORS[uri]
+        if node is None and "Mezz" not in uri and "Enclosure" not in uri:
+            node = uri
+
+    # iLO and OpenBMC only send events to https destinations
+    scheme = "http"
+    registries = get("/redfish/v1/Registries") or {}
+    for member in registries.get('Members', []):
+        if member['@odata.id'].rstrip("/").rsplit("/", 1)[-1] in ("iLO", "OpenBMC"):
+            scheme = "https"
+
+    power_cap, power_cap_uri = None, None
+    if node is not None:
+        power_cap, power_cap_uri = probe_power_cap(get, node)
+
+    return {
+        'vendor': vendor,
+        'scheme': scheme,
+        'expand': expand,
+        'select': select,
+        'chassis': node,
+        'power_cap': power_cap,
+        'power_cap_uri': power_cap_uri,
+    }
+
+
+profiles_lock = threading.Lock()
+profiles = None         # bmc -> {'timestamp': seconds, 'profile': profile}
+unsaved = False
+forgotten = set()
+last_save = 0.0
+bmc_locks = {}
+
+
+def read_profiles():
+    """
+    The saved profiles that are younger than config.bmcProfileMaxAge, called
+    with the lock held.
+    """
+    if config.bmcProfileMaxAge <= 0:
+        return {}
+    try:
+        with open(config.bmcProfileFile, "r") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {bmc: entry for bmc, entry in saved.items()
+            if 0 <= now - entry.get('timestamp', 0) < config.bmcProfileMaxAge}
+
+
+def save_profiles():
+    """Write the profiles probed by this run to the profile file."""
+    global unsaved, last_save # pylint: disable=W0603
+    with profiles_lock:
+        if not unsaved or config.bmcProfileMaxAge <= 0:
+            return
+        # Keep the profiles other runs saved in the meantime
+        merged = read_profiles()
+        merged.update(profiles)
+        for bmc in forgotten:
+            merged.pop(bmc, None)
+        tmp_file = config.bmcProfileFile + ".%d" % os.getpid()
+        try:
+            os.makedirs(os.path.dirname(config.bmcProfileFile), exist_ok=True)
+            with open(tmp_file, "w") as f:
+                json.dump(merged, f)
+            os.replace(tmp_file, config.bmcProfileFile)
+        except OSError:
+            return
+        unsaved = False
+        forgotten.clear()
+        last_save = time.monotonic()
+
+
+atexit.register(save_profiles)
+
+
+def get_profile(bmc, get):
+    """
+    Returns the profile of a BMC, probing it with get if it was not probed by
+    this run and has no saved profile. Each BMC is probed only once at a time.
+
+    Parameters:
+        bmc (string): BMC name or IP.
+        get (function): GETs a Redfish URI of the BMC, see probe().
+
+    Returns:
+        profile (object): The profile, None if the BMC could not be probed.
+    """
+    global profiles, unsaved # pylint: disable=W0603
+    with profiles_lock:
+        if profiles is None:
+            profiles = read_profiles()
+        if bmc in profiles:
+            return profiles[bmc]['profile']
+        bmc_lock = bmc_locks.setdefault(bmc, threading.Lock())
+
+    with bmc_lock:
+        with profiles_lock:
+            if bmc in profiles:
+                return profiles[bmc]['profile']
+        profile = probe(get)
+        if profile is None:
+            return None
+        with profiles_lock:
+            profiles[bmc] = {'timestamp': time.time(), 'profile': profile}
+            forgotten.discard(bmc)
+            unsaved = True
+            due = time.monotonic() - last_save >= config.bmcProfileSaveInterval
+
+    if due:
+        save_profiles()
+    return profile
+
+
+def forget_profile(bmc):
+    """
+    Drop the profile of a BMC that turned out to be wrong, for example after a
+    firmware update, so it is probed again by the next get_profile().
+    """
+    global unsaved # pylint: disable=W0603
+    with profiles_lock:
+        if profiles is not None and profiles.pop(bmc, None) is not None:
+            forgotten.add(bmc)
+            unsaved = True
+    save_profiles()
+
+
+no_expand_lock = threading.Lock()
+no_expand = set()       # BMCs that failed an expanded GET
+
+
+def expand_query(bmc, get, fields=None):
+    """
+    Returns the query string that makes a BMC return the members of a
+    collection with the collection, limited to fields if it supports $select,
+    or "" if it does not support $expand or failed an expanded GET.
+
+    Parameters:
+        bmc (string): BMC name or IP.
+        get (function): GETs a Redfish URI of the BMC, see get_profile().
+        fields (list): Properties of the members that are needed.
+
+    Returns:
+        query (string): "?$expand=..." or "".
+    """
+    with no_expand_lock:
+        if bmc in no_expand:
+            return ""
+    profile = get_profile(bmc, get)
+    if profile is None or profile['expand'] is None:
+        return ""
+
+    query = "?$expand=" + profile['expand']
+    fields = [f for f in fields or [] if not f.startswith("@odata.")]
+    if fields and profile['select']:
+        query += "&$select=" + ",".join(["Members", "Members@odata.count"] + fields)
+    return query
+
+
+def disable_expand(bmc):
+    """
+    Stop sending $expand and $select to a BMC after it failed an expanded GET,
+    and have its profile probed again by the next run.
+    """
+    with no_expand_lock:
+        no_expand.add(bmc)
+    forget_profile(bmc)
+
+
+def is_expanded(member):
+    """Returns True if a collection member holds more than its @odata.id."""
+    return any(not key.startswith("@odata.") for key in member)
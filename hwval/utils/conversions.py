@@ -21,44 +21,182 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 
 import json
+import os
 import requests
+import threading
+import time
 
 from utils.debug import dbgPrint, dbgMed, dbgHigh
 from utils.auth import getAuthenticationToken
+import config
 
-def nidsToXnames(nidlist):
-    dbgPrint(dbgMed, "nidsToXnames")
+"""
+Index of the nid of every HSM node component and the xname of every nid, built
+from one bulk HSM query by loadHSMIndex(). A refresh replaces the dicts rather
+than changing them, so lookups without the lock always see a whole index.
+"""
+hsmIndexLock = threading.Lock()
+xnameToNid = {}
+nidToXname = {}
+hsmIndexSource = None
 
-    auth_token = getAuthenticationToken()
+def fetchHSMIndex(auth_token):
+    r""" fetchHSMIndex(auth_token) - returns a dict of the nid of every node
+    component in HSM, or None on failure """
+    dbgPrint(dbgMed, "fetchHSMIndex")
 
     getHeaders = {
             'Authorization': 'Bearer %s' % auth_token,
             'cache-control': 'no-cache',
             }
 
-    queryparams = {}
-    queryparams['nid'] = []
-    for n in nidlist.split(','):
-        queryparams['nid'].append(int(n))
+    queryparams = {
+            'type': 'Node',
+            }
 
-    URL = "https://api-gw-service-nmn.local/apis/smd/hsm/v2/State/Components"
+    URL = config.apiGateway + "/apis/smd/hsm/v2/State/Components"
 
-    dbgPrint(dbgMed, "POST: %s %s" % (URL, queryparams))
-    dbgPrint(dbgHigh, "POST: %s" % getHeaders)
+    dbgPrint(dbgMed, "GET: %s %s", URL, queryparams)
+    dbgPrint(dbgHigh, "GET: %s", getHeaders)
 
-    r = requests.get(url = URL, headers = getHeaders, params = queryparams)
+    try:
+        r = requests.get(url = URL, headers = getHeaders, params = queryparams)
+    except requests.RequestException as e:
+        dbgPrint(dbgMed, "fetchHSMIndex failed: %s", e)
+        return None
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    dbgPrint(dbgHigh, "Response: %s", r.text)
 
     if r.status_code >= 300:
-        return 1
+        dbgPrint(dbgMed, "fetchHSMIndex: HSM returned %d", r.status_code)
+        return None
+
+    try:
+        components = json.loads(r.text)['Components']
+    except (KeyError, TypeError, ValueError):
+        dbgPrint(dbgMed, "fetchHSMIndex: invalid HSM response")
+        return None
+
+    index = {}
+    for comp in components:
+        if 'NID' in comp:
+            index[comp['ID']] = comp['NID']
+
+    return index
+
+def readHSMIndexCache():
+    r""" readHSMIndexCache() - returns the index saved in config.hsmCacheFile,
+    or None if there is none or it is older than config.hsmCacheMaxAge """
+    if not config.hsmCacheFile or config.hsmCacheMaxAge <= 0:
+        return None
+
+    try:
+        with open(config.hsmCacheFile, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get('gateway') != config.apiGateway:
+        dbgPrint(dbgMed, "HSM index cache is for %s", cache.get('gateway'))
+        return None
+
+    age = time.time() - cache.get('timestamp', 0)
+    if age < 0 or age > config.hsmCacheMaxAge:
+        dbgPrint(dbgMed, "HSM index cache expired: %s", config.hsmCacheFile)
+        return None
+
+    dbgPrint(dbgMed, "HSM index cache: %s, %d seconds old",
+            config.hsmCacheFile, age)
+
+    return cache.get('components')
+
+def writeHSMIndexCache(index):
+    r""" writeHSMIndexCache(index) - saves the index in config.hsmCacheFile """
+    if not config.hsmCacheFile or config.hsmCacheMaxAge <= 0:
+        return
+
+    cache = {
+            'timestamp': time.time(),
+            'gateway': config.apiGateway,
+            'components': index,
+            }
+
+    tmpFile = config.hsmCacheFile + ".%d" % os.getpid()
+    try:
+        os.makedirs(os.path.dirname(config.hsmCacheFile), exist_ok=True)
+        with open(tmpFile, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmpFile, config.hsmCacheFile)
+    except OSError as e:
+        dbgPrint(dbgMed, "Could not write HSM index cache: %s", e)
+
+def loadHSMIndex(auth_token=None, refresh=False):
+    r""" loadHSMIndex(auth_token, refresh) - loads the nid/xname index from the
+    cache file or, if there is none or refresh is set, from HSM. Returns False
+    if the index could not be loaded. """
+    global hsmIndexSource, xnameToNid, nidToXname
+
+    with hsmIndexLock:
+        if hsmIndexSource == "hsm" or (hsmIndexSource and not refresh):
+            return True
+
+        index = None
+        if not refresh:
+            index = readHSMIndexCache()
+        if index is not None:
+            source = "cache"
+        else:
+            if auth_token is None:
+                auth_token = getAuthenticationToken()
+            index = fetchHSMIndex(auth_token)
+            if index is None:
+                return False
+            writeHSMIndexCache(index)
+            source = "hsm"
+
+        xnameToNid = dict(index)
+        nidToXname = {nid: xname for xname, nid in index.items()}
+        hsmIndexSource = source
+
+    return True
+
+def xnameToNidLookup(xname, auth_token=None):
+    r""" xnameToNidLookup(xname, auth_token) - returns the nid of xname, or -1
+    if HSM does not know it. An index loaded from the cache file is reloaded
+    from HSM once if xname is missing from it. """
+    if not loadHSMIndex(auth_token):
+        return -1
+
+    if xname not in xnameToNid and hsmIndexSource == "cache":
+        loadHSMIndex(auth_token, refresh=True)
+
+    return xnameToNid.get(xname, -1)
+
+def nidsToXnames(nidlist):
+    r""" nidsToXnames(nidlist) - returns the xnames of the comma separated
+    nids in nidlist, comma separated, and the list of the nids HSM does not
+    know. The xnames are None if the index could not be loaded from HSM. """
+    dbgPrint(dbgMed, "nidsToXnames")
+
+    nids = []
+    for n in nidlist.split(','):
+        nids.append(int(n))
+
+    if not loadHSMIndex():
+        return None, nids
+
+    index = nidToXname
+    if any(n not in index for n in nids) and hsmIndexSource == "cache":
+        loadHSMIndex(refresh=True)
+        index = nidToXname
 
-    components = json.loads(r.text)
-    xnames = None
-    for comp in components['Components']:
-        if xnames is None:
-            xnames = comp['ID']
+    xnames = []
+    unknown = []
+    for n in nids:
+        if n in index:
+            xnames.append(index[n])
         else:
-            xnames = xnames + ',' + comp['ID']
+            dbgPrint(dbgMed, "Unknown nid: %d", n)
+            unknown.append(n)
 
-    return xnames
+    return ','.join(xnames), unknown
@@ -20,6 +20,9 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
+import sys
+import threading
+
 """
 Global "constants"
 """
@@ -41,7 +44,58 @@ def setDbgLevel(lvl):
     global dbgLevel
     dbgLevel = lvl
 
-def dbgPrint(lvl, msg):
+def dbgPrint(lvl, msg, *args):
+    r""" dbgPrint(lvl, msg, *args) - prints msg % args if the debug level is
+    at least lvl. msg may also be a callable returning the message. Nothing is
+    formatted when the message is not printed. """
     global dbgLevel
     if dbgLevel >= lvl:
+        if callable(msg):
+            msg = msg()
+        elif args:
+            msg = msg % args
+        outPrint(msg)
+
+"""
+Output of a thread can be buffered so that the results for one target are
+emitted as a single block when several targets are validated in parallel.
+"""
+outputLock = threading.Lock()
+outputBuffer = threading.local()
+
+def startOutputBuffer():
+    r""" startOutputBuffer() - buffers all output of the calling thread """
+    outputBuffer.lines = []
+
+def flushOutputBuffer():
+    r""" flushOutputBuffer() - atomically prints and stops the buffering of the
+    calling thread's output """
+    lines = getattr(outputBuffer, "lines", None)
+    outputBuffer.lines = None
+    if lines:
+        with outputLock:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+def inheritOutputBuffer(func):
+    r""" inheritOutputBuffer(func) - returns func wrapped so that, when run in
+    another thread, its output goes to the calling thread's buffer """
+    lines = getattr(outputBuffer, "lines", None)
+
+    def wrapper(*args, **kwargs):
+        outputBuffer.lines = lines
+        try:
+            return func(*args, **kwargs)
+        finally:
+            outputBuffer.lines = None
+
+    return wrapper
+
+def outPrint(msg):
+    r""" outPrint(msg) - prints the message or buffers it if the calling thread
+    is buffering its output """
+    lines = getattr(outputBuffer, "lines", None)
+    if lines is None:
         print(msg)
+    else:
+        lines.append(str(msg))
@@ -0,0 +1,424 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+One listener for the Redfish events of many BMCs, shared by the HMS tools.
+
+Every BMC is subscribed with its own destination path, such as
+/events/x3000c0s1b0, and may also be known by the Context of its subscription.
+The listener matches each POST to its BMC by the path, or else by the Context
+in the payload, and hands it to that BMC: the parsed events are added to the
+BMC's EventLog for tests to wait on, and the BMC's callback, if it has one, gets
+the raw payload. Events for no registered BMC go to the fallback callback of
+the listener, or else are counted and kept in the unrouted EventLog.
+
+The connections are served by one asyncio event loop in a daemon thread, so
+thousands of BMCs can keep a connection open to one port without a thread
+each. Connections are kept alive between events, and for https the
+server_context() lets a BMC that reconnects resume its TLS session instead of
+doing a full handshake. stats() returns the counters that show if the listener
+keeps up: open connections, the lag of the event loop, and the time spent
+handing a payload to its BMC.
+
+get_listener() starts the listener of an address on first use and returns the
+same one afterwards, so all the tests of a process share it.
+
+Classes:
+    EventListener
+
+Functions:
+    destination_path(string, string) -> string
+    get_listener(tuple, object) -> object
+    server_context(string, string) -> object
+    stop_listeners()
+
+Misc Variables:
+    PATH_PREFIX - The default prefix of the destination paths
+    REQUEST_QUEUE_SIZE - Connections the kernel queues before they are accepted
+    IDLE_TIMEOUT - Seconds a connection may wait for its next request
+    HANDSHAKE_TIMEOUT - Seconds a TLS handshake may take
+    MAX_HEADER_SIZE - Largest request line and headers accepted
+    MAX_BODY_SIZE - Largest payload accepted
+    LAG_INTERVAL - Seconds between the measurements of the event loop lag
+"""
+
+import asyncio
+import logging
+import socket
+import ssl
+import threading
+import time
+from urllib.parse import quote
+
+from utils.redfish_events import EventLog, parse_events
+
+PATH_PREFIX = "/events/"
+# A whole cabinet may connect at once
+REQUEST_QUEUE_SIZE = 4096
+# BMCs keep their connection open between events, an idle one only costs a
+# socket, so the timeout is there to clear out peers that went away
+IDLE_TIMEOUT = 300
+HANDSHAKE_TIMEOUT = 30
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 64 * 1024 * 1024
+LAG_INTERVAL = 0.5
+
+# Counters that stats() returns the largest value of since the last reset
+PEAKS = ('peak', 'lag', 'handler')
+
+logger = logging.getLogger(__name__)
+
+listeners = {}
+listeners_lock = threading.Lock()
+
+
+def destination_path(bmc, prefix=PATH_PREFIX):
+    """Returns the destination path of the subscription of bmc."""
+    return prefix + quote(bmc, safe='')
+
+
+def server_context(certfile, keyfile):
+    """
+    Returns the ssl.SSLContext of a listener serving https with the
+    certificate certfile and its key keyfile.
+
+    The sessions are cached and session tickets are issued, so a BMC that
+    reconnects resumes its TLS session rather than doing a full handshake.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.options &= ~ssl.OP_NO_TICKET
+    context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+    return context
+
+
+async def read_chunked(reader):
+    """Returns the body of a request sent with Transfer-Encoding: chunked."""
+    body = bytearray()
+    while True:
+        size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+        if size == 0:
+            # Skip the trailers
+            while await reader.readuntil(b'\r\n') != b'\r\n':
+                pass
+            return bytes(body)
+        if len(body) + size > MAX_BODY_SIZE:
+            raise ValueError("chunked body too large")
+        body += await reader.readexactly(size + 2)
+        del body[-2:]
+
+
+class EventListener:
+    """
+    HTTP server, https if an ssl.SSLContext is given, that routes the events
+    it receives to the BMCs registered with it.
+
+    The address is bound when the listener is made, so a port in use raises
+    OSError there, and served from start() until shutdown().
+    """
+
+    def __init__(self, address, context=None, fallback=None, max_connections=0):
+        """
+        Parameters:
+            address (tuple): IP and port to listen on.
+            context (object): ssl.SSLContext to serve https with, None for http.
+            fallback (function): Called with the client IP, path, and raw
+                payload of the events for no registered BMC, None keeps them in
+                the unrouted EventLog.
+            max_connections (int): Connections served at the same time, more
+                are closed as they arrive, 0 for no limit.
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.socket.bind(address)
+        except OSError:
+            self.socket.close()
+            raise
+        self.server_address = self.socket.getsockname()
+        self.context = context
+        self.fallback = fallback
+        self.max_connections = max_connections
+        self.lock = threading.RLock()
+        self.paths = {}
+        self.contexts = {}
+        self.targets = {}
+        self.unrouted = EventLog()
+        self.unknown = 0
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.watcher = None
+        # The writer and task of every open connection
+        self.connections = {}
+        self.counters = dict.fromkeys(
+            ('connections', 'peak', 'accepted', 'refused', 'handshakes',
+             'resumed', 'requests', 'bytes', 'errors', 'timeouts'), 0)
+        self.counters.update(dict.fromkeys(('lag', 'handler'), 0.0))
+
+    def start(self):
+        """Serve from an event loop in a daemon thread."""
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run, name="EventListener",
+                                       daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.serve(), self.loop).result()
+
+    def run(self):
+        """Run the event loop until shutdown() stops it."""
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    async def serve(self):
+        """Start serving the connections of the listening socket."""
+        options = {'ssl_handshake_timeout': HANDSHAKE_TIMEOUT} if self.context else {}
+        self.server = await asyncio.start_server(
+            self.handle, sock=self.socket, ssl=self.context,
+            backlog=REQUEST_QUEUE_SIZE, limit=MAX_HEADER_SIZE, **options)
+        self.watcher = asyncio.ensure_future(self.watch_lag())
+
+    async def watch_lag(self):
+        """
+        Measure how late the event loop wakes up, when it is busy the
+        connections wait in the kernel.
+        """
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = self.loop.time() - start - LAG_INTERVAL
+            self.counters['lag'] = max(self.counters['lag'], lag)
+
+    def shutdown(self):
+        """Close the connections and stop the event loop."""
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop = None
+
+    async def stop(self):
+        """Close the connections and wait for their tasks to finish."""
+        self.server.close()
+        self.watcher.cancel()
+        # No TLS close_notify, a BMC may never answer it
+        for writer in self.connections:
+            writer.transport.abort()
+        if self.connections:
+            await asyncio.wait(list(self.connections.values()),
+                               timeout=HANDSHAKE_TIMEOUT)
+
+    def server_close(self):
+        """Close the listening socket."""
+        self.socket.close()
+
+    def stats(self, reset=False):
+        """
+        Returns the counters of the listener: the connections open now, the
+        peak of them, and those accepted, refused over max_connections, and
+        closed after IDLE_TIMEOUT; the TLS handshakes and how many resumed a
+        session; the requests, the bytes of their payloads, and the failed
+        ones; and the largest event loop lag and time handing a payload to its
+        BMC, in seconds. reset starts the peaks over.
+        """
+        stats = dict(self.counters)
+        if reset:
+            for key in PEAKS:
+                self.counters[key] = type(self.counters[key])()
+            self.counters['peak'] = self.counters['connections']
+        return stats
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one connection until it is closed."""
+        counters = self.counters
+        client = (writer.get_extra_info('peername') or ("?",))[0]
+        if self.max_connections and counters['connections'] >= self.max_connections:
+            counters['refused'] += 1
+            writer.transport.abort()
+            return
+
+        ssl_object = writer.get_extra_info('ssl_object')
+        if ssl_object is not None:
+            counters['handshakes'] += 1
+            if ssl_object.session_reused:
+                counters['resumed'] += 1
+        counters['accepted'] += 1
+        counters['connections'] += 1
+        counters['peak'] = max(counters['peak'], counters['connections'])
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while await self.serve_request(reader, writer, client):
+                pass
+        except asyncio.TimeoutError:
+            counters['timeouts'] += 1
+        except asyncio.IncompleteReadError as e:
+            # A connection closed between requests is not an error
+            if e.partial:
+                counters['errors'] += 1
+                logger.debug("Event from %s cut off", client)
+        except (asyncio.LimitOverrunError, ConnectionError, ssl.SSLError,
+                ValueError) as e:
+            counters['errors'] += 1
+            logger.debug("Event from %s failed: %s", client, e)
+        finally:
+            self.connections.pop(writer, None)
+            counters['connections'] -= 1
+            writer.close()
+
+    async def serve_request(self, reader, writer, client):
+        """
+        Serve the next request of a connection.
+
+        Returns:
+            keep_alive (bool): True if the connection stays open.
+        """
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+        lines = head.decode('latin-1').split('\r\n')
+        method, path, version = lines[0].split()
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('expect', '').lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        if headers.get('transfer-encoding', '').lower() == "chunked":
+            body = await asyncio.wait_for(read_chunked(reader), IDLE_TIMEOUT)
+        else:
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY_SIZE:
+                raise ValueError("body of %d bytes too large" % length)
+            body = await asyncio.wait_for(reader.readexactly(length), IDLE_TIMEOUT)
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == "keep-alive" or (
+            version == "HTTP/1.1" and connection != "close")
+        if method == "POST":
+            status = "200 OK"
+            start = time.monotonic()
+            try:
+                self.route(path, body, client)
+            except Exception: # pylint: disable=broad-except
+                # The event is still acknowledged, BMCs such as iLO delete a
+                # subscription whose deliveries keep failing
+                self.counters['errors'] += 1
+                logger.debug("Event from %s failed", client, exc_info=True)
+            self.counters['handler'] = max(self.counters['handler'],
+                                           time.monotonic() - start)
+        else:
+            status = "501 Not Implemented"
+        logger.debug('%s: "%s %s %s" %s', client, method, path, version, status)
+        self.counters['requests'] += 1
+        self.counters['bytes'] += len(body)
+        writer.write(("HTTP/1.1 %s\r\nContent-Length: 0\r\n%s\r\n" % (
+            status, "" if keep_alive else "Connection: close\r\n")).encode())
+        await writer.drain()
+        return keep_alive
+
+    def register(self, bmc, path=None, context=None, callback=None, keep=True):
+        """
+        Route the events POSTed to path, destination_path(bmc) if None, or
+        sent with the subscription Context context to bmc.
+
+        Parameters:
+            bmc (string): BMC name or IP.
+            path (string): Destination path of the subscription of bmc.
+            context (string): Context of the subscription of bmc.
+            callback (function): Called with bmc and each raw payload.
+            keep (bool): Parse the events and keep them in an EventLog, False
+                for streams like telemetry that only the callback looks at.
+
+        Returns:
+            log (object): EventLog of the events of bmc, None if not kept.
+        """
+        log = EventLog() if keep else None
+        with self.lock:
+            self.unregister(bmc)
+            self.paths[path or destination_path(bmc)] = bmc
+            if context:
+                self.contexts[context] = bmc
+            self.targets[bmc] = (log, callback)
+        return log
+
+    def unregister(self, bmc):
+        """Stop routing events to bmc."""
+        with self.lock:
+            self.targets.pop(bmc, None)
+            for routes in (self.paths, self.contexts):
+                for key in [key for key, value in routes.items() if value == bmc]:
+                    del routes[key]
+
+    def log(self, bmc):
+        """Returns the EventLog of bmc, None if it is not registered or kept."""
+        with self.lock:
+            return self.targets.get(bmc, (None, None))[0]
+
+    def route(self, path, body, client=None):
+        """Hand the payload body POSTed to path by client to its BMC."""
+        events = None
+        with self.lock:
+            bmc = self.paths.get(path.split('?')[0])
+        if bmc is None and self.contexts:
+            events = parse_events(body)
+            context = events[0].get('Context') if events else None
+            with self.lock:
+                bmc = self.contexts.get(context)
+
+        with self.lock:
+            target = self.targets.get(bmc)
+            if target is None:
+                self.unknown += 1
+        if target is None:
+            if self.fallback is not None:
+                self.fallback(client, path, body)
+                return
+            target = (self.unrouted, None)
+        log, callback = target
+        if callback is not None:
+            callback(bmc, body)
+        if log is not None:
+            log.add(parse_events(body) if events is None else events)
+
+
+def get_listener(address, context=None):
+    """
+    Returns the EventListener of address, starting it if it is not running
+    yet. The context of the first call decides if it serves https.
+    """
+    with listeners_lock:
+        listener = listeners.get(address)
+        if listener is None:
+            listener = EventListener(address, context)
+            listener.start()
+            listeners[address] = listener
+        return listener
+
+
+def stop_listeners():
+    """Shut down all the listeners get_listener() started."""
+    with listeners_lock:
+        for listener in listeners.values():
+            listener.shutdown()
+            listener.server_close()
+        listeners.clear()
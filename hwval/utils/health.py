@@ -20,32 +20,36 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-from utils.debug import dbgPrint, dbgLow
+from utils.results import recordResult
+from utils.results import sevOK, sevInfo, sevWarning, sevError
 
 def printOK(msg):
-    r""" printOK(msg) - Prints the message with an OK """
-    dbgPrint(dbgLow, "\033[1;32m%-50s\tOK\033[0m" % msg)
+    r""" printOK(msg) - Records the test msg as OK """
+    recordResult(sevOK, msg)
 
 def printWarning(msg):
-    r""" printWarning(msg) - Prints the message with a Warning"""
-    print("\033[1;33m%-50s\tWarning\033[0m" % msg)
+    r""" printWarning(msg) - Records the test msg as a Warning"""
+    recordResult(sevWarning, msg)
 
 def printExtraWarning(label, msg):
-    r""" printExtraWarning(label, msg) - Prints a label and then the message """
-    dbgPrint(dbgLow, "\033[1;33m%50s\t%s\033[0m" % (label, msg))
+    r""" printExtraWarning(label, msg) - Records the message for a label of the
+    last test """
+    recordResult(sevWarning, field=label, message=msg)
 
 def printError(msg):
-    r""" printNotHealthy(msg) - Prints the message with a Error"""
-    print("\033[1;31m%-50s\tError\033[0m" % msg)
+    r""" printError(msg) - Records the test msg as an Error"""
+    recordResult(sevError, msg)
 
 def printExtraError(label, msg):
-    r""" printExtraHealth(label, msg) - Prints a label and then the message """
-    dbgPrint(dbgLow, "\033[1;31m%50s\t%s\033[0m" % (label, msg))
+    r""" printExtraError(label, msg) - Records the message for a label of the
+    last test """
+    recordResult(sevError, field=label, message=msg)
 
 def printInfo(msg):
-    r""" printInfo(msg) - Prints the message with a Info"""
-    print("\033[1;35m%-50s\tInfo\033[0m" % msg)
+    r""" printInfo(msg) - Records the test msg as Info"""
+    recordResult(sevInfo, msg)
 
 def printExtraInfo(label, msg):
-    r""" printExtraInfo(label, msg) - Prints a label and then the message """
-    dbgPrint(dbgLow, "\033[1;35m%50s\t%s\033[0m" % (label, msg))
+    r""" printExtraInfo(label, msg) - Records the message for a label of the
+    last test """
+    recordResult(sevInfo, field=label, message=msg)
@@ -23,12 +23,14 @@
 #
 # Local modification of original source
 
-""" pdsh/SLURM style hostlist generator """
 
-# pylint: disable=too-many-locals, too-many-branches
+""" pdsh/SLURM style hostlist generator """
 
 import re
 
+BRACKET_RE = re.compile(r'\[([^\[\]]*)\]')
+NUMBER_RE = re.compile(r'(\d+)')
+
 def split_nodelist(nodelist):
     """
     split_nodelist takes a compressed hostlist string and returns an array of
@@ -36,18 +38,103 @@ def split_nodelist(nodelist):
     :param: nodelist: The hostlist string.
     :return: An array of components with expansions in place.
     """
-    line = nodelist.replace(',', ' ')
-    add_comma = False
-    index = 0
-    for char in line:
-        if char in '[':
-            add_comma = True
-        if char in ']':
-            add_comma = False
-        if char in ' ' and add_comma:
-            line = line[:index] + ',' + line[index+1:]
-        index = index + 1
-    return line.split(' ')
+    components = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(nodelist):
+        if char == '[':
+            depth = depth + 1
+        elif char == ']':
+            depth = depth - 1
+            if depth < 0:
+                raise ValueError("Unbalanced ']' in hostlist: %s" % nodelist)
+        elif char in ', ' and depth == 0:
+            if index > start:
+                components.append(nodelist[start:index])
+            start = index + 1
+    if depth != 0:
+        raise ValueError("Unbalanced '[' in hostlist: %s" % nodelist)
+    if len(nodelist) > start:
+        components.append(nodelist[start:])
+    return components
+
+
+def parse_ranges(spec, nodelist):
+    """
+    parse_ranges takes the contents of one []s expansion and returns its ranges
+    in ascending order.
+    :param: spec: The expansion without []s, such as "1-3,5,07-09".
+    :param: nodelist: The hostlist string, for error messages.
+    :return: A list of (first, last, width) tuples. width is the zero padded
+             width of the numbers, 0 for no padding.
+    """
+    ranges = []
+    for elem in spec.split(','):
+        bounds = elem.split('-')
+        if len(bounds) > 2 or not all(b.isdigit() for b in bounds):
+            raise ValueError("Invalid range '%s' in hostlist: %s" %
+                             (elem, nodelist))
+        width = len(bounds[0]) if bounds[0].startswith('0') else 0
+        first = int(bounds[0])
+        last = int(bounds[-1])
+        if last < first:
+            raise ValueError("Invalid range '%s' in hostlist: %s" %
+                             (elem, nodelist))
+        ranges.append((first, last, width))
+    ranges.sort()
+    return ranges
+
+
+def parse_node(node, nodelist):
+    """
+    parse_node splits one component of a hostlist into its literal text and
+    expansions.
+    :param: node: The component, such as "x[1000-1003]c[0-7]s0b0n[0-1]".
+    :param: nodelist: The hostlist string, for error messages.
+    :return: A list of strings and range lists, see parse_ranges.
+    """
+    segments = []
+    for index, part in enumerate(BRACKET_RE.split(node)):
+        if index % 2:
+            segments.append(parse_ranges(part, nodelist))
+        elif part:
+            segments.append(part)
+    return segments
+
+
+def expand_segments(segments, prefix=''):
+    """
+    expand_segments yields every host of a parsed component, the rightmost
+    expansion varying fastest.
+    :param: segments: The parsed component, see parse_node.
+    :param: prefix: The text of the segments already expanded.
+    :return: A generator of hosts.
+    """
+    if not segments:
+        yield prefix
+        return
+
+    first = segments[0]
+    if isinstance(first, str):
+        yield from expand_segments(segments[1:], prefix + first)
+        return
+
+    for low, high, width in first:
+        for num in range(low, high + 1):
+            yield from expand_segments(segments[1:],
+                                       prefix + str(num).zfill(width))
+
+
+def iter_expand(nodelist):
+    """
+    iter_expand takes in a compressed hostlist string and lazily yields all
+    hosts listed. Expansions may appear anywhere in a host, any number of
+    times, e.g. x[1000-1003]c[0-7]s[0-7]b[0-1]n[0-1].
+    :param: nodelist: The hostlist string.
+    :return: A generator of hosts.
+    """
+    for node in split_nodelist(nodelist):
+        yield from expand_segments(parse_node(node, nodelist))
 
 
 def expand(nodelist):
@@ -56,62 +143,73 @@ def expand(nodelist):
     :param: nodelist: The hostlist string.
     :return: The expanded hostlist string.
     """
-    if nodelist.find('[') == -1:
-        return nodelist
-
-    node_list = split_nodelist(nodelist)
-
-    result_hostlist = []
-    for node in node_list:
-        nodelist_match = r"(\w*-?)\[((,?[0-9]+-?,?-?){0,})\](.*)?"
-        if re.search(nodelist_match, node):
-            match = re.search(nodelist_match, node)
-
-            extra_expand = expand(match.group(4))
-            # holds the ranges of nodes as a string
-            # now we can manipulate the string and cast it to a list of numbers
-            oldstr = str(match.group(2))
-            left_br = oldstr.replace("[", "")
-            right_br = left_br.replace("]", "")
-            num_list = right_br.split(',')
-
-            final_list = []
-            for elem in num_list:
-                # if it is a range of numbers, break it by the hyphen and
-                # create a list
-                if '-' in elem:
-                    tmp_list = elem.replace("-", ",").split(",")
-
-                    rng_list = range(int(tmp_list[0]), int(tmp_list[1]) + 1)
-                    final_list.extend(rng_list)
-                else:
-                    final_list.append(int(elem))
-
-            # put final list in ascending order and append cluster name to
-            # each node number
-            final_list.sort()
-
-            # convert to string array
-            hostlist_tmp = []
-            for elem in final_list:
-                hostlist_tmp.append(str(elem))
-
-            # append hostname to the node numbers
-            hostlist_no_suffix = []
-            for elem in hostlist_tmp:
-                hostlist_no_suffix.append(match.group(1) + elem)
-
-            # append suffix to hostlist if there is one
-            final_hostlist = []
-            for elem in hostlist_no_suffix:
-                if extra_expand:
-                    for extra_elem in "".join(extra_expand.split()).split(','):
-                        final_hostlist.append(elem + extra_elem)
-                else:
-                    final_hostlist.append(elem)
-
-            result_hostlist.append('%s' % ','.join(map(str, final_hostlist)))
+    return ','.join(iter_expand(nodelist))
+
+
+def format_ranges(numbers):
+    """
+    format_ranges folds a set of numbers back into []s expansion form.
+    :param: numbers: A set of (number, width) tuples.
+    :return: The number, or the expansion if there is more than one number.
+    """
+    ranges = []
+    for num, width in sorted(numbers, key=lambda n: (n[0], n[1])):
+        if ranges and ranges[-1][1] == num - 1 and ranges[-1][2] == width:
+            ranges[-1][1] = num
+        else:
+            ranges.append([num, num, width])
+
+    text = []
+    for low, high, width in ranges:
+        if low == high:
+            text.append(str(low).zfill(width))
         else:
-            result_hostlist.append(node)
+            text.append('%s-%s' % (str(low).zfill(width),
+                                   str(high).zfill(width)))
+
+    if len(numbers) == 1:
+        return text[0]
+    return '[%s]' % ','.join(text)
 
-    return ','.join(result_hostlist)
+
+def compress(hosts):
+    """
+    compress folds a list of hosts into a compressed hostlist string, the
+    reverse of expand. Hosts that only differ in one number are folded into
+    one expansion, one number position at a time starting from the last, so
+    the expansion of x[1000-1003]c[0-7]s[0-7]b[0-1]n[0-1] compresses back to
+    that string.
+    :param: hosts: An iterable of hosts.
+    :return: The compressed hostlist string.
+    """
+    # Each host becomes its literal text and a frozenset of (number, width)
+    # for each number in it
+    groups = {}
+    singles = {}
+    for host in hosts:
+        parts = NUMBER_RE.split(host)
+        numbers = []
+        for num in parts[1::2]:
+            if num not in singles:
+                width = len(num) if num.startswith('0') and len(num) > 1 else 0
+                singles[num] = frozenset([(int(num), width)])
+            numbers.append(singles[num])
+        groups.setdefault(tuple(parts[0::2]), set()).add(tuple(numbers))
+
+    result = []
+    for literals, items in sorted(groups.items()):
+        for dim in reversed(range(len(literals) - 1)):
+            folded = {}
+            for numbers in items:
+                key = numbers[:dim] + numbers[dim + 1:]
+                folded.setdefault(key, set()).update(numbers[dim])
+            items = set(key[:dim] + (frozenset(nums),) + key[dim:]
+                        for key, nums in folded.items())
+
+        for numbers in sorted(items, key=lambda i: [sorted(n) for n in i]):
+            text = literals[0]
+            for nums, literal in zip(numbers, literals[1:]):
+                text = text + format_ranges(nums) + literal
+            result.append(text)
+
+    return ','.join(result)
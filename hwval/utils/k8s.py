@@ -20,13 +20,17 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-from kubernetes import client, config
-
 from utils.debug import dbgPrint, dbgMed
 
-config.load_kube_config()
-k8sClient = client.CoreV1Api()
+# Created on first use so validations that do not need kubernetes, such as
+# redfish against an IP:port BMC, run without the package and a kube config
+k8sClient = None
 
 def getK8sClient():
+    global k8sClient
     dbgPrint(dbgMed, "getK8sClient")
+    if k8sClient is None:
+        from kubernetes import client, config
+        config.load_kube_config()
+        k8sClient = client.CoreV1Api()
     return k8sClient
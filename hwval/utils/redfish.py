@@ -22,18 +22,125 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import requests
+import json
 import re
+import threading
+import time
 from requests.auth import HTTPBasicAuth
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import RequestException, Timeout
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 import urllib3
 
 from utils.debug import dbgPrint, setDbgLevel, dbgMed, dbgHigh
+from utils.debug import inheritOutputBuffer
 from utils.health import printWarning, printExtraWarning
 from utils.health import printError, printExtraError
+from utils.results import inheritResultContext
+from utils.timing import TimedHTTPAdapter, TimedSession
+from utils import bmc_profile
+from utils.resilience import BREAKER, retry_policy
 import config
 
+"""
+One HTTP session is kept per BMC for the whole run so every call to the same
+BMC reuses already established (keep-alive) TLS connections instead of doing a
+new handshake per URI. Sessions must be released with closeRedfishSessions().
+"""
+sessionLock = threading.Lock()
+sessions = {}
+
+def getRedfishSession(targPath):
+    r""" getRedfishSession(targPath) - returns the session for the BMC in
+    targPath, creating it on first use """
+    bmc = urlsplit(targPath).netloc
+
+    with sessionLock:
+        session = sessions.get(bmc)
+        if session is None:
+            dbgPrint(dbgMed, "getRedfishSession: new session for %s", bmc)
+
+            # A blocking pool caps the number of connections, and so the
+            # number of concurrent requests, to a single BMC.
+            adapter = TimedHTTPAdapter(pool_connections=1,
+                    pool_maxsize=config.rfPoolSize, pool_block=True,
+                    max_retries=retry_policy())
+
+            session = TimedSession()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.auth = HTTPBasicAuth(config.rfUser, config.rfPass)
+            sessions[bmc] = session
+
+    return session
+
+def closeRedfishSessions():
+    r""" closeRedfishSessions() - closes the connections of all BMC sessions """
+    dbgPrint(dbgMed, "closeRedfishSessions")
+
+    with sessionLock:
+        for session in sessions.values():
+            session.close()
+        sessions.clear()
+
+"""
+Successful GET responses are cached for config.rfCacheTTL seconds so that
+resources shared by several validations are fetched from the BMC only once per
+run. Each entry is [time fetched, payload, parsed JSON or None]. A POST or
+DELETE invalidates the entries of the resource it changes.
+"""
+cacheLock = threading.Lock()
+rfCache = {}
+cacheStats = {
+        "hits": 0,
+        "misses": 0,
+        }
+
+def lookupRedfishCache(targPath):
+    r""" lookupRedfishCache(targPath) - returns the fresh cache entry for
+    targPath or None """
+    if config.rfCacheTTL <= 0:
+        return None
+
+    with cacheLock:
+        entry = rfCache.get(targPath)
+        if entry is not None and time.monotonic() - entry[0] < config.rfCacheTTL:
+            cacheStats["hits"] += 1
+            return entry
+        cacheStats["misses"] += 1
+        return None
+
+def storeRedfishCache(targPath, payload, parsed=None):
+    r""" storeRedfishCache(targPath, payload, parsed=None) - caches a GET
+    response and, if already known, its parsed JSON """
+    if config.rfCacheTTL <= 0:
+        return
+
+    with cacheLock:
+        rfCache[targPath] = [time.monotonic(), payload, parsed]
+
+def invalidateRedfishCache(targPath):
+    r""" invalidateRedfishCache(targPath) - drops the cache entries for the
+    resource changed by a request to targPath: the resource, everything below
+    it, and the collection it is a member of """
+    resource = targPath.split("?")[0].split("/Actions/")[0].rstrip("/")
+    parent = resource.rsplit("/", 1)[0]
+
+    with cacheLock:
+        for key in list(rfCache):
+            uri = key.split("?")[0].rstrip("/")
+            if uri == resource or uri == parent or uri.startswith(resource + "/"):
+                dbgPrint(dbgHigh, "invalidateRedfishCache: %s", key)
+                del rfCache[key]
+
+def getRedfishCacheStats():
+    r""" getRedfishCacheStats() - returns the number of cache hits and misses """
+    with cacheLock:
+        return cacheStats["hits"], cacheStats["misses"]
+
 def makeRedfishCall(action, targPath, reqData=None):
-    dbgPrint(dbgMed, "makeRedfishCall %s: %s %s" % (action, targPath, reqData))
+    dbgPrint(dbgMed, "makeRedfishCall %s: %s %s", action, targPath, reqData)
 
     # Until certificates are being used to talk to Redfish endpoints the basic
     # auth method will be used. To do so, SSL verification needs to be turned
@@ -41,33 +148,56 @@ def makeRedfishCall(action, targPath, reqData=None):
     # disables only the IsnsecureRequestWarning.
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-    rfUser = config.rfUser
-    rfPass = config.rfPass
-
     if action == "GET":
-        getHeaders = {
-                'cache-control': 'no-cache',
-                }
-        r = requests.get(url = targPath, headers = getHeaders,
-                auth = HTTPBasicAuth(rfUser, rfPass), verify = False)
-    elif action == "POST":
-        postHeaders = {
+        entry = lookupRedfishCache(targPath)
+        if entry is not None:
+            dbgPrint(dbgMed, "makeRedfishCall %s cached", action)
+            return entry[1], "", ""
+    else:
+        invalidateRedfishCache(targPath)
+
+    bmc = urlsplit(targPath).netloc
+    if BREAKER.is_open(bmc):
+        return None, "Redfish", "Skipped, %s is unreachable" % bmc
+
+    session = getRedfishSession(targPath)
+    timeout = (config.rfConnectTimeout, config.rfReadTimeout)
+
+    try:
+        if action == "GET":
+            getHeaders = {
+                    'cache-control': 'no-cache',
+                    }
+            r = session.get(url = targPath, headers = getHeaders,
+                    verify = False, timeout = timeout)
+        elif action == "POST":
+            postHeaders = {
+                    'cache-control': 'no-cache',
+                    'Content-Type': 'application/json',
+                    }
+            r = session.post(url = targPath, headers = postHeaders,
+                    data = reqData, verify = False, timeout = timeout)
+        elif action == "DELETE":
+            deleteHeaders = {
                 'cache-control': 'no-cache',
-                'Content-Type': 'application/json',
                 }
-        r = requests.post(url = targPath, headers = postHeaders, data = reqData,
-                auth = HTTPBasicAuth(rfUser, rfPass), verify = False)
-    elif action == "DELETE":
-        deleteHeaders = {
-            'cache-control': 'no-cache',
-            }
-        r = requests.delete(url = targPath, headers = deleteHeaders,
-                auth = HTTPBasicAuth(rfUser, rfPass), verify = False)
-    else:
-        return None, "Redfish Operation", "Bad Request"
+            r = session.delete(url = targPath, headers = deleteHeaders,
+                    verify = False, timeout = timeout)
+        else:
+            return None, "Redfish Operation", "Bad Request"
+    except (RequestsConnectionError, Timeout) as e:
+        dbgPrint(dbgMed, "makeRedfishCall %s failed: %s", action, e)
+        if BREAKER.record(bmc, False):
+            dbgPrint(dbgMed, "Circuit open for %s", bmc)
+        return None, "Redfish", "%s unreachable (%s)" % (bmc, type(e).__name__)
+    except RequestException as e:
+        dbgPrint(dbgMed, "makeRedfishCall %s failed: %s", action, e)
+        return None, targPath, "Request failed (%s)" % type(e).__name__
 
-    dbgPrint(dbgMed, "makeRedfishCall %s complete" % action)
-    dbgPrint(dbgHigh, "makeRedfishCall %s Response: %s" % (action, r.text))
+    BREAKER.record(bmc, True)
+
+    dbgPrint(dbgMed, "makeRedfishCall %s complete", action)
+    dbgPrint(dbgHigh, "makeRedfishCall %s Response: %s", action, r.text)
 
     ret = r.text
     if not ret:
@@ -89,18 +219,133 @@ def makeRedfishCall(action, targPath, reqData=None):
         msg = "URI redirection"
         ret = None
 
+    if action == "GET" and ret is not None:
+        storeRedfishCache(targPath, ret)
+
     return ret, label, msg
 
+def getRedfishJSON(targPath):
+    r""" getRedfishJSON(targPath) - GETs targPath and returns the parsed JSON
+    response, label, msg. The response is None on failure. Parsed responses are
+    kept in the cache and shared, callers must not modify them. """
+    payload, label, msg = makeRedfishCall("GET", targPath)
+
+    if payload is None:
+        return None, label, msg
+
+    if not isinstance(payload, str):
+        return None, targPath, "Empty response (%d)" % payload
+
+    with cacheLock:
+        entry = rfCache.get(targPath)
+        if entry is not None and entry[1] is payload and entry[2] is not None:
+            return entry[2], label, msg
+
+    try:
+        response = json.loads(payload)
+    except ValueError:
+        return None, targPath, "Invalid JSON response"
+
+    with cacheLock:
+        entry = rfCache.get(targPath)
+        if entry is not None and entry[1] is payload:
+            entry[2] = response
+
+    return response, label, msg
+
+def getRedfishMembers(bmcName, uris):
+    r""" getRedfishMembers(bmcName, uris) - GETs the member URIs of a collection
+    concurrently and returns the getRedfishJSON() result of each member in the
+    order of uris. At most config.rfPoolSize requests are sent to the BMC at a
+    time. """
+    dbgPrint(dbgMed, "getRedfishMembers %s: %d members", bmcName, len(uris))
+
+    paths = ["https://" + bmcName + uri for uri in uris]
+
+    workers = min(config.rfPoolSize, len(paths))
+    if workers <= 1:
+        return [getRedfishJSON(path) for path in paths]
+
+    getMember = inheritOutputBuffer(inheritResultContext(getRedfishJSON))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(getMember, paths))
+
+def bmcGetter(bmcName):
+    r""" bmcGetter(bmcName) - returns the function utils.bmc_profile GETs the
+    URIs of bmcName with. The GETs go through the cache, so validations that
+    need the same resources reuse them. """
+    def get(uri):
+        return getRedfishJSON("https://" + bmcName + uri)[0]
+
+    return get
+
+def getBMCProfile(bmcName):
+    r""" getBMCProfile(bmcName) - returns the profile of bmcName, see
+    utils.bmc_profile, or None if it could not be probed """
+    return bmc_profile.get_profile(bmcName, bmcGetter(bmcName))
+
+def getRedfishCollection(bmcName, uri, fields=None):
+    r""" getRedfishCollection(bmcName, uri, fields=None) - GETs a collection and
+    its members and returns the getRedfishJSON() result of the collection and a
+    list of (member URI, getRedfishJSON() result) in the order of its Members.
+    If the BMC supports $expand the members come in the same response, limited
+    to fields with $select if given and supported, see
+    bmc_profile.expand_query(). Members it did not expand are fetched with
+    getRedfishMembers(). The member list is empty if the collection has no
+    Members. """
+    query = ""
+    if config.rfExpand:
+        query = bmc_profile.expand_query(bmcName, bmcGetter(bmcName), fields)
+
+    path = "https://" + bmcName + uri
+    rsp = None
+    if query:
+        dbgPrint(dbgMed, "getRedfishCollection checking %s%s", path, query)
+        rsp = getRedfishJSON(path + query)
+        if rsp[0] is None:
+            dbgPrint(dbgMed, "getRedfishCollection %s: %s %s, not expanding",
+                    bmcName, rsp[1], rsp[2])
+            bmc_profile.disable_expand(bmcName)
+            rsp = None
+    if rsp is None:
+        dbgPrint(dbgMed, "getRedfishCollection checking %s", path)
+        rsp = getRedfishJSON(path)
+
+    response = rsp[0]
+    if response is None or not isinstance(response.get("Members"), list):
+        return rsp, []
+
+    members = [m for m in response["Members"] if "@odata.id" in m]
+    uris = [m["@odata.id"] for m in members]
+    rsps = [None] * len(members)
+    walk = []
+    for i, member in enumerate(members):
+        if bmc_profile.is_expanded(member):
+            rsps[i] = (member, "", "")
+            # Only a complete member is the resource a GET would return
+            if "$select=" not in query:
+                storeRedfishCache("https://" + bmcName + uris[i],
+                        json.dumps(member), member)
+        else:
+            walk.append(i)
+
+    if walk:
+        walked = getRedfishMembers(bmcName, [uris[i] for i in walk])
+        for i, memberRsp in zip(walk, walked):
+            rsps[i] = memberRsp
+
+    return rsp, list(zip(uris, rsps))
+
 def convertXnameToBMCName(xname):
     # xname could be an IP address or other style of hostname
     bmcName = xname
 
     m = re.search( # contains nC name OR is sC name OR is cC name
-            'x[0-9]+c[0-7]s[0-9]+b[0-9]+$|x[0-9]+c[0-7]r[0-9]+b[0-9]+$|x[0-9]+c[0-7]b[0-9]+$',
+            '(x[0-9]+c[0-7]s[0-9]+b[0-9]+|x[0-9]+c[0-7]r[0-9]+b[0-9]+|x[0-9]+c[0-7]b[0-9]+)(n[0-9]+)?$',
             xname)
 
-    if m and m.group(0):
-        bmcName = m.group(0)
+    if m and m.group(1):
+        bmcName = m.group(1)
     else:
         m = re.search( # is chassis name OR is router slot name
                 'x[0-9]+c[0-7]$|x[0-9]+c[0-7]r[0-9]+$', xname)
@@ -132,7 +377,7 @@ FIELD = 0
 TYPE = 1
 
 def validateField(name, path, field, data, dType):
-    dbgPrint(dbgMed, "validateField: " + name + " " + field)
+    dbgPrint(dbgMed, "validateField: %s %s", name, field)
     if field in data:
         fType = type(data[field])
         if fType is not dType:
@@ -0,0 +1,203 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""
+Waiting on Redfish events and BMC state, shared by the HMS tools.
+
+Received event payloads are parsed into their events and kept in an EventLog
+that can be waited on. wait_for_state() polls a state, such as the PowerState
+of a node, starting quickly and backing off exponentially up to a cap, and
+polls again at once when a StatusChange or ResourceUpdated event about the
+resource arrives. It returns as soon as the target state is seen, so a test
+takes as long as the hardware does rather than a fixed sleep.
+
+Classes:
+    EventLog
+
+Functions:
+    event_power_state(object) -> string
+    is_state_event(object, string) -> bool
+    parse_events(object) -> list
+    wait_for_state(function, string, object, float, float, function, float,
+                   float, object) -> string, float, float
+
+Misc Variables:
+    STATE_EVENT_TYPES - The EventTypes that announce a change of state
+"""
+
+import json
+import re
+import threading
+import time
+
+STATE_EVENT_TYPES = ("StatusChange", "ResourceUpdated")
+
+# "ServerPoweredOff", "NodePowerOn", "The power state of ... changed to Off."
+POWER_STATE = re.compile(r"\bpower(?:ed)?(?:\s+state\b[^.]*?)?\s+(on|off)\b",
+                         re.IGNORECASE)
+
+
+def parse_events(payload):
+    """
+    The events of a Redfish Event payload, as JSON text, bytes, or decoded.
+    Each event gets the Context of the payload. Returns [] if the payload is
+    not an Event.
+    """
+    if isinstance(payload, (bytes, str)):
+        try:
+            payload = json.loads(payload)
+        except ValueError:
+            return []
+    if not isinstance(payload, dict):
+        return []
+
+    events = payload.get('Events')
+    if not isinstance(events, list):
+        # Some test events are POSTed bare
+        events = [payload] if 'MessageId' in payload else []
+    return [dict(event, Context=payload.get('Context', event.get('Context')))
+            for event in events if isinstance(event, dict)]
+
+
+def event_power_state(event):
+    """The power state, "On" or "Off", an event announces, or None."""
+    text = " ".join(str(part) for part in
+                    [event.get('MessageId'), event.get('Message')] +
+                    list(event.get('MessageArgs') or []) if part)
+    # Split the words of MessageIds like ServerPoweredOff
+    match = POWER_STATE.search(re.sub(r"(?<=[a-z])(?=[A-Z])|[._]", " ", text))
+    return match.group(1).capitalize() if match else None
+
+
+def is_state_event(event, origin=None):
+    """
+    True if event announces a change of state of the resource at the URI
+    origin, or of any resource if origin is None. Events that do not name an
+    OriginOfCondition are taken to be about the resource, and a chassis and a
+    system with the same id, like Chassis/Node0 and Systems/Node0, are the
+    same resource.
+    """
+    if not (event.get('EventType') in STATE_EVENT_TYPES or
+            str(event.get('MessageId', "")).startswith("ResourceEvent.") or
+            event_power_state(event) is not None):
+        return False
+    source = event.get('OriginOfCondition')
+    if isinstance(source, dict):
+        source = source.get('@odata.id')
+    if origin is None or not isinstance(source, str) or not source:
+        return True
+    return source.rstrip('/').rsplit('/', 1)[-1] == origin.rstrip('/').rsplit('/', 1)[-1]
+
+
+class EventLog:
+    """The events received from one source and when they arrived."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.entries = []
+
+    def add(self, events, now=None):
+        """Record events that arrived at time.monotonic() now."""
+        now = time.monotonic() if now is None else now
+        with self.cond:
+            self.entries.extend((now, event) for event in events)
+            self.cond.notify_all()
+
+    def wait(self, since, timeout, match=None, start=0):
+        """
+        Wait up to timeout seconds for an event that arrived at or after the
+        time.monotonic() since, is entry start or later, and for which match
+        returns True. Returns (index, arrival, event) or None.
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while True:
+                for index in range(start, len(self.entries)):
+                    arrival, event = self.entries[index]
+                    if arrival >= since and (match is None or match(event)):
+                        return index, arrival, event
+                start = max(start, len(self.entries))
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+
+
+def wait_for_state(poll, target, log=None, since=None, timeout=300, match=None,
+                   first=0.5, cap=10, stop=None):
+    """
+    Wait for poll() to return target. The first poll is made at once and the
+    time between polls doubles from first up to cap seconds. An event in log
+    for which match returns True makes the next poll happen at once and starts
+    the backoff over.
+
+    Parameters:
+        poll (function): Returns the current state, None if it is unknown.
+        target (string): State to wait for.
+        log (object): EventLog of the events of the resource, or None.
+        since (float): time.monotonic() the change was asked for, now if None.
+        timeout (float): Seconds from since to wait at most.
+        match (function): Selects the events of log that announce a change.
+        first (float): Seconds before the second poll.
+        cap (float): Most seconds between polls.
+        stop (object): threading.Event that ends the wait when set.
+
+    Returns:
+        state (string): The last state polled.
+        event_at (float): time.monotonic() of the first matching event, None
+            if none arrived.
+        state_at (float): time.monotonic() the target state was seen, None if
+            it was not.
+    """
+    since = time.monotonic() if since is None else since
+    deadline = since + timeout
+    delay = first
+    next_event = 0
+    event_at = None
+    state = None
+
+    while True:
+        state = poll()
+        if state == target:
+            return state, event_at, time.monotonic()
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (stop is not None and stop.is_set()):
+            return state, event_at, None
+
+        pause = min(delay, remaining)
+        delay = min(delay * 2, cap)
+        if log is None:
+            if stop is not None:
+                stop.wait(pause)
+            else:
+                time.sleep(pause)
+            continue
+
+        hit = log.wait(since, pause, match, next_event)
+        if hit is not None:
+            next_event = hit[0] + 1
+            if event_at is None:
+                event_at = hit[1]
+            # The state is changing, look again soon
+            delay = first
@@ -0,0 +1,136 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+"""
+Resilience policy of the Redfish requests of the HMS tools.
+
+Requests that failed to connect, and idempotent GETs that timed out or got a
+429, 502, 503, or 504 response, are retried after a randomized exponential
+backoff, or after the Retry-After the BMC asked for, up to a limit. A BMC that
+could not be reached by consecutive requests has its circuit opened: further
+requests to it are skipped at once instead of each waiting out the timeouts,
+until a cooldown has passed and one request may try it again.
+
+The limits are the rf* settings of hwval's config.py, read at each use so the
+command line options of the tools that change them apply.
+
+Classes:
+    CircuitBreaker
+    CircuitOpenError
+    JitteredRetry
+
+Functions:
+    retry_policy() -> object
+
+Misc Variables:
+    BREAKER - The circuit breaker of the run
+"""
+
+import random
+import threading
+import time
+
+import requests
+from urllib3.util.retry import Retry
+
+import config
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised for a request to a BMC whose circuit is open."""
+
+
+class JitteredRetry(Retry):
+    """
+    Retry with a random backoff between 0 and the exponential backoff, so
+    retries of many threads do not hit a busy BMC at the same time, and a
+    Retry-After of at most config.rfRetryAfterMax seconds.
+    """
+
+    def get_backoff_time(self):
+        return random.uniform(0, super().get_backoff_time())
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, config.rfRetryAfterMax)
+
+
+def retry_policy():
+    """
+    Returns the retry policy of Redfish requests. Requests that failed to
+    connect are always retried, requests that were sent only if they are
+    idempotent GETs. Connect errors and timeouts are retried at most
+    config.rfTimeoutRetries times since each can take up to a timeout.
+    """
+    timeout_retries = min(config.rfTimeoutRetries, config.rfRetries)
+    return JitteredRetry(total=config.rfRetries, connect=timeout_retries,
+                         read=timeout_retries, status=config.rfRetries,
+                         backoff_factor=config.rfBackoff,
+                         status_forcelist=[429, 502, 503, 504],
+                         allowed_methods=frozenset(['GET', 'HEAD']),
+                         raise_on_status=False,
+                         respect_retry_after_header=True)
+
+
+class CircuitBreaker:
+    """
+    Counts the consecutive requests that could not reach each BMC and opens
+    its circuit once there are config.rfBreakerThreshold of them. After
+    config.rfBreakerCooldown seconds the circuit is half open: the next
+    request is let through, and one more failure opens it again.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bmcs = {}
+
+    def is_open(self, bmc):
+        """Returns True if requests to bmc should not be sent."""
+        with self.lock:
+            failures, opened = self.bmcs.get(bmc, (0, None))
+            if opened is None:
+                return False
+            if time.monotonic() - opened < config.rfBreakerCooldown:
+                return True
+            self.bmcs[bmc] = (config.rfBreakerThreshold - 1, None)
+            return False
+
+    def record(self, bmc, reachable):
+        """
+        Record whether a request reached bmc. Returns True if this opened
+        its circuit.
+        """
+        with self.lock:
+            if reachable:
+                self.bmcs.pop(bmc, None)
+                return False
+            failures, opened = self.bmcs.get(bmc, (0, None))
+            failures += 1
+            tripped = failures >= config.rfBreakerThreshold and opened is None
+            if tripped:
+                opened = time.monotonic()
+            self.bmcs[bmc] = (failures, opened)
+            return tripped
+
+
+BREAKER = CircuitBreaker()
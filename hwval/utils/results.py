@@ -0,0 +1,199 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+import time
+
+from collections import namedtuple
+
+from utils.debug import getDbgLevel, dbgLow, outPrint
+from utils.hostlist import compress
+
+"""
+Severities of a result
+"""
+sevOK = "OK"
+sevInfo = "Info"
+sevWarning = "Warning"
+sevError = "Error"
+
+"""
+One validation result. field is None for the result of a test and set for
+each detail recorded after it. latency is the seconds since the test started.
+"""
+Result = namedtuple("Result", ["time", "module", "test", "xname", "uri",
+        "field", "severity", "message", "latency"])
+
+"""
+The module, xname, test, and start time the calling thread is validating.
+running is the test whose requests are being sent.
+"""
+resultContext = threading.local()
+
+def setResultContext(module=None, xname=None):
+    r""" setResultContext(module, xname) - results recorded by the calling
+    thread are for this module and xname """
+    resultContext.module = module
+    resultContext.xname = xname
+    resultContext.test = None
+    resultContext.running = None
+    resultContext.start = time.monotonic()
+
+def startResultTimer(test=None):
+    r""" startResultTimer(test) - the next test of the calling thread starts
+    now. test names it for the requests it sends. """
+    resultContext.start = time.monotonic()
+    resultContext.running = test
+
+def inheritResultContext(func):
+    r""" inheritResultContext(func) - returns func wrapped so that, when run in
+    another thread, it works for the calling thread's module, xname, and test """
+    context = dict(vars(resultContext))
+
+    def wrapper(*args, **kwargs):
+        vars(resultContext).update(context)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            vars(resultContext).clear()
+
+    return wrapper
+
+def recordResult(severity, test=None, field=None, message=None):
+    r""" recordResult(severity, test, field, message) - records the result of a
+    test or, when field is set, a detail of the last test recorded. A field
+    starting with a Redfish URI, such as "/redfish/v1/Chassis .Members", is
+    split into uri and field, "/redfish/v1/Chassis" is only a uri. """
+    if field is None:
+        resultContext.test = test
+    else:
+        test = getattr(resultContext, 'test', None)
+
+    uri = None
+    if isinstance(field, str) and field.startswith('/'):
+        path, _, rest = field.partition(' ')
+        if rest == '' or rest.startswith('.'):
+            uri = path
+            field = rest[1:] or None
+
+    start = getattr(resultContext, 'start', None)
+    latency = None
+    if start is not None:
+        latency = time.monotonic() - start
+
+    result = Result(time.time(), getattr(resultContext, 'module', None), test,
+            getattr(resultContext, 'xname', None), uri, field, severity,
+            message, latency)
+
+    for sink in resultSinks:
+        sink.record(result)
+
+class ConsoleSink:
+    r""" ConsoleSink() - prints results in color. Errors, warnings, and info
+    are always printed, OK results and details only with -v. """
+    colors = {
+            sevOK: "1;32",
+            sevInfo: "1;35",
+            sevWarning: "1;33",
+            sevError: "1;31",
+            }
+
+    def record(self, result):
+        color = self.colors[result.severity]
+        if result.field is None and result.uri is None:
+            if result.severity == sevOK and getDbgLevel() < dbgLow:
+                return
+            outPrint("\033[%sm%-50s\t%s\033[0m" % (color, result.test,
+                    result.severity))
+        elif getDbgLevel() >= dbgLow:
+            label = result.field
+            if result.uri is not None:
+                label = result.uri
+                if result.field is not None:
+                    label = label + " ." + result.field
+            outPrint("\033[%sm%50s\t%s\033[0m" % (color, label,
+                    result.message))
+
+    def close(self):
+        pass
+
+class JSONLinesSink:
+    r""" JSONLinesSink(filename) - writes each result as a JSON object on its
+    own line of filename """
+    def __init__(self, filename):
+        self.lock = threading.Lock()
+        self.file = open(filename, "w")
+
+    def record(self, result):
+        line = json.dumps(result._asdict(), default=str)
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class SummarySink:
+    r""" SummarySink() - counts the test results of each module and test and
+    prints them as a table, with the xnames that had errors, when closed """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.errors = {}
+
+    def record(self, result):
+        if result.field is not None or result.uri is not None:
+            return
+        key = (result.module or "", result.test)
+        with self.lock:
+            counts = self.counts.setdefault(key, {})
+            counts[result.severity] = counts.get(result.severity, 0) + 1
+            if result.severity == sevError and result.xname is not None:
+                self.errors.setdefault(key, []).append(result.xname)
+
+    def close(self):
+        if not self.counts:
+            return
+        severities = [sevOK, sevWarning, sevError, sevInfo]
+        print("%-10s %-40s %6s %8s %6s %6s  %s" % (("Module", "Test") +
+                tuple(severities) + ("Errors",)))
+        for key in sorted(self.counts):
+            counts = self.counts[key]
+            line = "%-10s %-40s %6d %8d %6d %6d  %s" % (key +
+                    tuple(counts.get(s, 0) for s in severities) +
+                    (compress(self.errors.get(key, [])),))
+            print(line.rstrip())
+
+"""
+Every result is passed to each of these. Add sinks with addResultSink().
+"""
+resultSinks = [ConsoleSink()]
+
+def addResultSink(sink):
+    r""" addResultSink(sink) - also passes every result to sink """
+    resultSinks.append(sink)
+
+def closeResultSinks():
+    r""" closeResultSinks() - closes every sink, printing any summaries """
+    for sink in resultSinks:
+        sink.close()
@@ -0,0 +1,129 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+"""
+Compact time series for long running polls of many BMCs.
+
+A RingBuffer keeps the latest values of a series in an array.array, a few
+bytes a value, rather than in a list of objects, so an hours long soak of a
+cabinet of BMCs with dozens of sensors each stays small and the oldest values
+are overwritten in place. SensorSeries adds what tells a live sensor from a
+stale one: the last reading, when it last changed, and how many readings in a
+row were the same.
+
+Classes:
+    RingBuffer
+    SensorSeries
+
+Functions:
+    summarize(iterable) -> int, float, float, float
+"""
+
+import math
+from array import array
+
+
+def summarize(values):
+    """
+    Returns the count, min, max, and mean of values, NaN values left out. The
+    min, max, and mean are NaN if there are none.
+    """
+    count = 0
+    total = 0.0
+    low = high = math.nan
+    for value in values:
+        if value != value: # NaN
+            continue
+        if count == 0:
+            low = high = value
+        elif value < low:
+            low = value
+        elif value > high:
+            high = value
+        count += 1
+        total += value
+    return count, low, high, total / count if count else math.nan
+
+
+class RingBuffer:
+    """
+    The latest size values of a series in an array of typecode, 'd' for
+    doubles and 'f' for floats, which take half the space.
+    """
+
+    def __init__(self, size, typecode='d'):
+        self.size = max(int(size), 1)
+        self.data = array(typecode)
+        # Values appended so far, the next one goes to count % size
+        self.count = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def append(self, value):
+        """Add value, overwriting the oldest one once the buffer is full."""
+        if len(self.data) < self.size:
+            self.data.append(value)
+        else:
+            self.data[self.count % self.size] = value
+        self.count += 1
+
+    def latest(self, n=None):
+        """Returns an array of the latest n values, all if None, oldest first."""
+        start = self.count % self.size if len(self.data) == self.size else 0
+        ordered = self.data[start:] + self.data[:start]
+        if n is None or n >= len(ordered):
+            return ordered
+        return ordered[len(ordered) - n:]
+
+    def stats(self, n=None):
+        """Returns the summarize() of the latest n values, all if None."""
+        return summarize(self.latest(n))
+
+
+class SensorSeries(RingBuffer):
+    """
+    Readings of one sensor, as floats, with the time the reading last changed.
+    """
+
+    def __init__(self, size, typecode='f'):
+        super().__init__(size, typecode)
+        self.last = None
+        self.changed = None
+        # Readings in a row equal to the one before them
+        self.repeats = 0
+
+    def add(self, value, now):
+        """Add the reading value taken at now, in time.monotonic() seconds."""
+        if value == self.last:
+            self.repeats += 1
+        else:
+            self.last = value
+            self.changed = now
+            self.repeats = 0
+        self.append(value)
+
+    def unchanged(self, now):
+        """Returns the seconds the reading has been the same at now."""
+        return 0.0 if self.changed is None else now - self.changed
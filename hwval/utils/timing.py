@@ -0,0 +1,364 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+
+import ipaddress
+import json
+import re
+import socket
+import threading
+import time
+
+from collections import namedtuple
+from requests import RequestException, Session
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from utils.results import resultContext
+
+"""
+Redfish collections whose next path segment is a member id
+"""
+rfCollections = {
+        "Accounts", "Certificates", "Chassis", "Controls", "Drives", "Entries",
+        "EthernetInterfaces", "FirmwareInventory", "LogServices", "Managers",
+        "Memory", "NetworkAdapters", "NetworkInterfaces", "PCIeDevices",
+        "PCIeFunctions", "Processors", "Registries", "Sensors", "Sessions",
+        "SoftwareInventory", "Storage", "Subscriptions", "Systems", "Volumes",
+        }
+
+"""
+Paths that identify the vendor of a BMC, checked in this order
+"""
+vendorPaths = [
+        (re.compile(r"/redfish/v1/Chassis/(Enclosure|Node\d*|Blade\d*)(/|$)"), "Cray"),
+        (re.compile(r"/redfish/v1/Chassis/Self(/|$)"), "Gigabyte"),
+        (re.compile(r"/redfish/v1/(Registries/iLO|Chassis/1)(/|$)"), "HPE"),
+        (re.compile(r"/redfish/v1/Chassis/RackMount(/|$)"), "Intel"),
+        (re.compile(r"/redfish/v1/(Registries/OpenBMC|Chassis/BMC_0)(/|$)"), "OpenBMC"),
+        ]
+
+"""
+Upper bounds in seconds of the latency histogram buckets
+"""
+histogramBounds = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+"""
+One timed request. start is the seconds since profileEpoch, the other times
+are seconds. dns, connect, and tls are 0 on a kept-alive connection.
+"""
+RequestRecord = namedtuple("RequestRecord", ["start", "method", "uri", "path",
+        "bmc", "status", "bytes", "dns", "connect", "tls", "ttfb", "total",
+        "retries", "thread", "test", "error"])
+
+"""
+Requests are only recorded once enableProfile() is called
+"""
+profileEnabled = False
+profileLock = threading.Lock()
+profileRecords = []
+profileEpoch = time.perf_counter()
+
+"""
+Connection phase times of the request the calling thread is sending
+"""
+phaseTimings = threading.local()
+
+def enableProfile():
+    r""" enableProfile() - start recording requests """
+    global profileEnabled
+    profileEnabled = True
+
+def uriTemplate(path):
+    r""" uriTemplate(path) - returns path without its query string and with the
+    member ids of collections replaced by {id} """
+    segments = path.split('?')[0].rstrip('/').split('/')
+    for i in range(1, len(segments)):
+        if segments[i - 1] in rfCollections and segments[i] != "Actions":
+            segments[i] = "{id}"
+    return '/'.join(segments) or "/"
+
+def bmcVendor(paths):
+    r""" bmcVendor(paths) - returns the vendor of a BMC from the paths found
+    on it, or "Unknown" """
+    for pattern, vendor in vendorPaths:
+        for path in paths:
+            if pattern.match(path):
+                return vendor
+    return "Unknown"
+
+def getPhaseTimings():
+    r""" getPhaseTimings() - returns the connection phase times of the calling
+    thread's request """
+    if not hasattr(phaseTimings, 'dns'):
+        resetPhaseTimings()
+    return phaseTimings
+
+def resetPhaseTimings():
+    r""" resetPhaseTimings() - the calling thread starts a new request """
+    phaseTimings.dns = 0.0
+    phaseTimings.connect = 0.0
+    phaseTimings.tls = 0.0
+
+class TimedConnectionMixin:
+    r""" Adds the DNS lookup, TCP connect, and TLS handshake times of new
+    connections to the calling thread's phase timings """
+
+    def _new_conn(self):
+        timings = getPhaseTimings()
+        host = getattr(self, '_dns_host', None)
+        resolved = None
+        if host:
+            try:
+                ipaddress.ip_address(host.strip('[]'))
+            except ValueError:
+                start = time.perf_counter()
+                try:
+                    resolved = socket.getaddrinfo(host, self.port, 0,
+                            socket.SOCK_STREAM)[0][4][0]
+                except OSError:
+                    resolved = None
+                timings.dns += time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            if resolved is None:
+                return super()._new_conn()
+            # Connect to the address already looked up, the host name is
+            # still used for SNI and certificate checks
+            self._dns_host = resolved
+            try:
+                return super()._new_conn()
+            except OSError:
+                self._dns_host = host
+                return super()._new_conn()
+            finally:
+                self._dns_host = host
+        finally:
+            timings.connect += time.perf_counter() - start
+
+    def connect(self):
+        timings = getPhaseTimings()
+        before = timings.dns + timings.connect
+        start = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        timings.tls += max(0.0, elapsed - (timings.dns + timings.connect - before))
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    r""" HTTPAdapter whose new connections are timed """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+                'http': TimedHTTPConnectionPool,
+                'https': TimedHTTPSConnectionPool,
+                }
+
+class TimedSession(Session):
+    r""" Session that records its requests while profiling is enabled """
+
+    def request(self, method, url, *args, **kwargs):
+        if not profileEnabled:
+            return super().request(method, url, *args, **kwargs)
+
+        resetPhaseTimings()
+        timings = getPhaseTimings()
+        start = time.perf_counter()
+        try:
+            r = super().request(method, url, *args, **kwargs)
+        except RequestException as e:
+            recordRequest(start, method, url, None, 0, timings, 0.0,
+                    time.perf_counter() - start, 0, type(e).__name__)
+            raise
+        total = time.perf_counter() - start
+
+        setup = timings.dns + timings.connect + timings.tls
+        ttfb = max(0.0, r.elapsed.total_seconds() - setup)
+        retries = getattr(getattr(r.raw, 'retries', None), 'history', None) or ()
+        recordRequest(start, method, url, r.status_code, len(r.content),
+                timings, ttfb, total, len(retries) + len(r.history), None)
+        return r
+
+def recordRequest(start, method, url, status, size, timings, ttfb, total,
+        retries, error):
+    r""" recordRequest(start, method, url, status, size, timings, ttfb, total,
+    retries, error) - adds a request to the profile """
+    parts = urlsplit(url)
+    record = RequestRecord(start - profileEpoch, method.upper(),
+            uriTemplate(parts.path), parts.path, parts.netloc, status, size,
+            timings.dns, timings.connect, timings.tls, ttfb, total, retries,
+            threading.get_ident(), getattr(resultContext, 'running', None), error)
+    with profileLock:
+        profileRecords.append(record)
+
+def percentile(values, pct):
+    r""" percentile(values, pct) - returns the pct percentile of the sorted
+    values, 0 if there are none """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))]
+
+def mean(values):
+    r""" mean(values) - returns the mean of values, 0 if there are none """
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
+
+def profileVendors(records):
+    r""" profileVendors(records) - returns the vendor of each BMC in records """
+    paths = {}
+    for r in records:
+        found = paths.setdefault(r.bmc, [])
+        if r.status is not None and r.status < 400:
+            found.append(r.path)
+    return {bmc: bmcVendor(p) for bmc, p in paths.items()}
+
+def profileReport(top=15):
+    r""" profileReport(top) - returns the lines of the profile report: the top
+    slowest URI templates, the requests each test sent, per vendor latency
+    histograms, connection phases, and statuses and retries """
+    with profileLock:
+        records = list(profileRecords)
+    if not records:
+        return ["Request profile: no requests"]
+
+    vendors = profileVendors(records)
+    wall = max(r.start + r.total for r in records) - min(r.start for r in records)
+    busy = sum(r.total for r in records)
+    lines = ["Request profile: %d requests to %d BMCs, %.2f s wall, %.2f s in "
+            "requests" % (len(records), len(vendors), wall, busy)]
+
+    byUri = {}
+    for r in records:
+        byUri.setdefault(r.method + " " + r.uri, []).append(r)
+    lines.append("")
+    lines.append("%-56s %6s %9s %9s %8s %8s" % ("Slowest URIs", "Count",
+            "Total(s)", "Mean(ms)", "p99(ms)", "KiB"))
+    ranked = sorted(byUri.items(), key=lambda i: -sum(r.total for r in i[1]))
+    for uri, recs in ranked[:top]:
+        times = sorted(r.total for r in recs)
+        total = sum(times)
+        lines.append("%-56.56s %6d %9.2f %9.1f %8.1f %8.1f" % (uri, len(recs),
+                total, total / len(recs) * 1000, percentile(times, 99) * 1000,
+                sum(r.bytes for r in recs) / 1024))
+
+    # Only hwval runs its requests inside validations
+    byTest = {}
+    for r in records:
+        byTest.setdefault(r.test or "-", []).append(r)
+    if list(byTest) != ["-"]:
+        lines.append("")
+        lines.append("%-40s %6s %9s %9s" % ("Test", "Reqs", "Total(s)",
+                "Mean(ms)"))
+        for test, recs in sorted(byTest.items(),
+                key=lambda i: -sum(r.total for r in i[1])):
+            total = sum(r.total for r in recs)
+            lines.append("%-40.40s %6d %9.2f %9.1f" % (test, len(recs), total,
+                    total / len(recs) * 1000))
+
+    byVendor = {}
+    for r in records:
+        byVendor.setdefault(vendors[r.bmc], []).append(r)
+    labels = ["<%gms" % (b * 1000) for b in histogramBounds] + ["more"]
+    lines.append("")
+    lines.append("%-10s %5s %6s %8s %8s " % ("Vendor", "BMCs", "Reqs",
+            "p50(ms)", "p99(ms)") + ' '.join("%7s" % l for l in labels))
+    for vendor, recs in sorted(byVendor.items()):
+        times = sorted(r.total for r in recs)
+        buckets = [0] * (len(histogramBounds) + 1)
+        for t in times:
+            buckets[next((i for i, b in enumerate(histogramBounds) if t < b),
+                    len(histogramBounds))] += 1
+        lines.append("%-10s %5d %6d %8.1f %8.1f " % (vendor,
+                len({r.bmc for r in recs}), len(recs),
+                percentile(times, 50) * 1000, percentile(times, 99) * 1000) +
+                ' '.join("%7d" % b for b in buckets))
+
+    newConns = [r for r in records if r.connect or r.tls]
+    lines.append("")
+    lines.append("Phases (mean ms): dns %.1f, connect %.1f, tls %.1f, ttfb %.1f, "
+            "total %.1f; %d new connections" % (
+            mean(r.dns for r in records) * 1000,
+            mean(r.connect for r in records) * 1000,
+            mean(r.tls for r in records) * 1000,
+            mean(r.ttfb for r in records) * 1000,
+            mean(r.total for r in records) * 1000, len(newConns)))
+
+    statuses = {}
+    for r in records:
+        key = r.error or str(r.status)
+        statuses[key] = statuses.get(key, 0) + 1
+    lines.append("Status: " + ', '.join("%s %d" % s for s in sorted(statuses.items())) +
+            "; retries %d" % sum(r.retries for r in records))
+
+    return lines
+
+def writeProfileTrace(filename):
+    r""" writeProfileTrace(filename) - writes the requests as a Chrome trace
+    event file, one process per BMC and one thread per validation thread """
+    with profileLock:
+        records = list(profileRecords)
+    vendors = profileVendors(records)
+    pids = {bmc: i + 1 for i, bmc in enumerate(sorted(vendors))}
+
+    events = [{'name': "process_name", 'ph': "M", 'pid': pid,
+            'args': {'name': "%s (%s)" % (bmc, vendors[bmc])}}
+            for bmc, pid in pids.items()]
+    for r in records:
+        events.append({
+                'name': "%s %s" % (r.method, r.uri),
+                'cat': vendors[r.bmc],
+                'ph': "X",
+                'ts': round(r.start * 1e6, 1),
+                'dur': round(r.total * 1e6, 1),
+                'pid': pids[r.bmc],
+                'tid': r.thread,
+                'args': {
+                    'path': r.path,
+                    'test': r.test,
+                    'status': r.status,
+                    'bytes': r.bytes,
+                    'dns_ms': round(r.dns * 1000, 3),
+                    'connect_ms': round(r.connect * 1000, 3),
+                    'tls_ms': round(r.tls * 1000, 3),
+                    'ttfb_ms': round(r.ttfb * 1000, 3),
+                    'retries': r.retries,
+                    'error': r.error,
+                    },
+                })
+
+    with open(filename, "w") as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': "ms"}, f)
@@ -32,657 +32,501 @@ from utils.debug import dbgPrint, setDbgLevel, dbgLow, dbgMed
 from utils.auth import getAuthenticationToken
 from utils.health import printOK
 from utils.health import printError, printExtraError
+from utils.results import startResultTimer
+from utils.conversions import xnameToNidLookup
+import config
 
 def getNid(xname, auth_token):
     dbgPrint(dbgMed, "getNid")
 
-    getHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            }
-
-    URL = "https://api-gw-service-nmn.local/apis/smd/hsm/v2/State/Components/" + xname
-
-    dbgPrint(dbgMed, "POST: %s %s" % (URL, getHeaders))
-
-    r = requests.get(url = URL, headers = getHeaders)
-
-    dbgPrint(dbgMed, "Response: %s" % r.text)
-
-    if r.status_code >= 300:
-        return 1
-
-    comp = json.loads(r.text)
-
-    return comp['NID']
-
-
-capMin = 0
-capMax = 0
-
-def get_power_cap_capabilities(xname, auth_token):
-    dbgPrint(dbgMed, "get_power_cap_capabilities")
-    global capMin
-    global capMax
-
-    nid = getNid(xname, auth_token)
-
-    if nid < 0:
-        printError("get_power_cap_capabilities")
-        printExtraError(xname, "Could not get nid")
-        return 1
-
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    payload = {
-            'nids': [nid],
-            }
-
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_power_cap_capabilities"
-
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
-
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
-
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    return xnameToNidLookup(xname, auth_token)
 
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("get_power_cap_capabilities")
-        printExtraError(label, msg)
-        return 1
-
-    capInfo = json.loads(r.text)
-
-    group = capInfo['groups'][0]
-
-    if group['controls']:
-        control = None
-        for tmp in group['controls']:
-            if tmp['name'].startswith('Node'):
-                control = tmp
-                break
-        if control != None:
-            capMax = control['max']
-            capMin = control['min']
-
-    supply = group['supply']
-
-    if capMax == 0:
-        if supply == 0:
-            printError("get_power_cap_capabilities")
-            printExtraError("min", capMin)
-            printExtraError("max", capMax)
-            printExtraError("supply", supply)
-            return 1
+def resolveNids(xnames, auth_token, errors):
+    r""" resolveNids(xnames, auth_token, errors) - returns a dict of the nid of
+    each xname, xnames without a nid get an error in errors """
+    nids = {}
+    for xname in xnames:
+        nid = getNid(xname, auth_token)
+        if nid < 0:
+            errors[xname] = [(xname, "Could not get nid")]
         else:
-            capMax = supply
-
-    printOK("get_power_cap_capabilities")
-
-    return 0
-
-def get_power_cap(xname, auth_token):
-    dbgPrint(dbgMed, "get_power_cap")
-
-    nid = getNid(xname, auth_token)
-
-    if nid < 0:
-        printError("get_power_cap")
-        printExtraError(xname, "Could not get nid")
-        return 1
-
+            nids[xname] = nid
+    return nids
+
+def chunks(items, size):
+    r""" chunks(items, size) - splits the list items into lists of size items """
+    size = max(size, 1)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def capmcCall(api, payload, auth_token):
+    r""" capmcCall(api, payload, auth_token) - POSTs the payload to a CAPMC API
+    and returns the decoded response, label, msg. The response is None on
+    failure and the label is None for a bad request. """
     postHeaders = {
             'Authorization': 'Bearer %s' % auth_token,
             'cache-control': 'no-cache',
             'Content-Type': 'application/json',
             }
 
-    payload = {
-            'nids': [nid],
-            }
-
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_power_cap"
+    URL = config.apiGateway + "/apis/capmc/capmc/v1/" + api
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
+    dbgPrint(dbgMed, "POST: %s %s %s", URL, postHeaders, payload)
 
     r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    dbgPrint(dbgMed, "Response: %s", r.text)
+
+    label = ""
+    msg = ""
 
     if r.status_code >= 500:
         label = "CAPMC"
         msg = "Internal CAPMC Error"
     elif r.status_code >= 400:
-        label = xname
+        label = None
         msg = "Bad Request"
     elif r.status_code >= 300:
         label = "CAPMC"
         msg = "URI redirection"
 
     if r.status_code >= 300:
-        printError("get_power_cap")
-        printExtraError(label, msg)
-        return 1
-
-    capInfo = json.loads(r.text)
-
-    err = capInfo['e']
-
-    if err != 0:
-        printError("get_power_cap")
-        printExtraError(xname, capInfo['nids'][0]['err_msg'])
-        return 1
-
-    val = capInfo['nids'][0]['controls'][0]['val']
-
-    if val is not None and val <= 0:
-        printError("get_power_cap")
-        printExtraError("value", val)
-        return 1
-
-    printOK("get_power_cap")
+        return None, label, msg
+
+    return json.loads(r.text), label, msg
+
+def capmcNidQuery(api, xnames, nids, auth_token, errors, nidPayload=None,
+        extra=None, key='nids', batchSize=None):
+    r""" capmcNidQuery(api, xnames, nids, auth_token, errors, ...) - POSTs the
+    nids of xnames to a CAPMC API, batchSize nids per request, and maps the
+    per nid entries of the responses back to the xnames.
+
+    Returns a dict of (entry, err, errMsg) for each xname. The entry is {} when
+    the response has no entry for the nid. xnames whose request failed get an
+    error in errors and are left out. """
+    if nidPayload is None:
+        nidPayload = lambda xname: nids[xname]
+    if batchSize is None:
+        batchSize = config.capmcBatchSize
+
+    results = {}
+    for chunk in chunks(xnames, batchSize):
+        payload = {
+                'nids': [nidPayload(xname) for xname in chunk],
+                }
+        if extra:
+            payload.update(extra)
+
+        response, label, msg = capmcCall(api, payload, auth_token)
+
+        if response is None:
+            for xname in chunk:
+                errors[xname] = [(label or xname, msg)]
+            continue
+
+        entries = {}
+        for entry in response.get(key) or []:
+            entries[entry.get('nid')] = entry
+
+        for xname in chunk:
+            entry = entries.get(nids[xname])
+            if entry is None and len(chunk) == 1 and response.get(key):
+                entry = response[key][0]
+            if entry is None:
+                entry = {}
+
+            # An error without a nid entry belongs to the nid only if it was
+            # the only one in the request.
+            if len(chunk) == 1:
+                err = entry.get('e', response['e'])
+            else:
+                err = entry.get('e', 0)
+            errMsg = entry.get('err_msg', response.get('err_msg', ""))
+
+            results[xname] = (entry, err, errMsg)
+
+    return results
+
+def energyWindow():
+    r""" energyWindow() - returns the start and end time of the last hour """
+    etime = datetime.today()
+    stime = etime - timedelta(hours=1)
 
-    return 0
+    return {
+            'start_time': stime.strftime('%Y-%m-%d %H:%M:%S'),
+            'end_time': etime.strftime('%Y-%m-%d %H:%M:%S'),
+            }
 
-def extract_power_cap_val(capInfo):
-    for x in capInfo['nids'][0]['controls']:
+# Power cap limits found by get_power_cap_capabilities, keyed by xname, so
+# set_power_cap can use them when xnames are validated concurrently
+capLimits = {}
+
+def checkPowerCapCapabilities(xnames, auth_token):
+    r""" checkPowerCapCapabilities(xnames, auth_token) - get_power_cap_capabilities
+    for a list of xnames, returns the errors found for each xname """
+    errors = {}
+    nids = resolveNids(xnames, auth_token, errors)
+    todo = [x for x in xnames if x in nids]
+
+    for chunk in chunks(todo, config.capmcBatchSize):
+        payload = {
+                'nids': [nids[x] for x in chunk],
+                }
+
+        capInfo, label, msg = capmcCall("get_power_cap_capabilities", payload,
+                auth_token)
+
+        if capInfo is None:
+            for xname in chunk:
+                errors[xname] = [(label or xname, msg)]
+            continue
+
+        groups = {}
+        for group in capInfo['groups']:
+            for nid in group.get('nids') or []:
+                groups[nid] = group
+
+        for xname in chunk:
+            group = groups.get(nids[xname])
+            if group is None and len(chunk) == 1 and capInfo['groups']:
+                group = capInfo['groups'][0]
+            if group is None:
+                errors[xname] = [(xname, "Missing from CAPMC response")]
+                continue
+
+            capMin = 0
+            capMax = 0
+
+            if group['controls']:
+                control = None
+                for tmp in group['controls']:
+                    if tmp['name'].startswith('Node'):
+                        control = tmp
+                        break
+                if control != None:
+                    capMax = control['max']
+                    capMin = control['min']
+
+            supply = group['supply']
+
+            if capMax == 0:
+                if supply == 0:
+                    errors[xname] = [("min", capMin), ("max", capMax),
+                            ("supply", supply)]
+                    continue
+                else:
+                    capMax = supply
+
+            capLimits[xname] = (capMin, capMax)
+            errors[xname] = []
+
+    return errors
+
+def checkPowerCap(xnames, auth_token):
+    r""" checkPowerCap(xnames, auth_token) - get_power_cap for a list of
+    xnames, returns the errors found for each xname """
+    errors = {}
+    nids = resolveNids(xnames, auth_token, errors)
+    todo = [x for x in xnames if x in nids]
+
+    capInfo = capmcNidQuery("get_power_cap", todo, nids, auth_token, errors)
+
+    for xname, (entry, err, errMsg) in capInfo.items():
+        if err != 0:
+            errors[xname] = [(xname, errMsg)]
+            continue
+
+        if not entry.get('controls'):
+            errors[xname] = [(xname, "Missing from CAPMC response")]
+            continue
+
+        val = entry['controls'][0]['val']
+
+        if val is not None and val <= 0:
+            errors[xname] = [("value", val)]
+            continue
+
+        errors[xname] = []
+
+    return errors
+
+def extract_power_cap_val(entry):
+    for x in entry.get('controls') or []:
         if x["name"] == "node":
             return x['val']
     return None
 
-def set_power_cap(xname, auth_token):
-    dbgPrint(dbgMed, "set_power_cap")
-
-    if capMax == 0:
-        printError("set_power_cap")
-        printExtraError("Invalid max cap value", capMax)
-        return 1
-
-    nid = getNid(xname, auth_token)
-
-    if nid < 0:
-        printError("set_power_cap")
-        printExtraError(xname, "Could not get nid")
-        return 1
-
-    # Get and save original value
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    payload = {
-            'nids': [nid],
+def setPowerCaps(capVals, nids, auth_token, errors):
+    r""" setPowerCaps(capVals, nids, auth_token, errors) - sets the node power
+    cap of each xname in capVals, returns the xnames that were set """
+    nidPayload = lambda xname: {
+            'controls': [{'name': 'node', 'val': capVals[xname]}],
+            'nid': nids[xname],
             }
 
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_power_cap"
-
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
-
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
+    capInfo = capmcNidQuery("set_power_cap", list(capVals), nids, auth_token,
+            errors, nidPayload=nidPayload)
+
+    done = []
+    for xname, (entry, err, errMsg) in capInfo.items():
+        if err != 0:
+            errors[xname] = [(xname, errMsg)]
+            continue
+        done.append(xname)
+
+    return done
+
+def checkSetPowerCap(xnames, auth_token):
+    r""" checkSetPowerCap(xnames, auth_token) - set_power_cap for a list of
+    xnames, returns the errors found for each xname """
+    errors = {}
+    todo = []
+    for xname in xnames:
+        capMin, capMax = capLimits.get(xname, (0, 0))
+        if capMax == 0:
+            errors[xname] = [("Invalid max cap value", capMax)]
+        else:
+            todo.append(xname)
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    nids = resolveNids(todo, auth_token, errors)
+    todo = [x for x in todo if x in nids]
 
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("set_power_cap")
-        printExtraError(label, msg)
-        return 1
+    # Get and save original value
+    origVals = {}
+    capInfo = capmcNidQuery("get_power_cap", todo, nids, auth_token, errors)
 
-    capInfo = json.loads(r.text)
+    for xname, (entry, err, errMsg) in capInfo.items():
+        capMin, capMax = capLimits[xname]
 
-    err = capInfo['e']
+        if err != 0:
+            errors[xname] = [(xname, "Node not in the Ready state")]
+            continue
 
-    if err != 0:
-        printError("set_power_cap")
-        printExtraError(xname, "Node not in the Ready state")
-        return 1
+        origVal = extract_power_cap_val(entry)
 
-    origVal = extract_power_cap_val(capInfo)
+        if origVal is not None and origVal <= 0:
+            errors[xname] = [("value", origVal)]
+            continue
 
-    if origVal is not None and origVal <= 0:
-        printError("set_power_cap")
-        printExtraError("value", origVal)
-        return 1
+        # Verify in range
+        if origVal is not None and (origVal < capMin or origVal > capMax):
+            errors[xname] = [("value", origVal)]
+            continue
 
-    # Verify in range
-    if origVal is not None and (origVal < capMin or origVal > capMax):
-        printError("set_power_cap")
-        printExtraError("value", origVal)
-        return 1
+        origVals[xname] = origVal
 
     # Set to (max - 10)
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    capVal = capMax - 10
-
-    payload = {
-            'nids': [{'controls': [{'name': 'node', 'val': capVal}], 'nid': nid}],
-            }
-
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/set_power_cap"
+    capVals = {}
+    for xname in origVals:
+        capVals[xname] = capLimits[xname][1] - 10
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
-
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
-
-    dbgPrint(dbgMed, "Response: %s" % r.text)
-
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("set_power_cap")
-        printExtraError(label, msg)
-        return 1
-
-    capInfo = json.loads(r.text)
-
-    err = capInfo['e']
-
-    if err != 0:
-        printError("set_power_cap")
-        printExtraError(xname, capInfo['nids'][0]['err_msg'])
-        return 1
+    setXnames = setPowerCaps(capVals, nids, auth_token, errors)
 
     # Get
+    capInfo = capmcNidQuery("get_power_cap", setXnames, nids, auth_token,
+            errors)
 
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    payload = {
-            'nids': [nid],
-            }
+    for xname, (entry, err, errMsg) in capInfo.items():
+        if err != 0:
+            errors[xname] = [(xname, "Node not in the Ready state")]
+            continue
 
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_power_cap"
+        setVal = extract_power_cap_val(entry)
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
+        if setVal is not None and setVal <= 0:
+            errors[xname] = [("value", setVal)]
+            continue
 
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
+        # Verify avg of min/max
+        if setVal != capVals[xname]:
+            errors[xname] = [("set value", setVal),
+                    ("expected value", capVals[xname])]
+            continue
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+        errors[xname] = []
 
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("set_power_cap")
-        printExtraError(label, msg)
-        return 1
-
-    capInfo = json.loads(r.text)
-
-    err = capInfo['e']
-
-    if err != 0:
-        printError("set_power_cap")
-        printExtraError(xname, "Node not in the Ready state")
-        return 1
-
-    setVal = extract_power_cap_val(capInfo)
-
-    if setVal is not None and setVal <= 0:
-        printError("set_power_cap")
-        printExtraError("value", setVal)
-        return 1
-
-    # Verify avg of min/max
-    if setVal != capVal:
-        printError("set_power_cap")
-        printExtraError("set value", setVal)
-        printExtraError("expected value", capVal)
-        return 1
-
-    # Set original value
-
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
+    # Set original value, also when the verification failed
+    restoreVals = {}
+    for xname in setXnames:
+        if origVals[xname] is None:
+            restoreVals[xname] = 0
+        else:
+            restoreVals[xname] = origVals[xname]
 
-    if origVal is None:
-        capVal = 0
-    else:
-        capVal = origVal
+    restoreErrors = {}
+    setPowerCaps(restoreVals, nids, auth_token, restoreErrors)
 
-    payload = {
-            'nids': [{'controls': [{'name': 'node', 'val': capVal}], 'nid': nid}],
-            }
+    for xname, errs in restoreErrors.items():
+        errors[xname] = errors.get(xname, []) + errs
 
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/set_power_cap"
+    return errors
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
+def checkNodeEnergy(xnames, auth_token):
+    r""" checkNodeEnergy(xnames, auth_token) - get_node_energy for a list of
+    xnames, returns the errors found for each xname """
+    errors = {}
+    nids = resolveNids(xnames, auth_token, errors)
+    todo = [x for x in xnames if x in nids]
 
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
+    energyInfo = capmcNidQuery("get_node_energy", todo, nids, auth_token,
+            errors, extra=energyWindow(), key='nodes')
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    for xname, (entry, err, errMsg) in energyInfo.items():
+        if err > 0 or 'energy' not in entry:
+            errors[xname] = [(xname, "No data in time window")]
+            continue
 
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
+        energy = entry['energy']
 
-    if r.status_code >= 300:
-        printError("set_power_cap")
-        printExtraError(label, msg)
-        return 1
+        if energy <= 0:
+            errors[xname] = [("energy", energy)]
+            continue
 
-    printOK("set_power_cap")
+        errors[xname] = []
 
-    return 0
+    return errors
 
-def get_node_energy(xname, auth_token):
-    dbgPrint(dbgMed, "get_node_energy")
+def checkNodeEnergyStats(xnames, auth_token):
+    r""" checkNodeEnergyStats(xnames, auth_token) - get_node_energy_stats for a
+    list of xnames, returns the errors found for each xname. The statistics
+    are totals over all nids of a request, so each xname needs its own
+    request. """
+    errors = {}
+    nids = resolveNids(xnames, auth_token, errors)
 
-    nid = getNid(xname, auth_token)
+    for xname in xnames:
+        if xname not in nids:
+            continue
 
-    if nid < 0:
-        printError("get_node_energy")
-        printExtraError(xname, "Could not get nid")
-        return 1
+        payload = {
+                'nids': [nids[xname]],
+                }
+        payload.update(energyWindow())
 
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
+        energyInfo, label, msg = capmcCall("get_node_energy_stats", payload,
+                auth_token)
 
-    etime = datetime.today()
-    stime = etime - timedelta(hours=1)
+        if energyInfo is None:
+            errors[xname] = [(label or xname, msg)]
+            continue
 
-    payload = {
-            'nids': [nid],
-            'start_time': stime.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_time': etime.strftime('%Y-%m-%d %H:%M:%S'),
-            }
+        err = energyInfo['e']
 
+        if err > 0:
+            errors[xname] = [(xname, "No data in time window")]
+            continue
 
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_node_energy"
+        energy = energyInfo['energy_total']
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
+        if energy <= 0:
+            errors[xname] = [("energy_total", energy)]
+            continue
 
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
+        errors[xname] = []
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
+    return errors
 
-    label = ""
-    msg = ""
+def checkNodeEnergyCounter(xnames, auth_token):
+    r""" checkNodeEnergyCounter(xnames, auth_token) - get_node_energy_counter
+    for a list of xnames, returns the errors found for each xname """
+    errors = {}
+    nids = resolveNids(xnames, auth_token, errors)
+    todo = [x for x in xnames if x in nids]
 
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
+    energyInfo = capmcNidQuery("get_node_energy_counter", todo, nids,
+            auth_token, errors, extra=energyWindow(), key='nodes')
 
-    if r.status_code >= 300:
-        printError("get_node_energy")
-        printExtraError(label, msg)
-        return 1
+    for xname, (entry, err, errMsg) in energyInfo.items():
+        if err > 0 or 'energy_ctr' not in entry:
+            errors[xname] = [(xname, "No data in time window")]
+            continue
 
-    energyInfo = json.loads(r.text)
-    err = energyInfo['e']
+        energy = entry['energy_ctr']
 
-    if err > 0:
-        printError("get_node_energy")
-        printExtraError(xname, "No data in time window")
-        return 1
+        if energy <= 0:
+            errors[xname] = [("energy_ctr", energy)]
+            continue
 
-    energy = energyInfo['nodes'][0]['energy']
+        errors[xname] = []
 
-    if energy <= 0:
-        printError("get_node_energy")
-        printExtraError("energy", energy)
-        return 1
+    return errors
 
-    printOK("get_node_energy")
+def checkXnameStatus(xnames, auth_token):
+    r""" checkXnameStatus(xnames, auth_token) - get_xname_status for a list of
+    xnames, returns the errors found for each xname """
+    errors = {}
 
-    return 0
+    for chunk in chunks(xnames, config.capmcBatchSize):
+        payload = {
+                'xnames': chunk,
+                }
 
-def get_node_energy_stats(xname, auth_token):
-    dbgPrint(dbgMed, "get_node_energy_stats")
+        status, label, msg = capmcCall("get_xname_status", payload, auth_token)
 
-    nid = getNid(xname, auth_token)
+        if status is None:
+            for xname in chunk:
+                errors[xname] = [(label or xname, msg)]
+            continue
 
-    if nid < 0:
-        printError("get_node_energy_stats")
-        printExtraError(xname, "Could not get nid")
-        return 1
+        err = status['e']
+        known = set(status.get('on') or []) | set(status.get('off') or [])
 
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    etime = datetime.today()
-    stime = etime - timedelta(hours=1)
-
-    payload = {
-            'nids': [nid],
-            'start_time': stime.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_time': etime.strftime('%Y-%m-%d %H:%M:%S'),
-            }
+        for xname in chunk:
+            if err < 0 and xname not in known:
+                errors[xname] = [(xname, "Could not talk to BMC, undefined")]
+            else:
+                errors[xname] = []
 
+    return errors
 
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_node_energy_stats"
+"""
+Results of capmcBatch(), keyed by test name and then xname
+"""
+batchResults = {}
 
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
+def reportResult(name, xname, check, auth_token):
+    r""" reportResult(name, xname, check, auth_token) - prints and returns the
+    result of a test for an xname. The result comes from capmcBatch() if the
+    test was run in batch mode, otherwise check is run for the xname. """
+    dbgPrint(dbgMed, name)
 
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
+    errors = batchResults.get(name, {}).get(xname)
+    if errors is None:
+        errors = check([xname], auth_token).get(xname, [])
 
-    dbgPrint(dbgMed, "Response: %s" % r.text)
-
-    label = ""
-    msg = ""
-
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("get_node_energy_stats")
-        printExtraError(label, msg)
-        return 1
-
-    energyInfo = json.loads(r.text)
-    err = energyInfo['e']
-
-    if err > 0:
-        printError("get_node_energy_stats")
-        printExtraError(xname, "No data in time window")
+    if errors:
+        printError(name)
+        for label, msg in errors:
+            printExtraError(label, msg)
         return 1
 
-    energy = energyInfo['energy_total']
+    printOK(name)
 
-    if energy <= 0:
-        printError("get_node_energy_stats")
-        printExtraError("energy_total", energy)
-        return 1
-
-    printOK("get_node_energy_stats")
     return 0
 
-def get_node_energy_counter(xname, auth_token):
-    dbgPrint(dbgMed, "get_node_energy_counter")
-
-    nid = getNid(xname, auth_token)
-
-    if nid < 0:
-        printError("get_node_energy_stats")
-        printExtraError(xname, "Could not get nid")
-        return 1
-
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    etime = datetime.today()
-    stime = etime - timedelta(hours=1)
-
-    payload = {
-            'nids': [nid],
-            'start_time': stime.strftime('%Y-%m-%d %H:%M:%S'),
-            'end_time': etime.strftime('%Y-%m-%d %H:%M:%S'),
-            }
-
-
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_node_energy_counter"
-
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
-
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
-
-    dbgPrint(dbgMed, "Response: %s" % r.text)
-
-    label = ""
-    msg = ""
-
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("get_node_energy_counter")
-        printExtraError(label, msg)
-        return 1
+def get_power_cap_capabilities(xname, auth_token):
+    return reportResult("get_power_cap_capabilities", xname,
+            checkPowerCapCapabilities, auth_token)
 
-    energyInfo = json.loads(r.text)
-    err = energyInfo['e']
+def get_power_cap(xname, auth_token):
+    return reportResult("get_power_cap", xname, checkPowerCap, auth_token)
 
-    if err > 0:
-        printError("get_node_energy_counter")
-        printExtraError(xname, "No data in time window")
-        return 1
+def set_power_cap(xname, auth_token):
+    return reportResult("set_power_cap", xname, checkSetPowerCap, auth_token)
 
-    energy = energyInfo['nodes'][0]['energy_ctr']
+def get_node_energy(xname, auth_token):
+    return reportResult("get_node_energy", xname, checkNodeEnergy, auth_token)
 
-    if energy <= 0:
-        printError("get_node_energy_counter")
-        printExtraError("energy_ctr", energy)
-        return 1
+def get_node_energy_stats(xname, auth_token):
+    return reportResult("get_node_energy_stats", xname, checkNodeEnergyStats,
+            auth_token)
 
-    printOK("get_node_energy_counter")
-    return 0
+def get_node_energy_counter(xname, auth_token):
+    return reportResult("get_node_energy_counter", xname,
+            checkNodeEnergyCounter, auth_token)
 
 def get_xname_status(xname, auth_token):
-    dbgPrint(dbgMed, "get_xname_status")
-
-    postHeaders = {
-            'Authorization': 'Bearer %s' % auth_token,
-            'cache-control': 'no-cache',
-            'Content-Type': 'application/json',
-            }
-
-    payload = {
-            'xnames': [xname],
-            }
-
-    URL = "https://api-gw-service-nmn.local/apis/capmc/capmc/v1/get_xname_status"
-
-    dbgPrint(dbgMed, "POST: %s %s %s" % (URL, postHeaders, payload))
-
-    r = requests.post(url = URL, headers = postHeaders, data = json.dumps(payload))
-
-    dbgPrint(dbgMed, "Response: %s" % r.text)
-
-    label = ""
-    msg = ""
-
-    if r.status_code >= 500:
-        label = "CAPMC"
-        msg = "Internal CAPMC Error"
-    elif r.status_code >= 400:
-        label = xname
-        msg = "Bad Request"
-    elif r.status_code >= 300:
-        label = "CAPMC"
-        msg = "URI redirection"
-
-    if r.status_code >= 300:
-        printError("get_xname_status")
-        printExtraError(label, msg)
-        return 1
-
-    status = json.loads(r.text)
-    err = status['e']
-
-    if err < 0:
-        printError("get_xname_status")
-        printExtraError(xname, "Could not talk to BMC, undefined")
-        return 1
-
-    printOK("get_xname_status")
-
-    return 0
+    return reportResult("get_xname_status", xname, checkXnameStatus,
+            auth_token)
 
 validations = [
         get_power_cap_capabilities,
@@ -694,6 +538,29 @@ validations = [
         get_xname_status
         ]
 
+batchChecks = {
+        get_power_cap_capabilities: checkPowerCapCapabilities,
+        get_power_cap: checkPowerCap,
+        set_power_cap: checkSetPowerCap,
+        get_node_energy: checkNodeEnergy,
+        get_node_energy_stats: checkNodeEnergyStats,
+        get_node_energy_counter: checkNodeEnergyCounter,
+        get_xname_status: checkXnameStatus,
+        }
+
+def capmcBatch(xnames, tests=None, args=None):
+    r""" capmcBatch(xnames, tests, args) - runs the CAPMC tests for all xnames
+    up front with one request per CAPMC API for every config.capmcBatchSize
+    nids. capmc() then reports the stored result for each xname. """
+    dbgPrint(dbgMed, "capmcBatch")
+
+    auth_token = getAuthenticationToken()
+
+    for test in validations:
+        if tests and test.__name__ not in tests:
+            continue
+        dbgPrint(dbgMed, "Calling: capmcBatch:%s", test.__name__)
+        batchResults[test.__name__] = batchChecks[test](xnames, auth_token)
 
 def capmc(xname, tests=None, list=False, args=None):
     dbgPrint(dbgMed, "capmc")
@@ -708,12 +575,14 @@ def capmc(xname, tests=None, list=False, args=None):
         for t in tests:
             for test in validations:
                 if t == test.__name__:
-                    dbgPrint(dbgMed, "Calling: capmc:%s" % test.__name__)
+                    dbgPrint(dbgMed, "Calling: capmc:%s", test.__name__)
+                    startResultTimer(test.__name__)
                     ret = test(xname, auth_token)
                     failures = failures + ret
     else:
         for test in validations:
-            dbgPrint(dbgMed, "Calling: capmc:%s" % test.__name__)
+            dbgPrint(dbgMed, "Calling: capmc:%s", test.__name__)
+            startResultTimer(test.__name__)
             ret = test(xname, auth_token)
             failures = failures + ret
 
@@ -721,7 +590,6 @@ def capmc(xname, tests=None, list=False, args=None):
 
 if __name__ == "__main__":
     setDbgLevel(dbgLow)
-    dbgPrint(dbgLow, "Calling: capmc(%s, %s, %s)" % (sys.argv[1],
-        sys.argv[2], sys.argv[3]))
+    dbgPrint(dbgLow, "Calling: capmc(%s, %s, %s)", sys.argv[1],
+        sys.argv[2], sys.argv[3])
     exit(capmc(sys.argv[1], sys.argv[2], sys.argv[3]))
-
@@ -27,13 +27,15 @@ import sys
 from utils.debug import dbgPrint, setDbgLevel, dbgLow, dbgMed
 from utils.health import printWarning, printExtraWarning
 from utils.health import printError, printExtraError
+from utils.results import startResultTimer
 from utils.redfish import convertXnameToBMCName
+from utils.resilience import BREAKER
 
 from .redfishmod.uris import checkRedfishURIs
 from .redfishmod.chassis import checkRedfishChassis
 from .redfishmod.managers import checkRedfishManagers
 from .redfishmod.event_service import checkRedfishEventService
-from .redfishmod.telemetry_poll import telemetryPoll
+from .redfishmod.telemetry_poll import telemetryPoll, telemetrySoak
 from .redfishmod.systems import checkRedfishSystems
 from .redfishmod.update_service import checkRedfishUpdateService
 from .redfishmod.event import eventSubscribe, eventTest, eventDelete
@@ -51,6 +53,16 @@ validations = [
     telemetryPoll
         ]
 
+def runTest(test, bmcName):
+    r""" runTest(test, bmcName) - runs a test unless the BMC could not be
+    reached by an earlier one, then the test fails right away """
+    if BREAKER.is_open(bmcName):
+        printError(test.__name__)
+        printExtraError(bmcName, "Skipped, BMC unreachable")
+        return 1
+
+    return test(bmcName)
+
 def redfish(xname, tests=None, list=False, args=None):
     dbgPrint(dbgMed, "redfish")
 
@@ -78,20 +90,53 @@ def redfish(xname, tests=None, list=False, args=None):
         for t in tests:
             for test in validations:
                 if t == test.__name__:
-                    dbgPrint(dbgMed, "Calling: redfish:%s" % test.__name__)
-                    ret = test(bmcName)
+                    dbgPrint(dbgMed, "Calling: redfish:%s", test.__name__)
+                    startResultTimer(test.__name__)
+                    ret = runTest(test, bmcName)
                     failures = failures + ret
     else:
         for test in validations:
-            dbgPrint(dbgMed, "Calling: redfish:%s" % test.__name__)
-            ret = test(bmcName)
+            dbgPrint(dbgMed, "Calling: redfish:%s", test.__name__)
+            startResultTimer(test.__name__)
+            ret = runTest(test, bmcName)
             failures = failures + ret
 
     return failures
 
+def redfishSoak(xnames, args):
+    r""" redfishSoak(xnames, args) - soaks the BMCs of the xnames with
+    telemetrySoak for args.soak seconds, polling every args.soak_interval
+    seconds. Each BMC is soaked once however many of its nodes are given.
+    Returns the number of failures of each BMC, and of each xname that has
+    no BMC. """
+    dbgPrint(dbgMed, "redfishSoak")
+
+    if not args.user or not args.passwd:
+        printError("redfishSoak")
+        printExtraError(",".join(xnames), "Missing credentials")
+        return {xname: 1 for xname in xnames}
+
+    # Nodes of the same BMC would poll it several times per interval and
+    # skew its response times
+    bmcs = []
+    unknown = {}
+    for xname in xnames:
+        bmcName = convertXnameToBMCName(xname)
+        if not bmcName:
+            printWarning("redfishSoak")
+            printExtraWarning(xname, "Could not determine BMC name")
+            unknown[xname] = 1
+        elif bmcName not in bmcs:
+            bmcs.append(bmcName)
+
+    results = telemetrySoak([(bmcName, bmcName) for bmcName in bmcs],
+            args.soak, args.soak_interval)
+    results.update(unknown)
+    return results
+
 if __name__ == "__main__":
     setDbgLevel(dbgLow)
-    dbgPrint(dbgLow, "Calling: redfish(%s, %s, %s)" % (sys.argv[1],
-        sys.argv[2], sys.argv[3]))
+    dbgPrint(dbgLow, "Calling: redfish(%s, %s, %s)", sys.argv[1],
+        sys.argv[2], sys.argv[3])
     exit(redfish(sys.argv[1], sys.argv[2], sys.argv[3]))
 
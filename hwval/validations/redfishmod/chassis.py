@@ -22,13 +22,11 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK
 from utils.health import printInfo, printExtraInfo
 from utils.health import printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE
+from utils.redfish import getRedfishCollection, validateField, FIELD, TYPE
 
 chassisURIs = [
     ["SerialNumber", str],
@@ -43,44 +41,37 @@ def checkRedfishChassis(bmcName):
     badResults = 0
 
     path = "https://" + bmcName + "/redfish/v1/Chassis"
-    dbgPrint(dbgMed, "checkRedfishChassis checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "checkRedfishChassis checking %s", path)
+    (response, label, msg), members = getRedfishCollection(bmcName,
+            "/redfish/v1/Chassis")
 
-    if not payload:
+    if response is None:
         printError("checkRedfishChassis")
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     if "Members" not in response:
         printError("checkRedfishChassis")
         printExtraError(path + " .Members", "missing")
         return 1
 
-    for member in response["Members"]:
-        path = "https://" + bmcName + member["@odata.id"]
-        dbgPrint(dbgMed, "checkRedfishChassis checking " + path)
-        payload, label, msg = makeRedfishCall("GET", path)
-
-        if not payload:
+    for memberURI, (mResponse, label, msg) in members:
+        if mResponse is None:
             printError("checkRedfishChassis")
             printExtraError(label, msg)
             badResults += 1
             continue
 
-        mResponse = json.loads(payload)
-
         if ("ChassisType" in mResponse and
             (mResponse["ChassisType"] == "Enclosure" or
              mResponse["ChassisType"] == "RackMount")):
             for check in chassisURIs:
                 badResults += validateField("checkRedfishChassis",
-                                    member["@odata.id"], check[FIELD],
+                                    memberURI, check[FIELD],
                                     mResponse, check[TYPE])
         else:
             printInfo("checkRedfishChassis")
-            printExtraInfo("Skipping "+member["@odata.id"],
+            printExtraInfo("Skipping "+memberURI,
                                 "URI is for a " + mResponse["ChassisType"])
 
     if badResults == 0:
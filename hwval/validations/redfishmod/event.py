@@ -23,8 +23,7 @@
 # OTHER DEALINGS IN THE SOFTWARE.
 
 import os
-import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import time
 import ssl
 import json
 import datetime
@@ -34,8 +33,12 @@ from utils.debug import dbgPrint, dbgMed
 from utils.health import printError, printExtraError
 from utils.health import printOK
 from utils.health import printInfo, printExtraInfo
-from utils.redfish import makeRedfishCall
-from utils.redfish import isGigabyte, isHPERiver, isHPEMountain
+from utils.redfish import makeRedfishCall, getRedfishJSON
+from utils.redfish import getRedfishCollection
+from utils.redfish import getBMCProfile
+from utils import bmc_profile
+from utils.event_listener import destination_path, get_listener, server_context
+import config
 
 def getIPAddress():
     ipv4Str = os.popen('ip -o -f inet addr show vlan004 2>/dev/null').read()
@@ -43,40 +46,29 @@ def getIPAddress():
         return ""
     return ipv4Str.split()[3].split("/")[0]
 
-event = threading.Event()
-  
-class handleRequest(BaseHTTPRequestHandler):
-    def do_POST(self):
-        global event
-        event.set()
-  
-httpd = None
-httpThread = None
-  
+# Every BMC sends its events to its own path on the one listener
+RECEIVER = "/receiver/"
+
+def eventContext(bmcName):
+    return "RFSubTest-%s-RFSubTest" % bmcName
+
 def startRedfishEventServer():
     dbgPrint(dbgMed, "startRedfishEventServer")
-    global httpd
-    global httpThread
-  
+
     ipAddr = getIPAddress()
     if not ipAddr:
         printError("eventRedfishEventServer")
         printExtraError("vlan004", "could not determine IP addr")
-        return 1
+        return None
+
+    try:
+        context = server_context("cert/tls.crt", "cert/tls.key")
+        return get_listener((ipAddr, 443), context)
+    except (OSError, ssl.SSLError) as e:
+        printError("eventRedfishEventServer")
+        printExtraError("%s:443" % ipAddr, str(e))
+        return None
 
-    httpd = HTTPServer((ipAddr, 443), handleRequest)
-    httpd.socket = ssl.wrap_socket(httpd.socket, certfile="cert/tls.crt",
-                                    keyfile="cert/tls.key", server_side=True)
- 
-    def serve_forever(httpd):
-        with httpd:
-            httpd.serve_forever()
- 
-    httpThread = threading.Thread(target=serve_forever, args=(httpd,))
-    httpThread.setDaemon(True)
-    httpThread.start()
-    return 0
-  
 def eventSubscribe(bmcName):
     dbgPrint(dbgMed, "eventSubscribe")
 
@@ -87,19 +79,17 @@ def eventSubscribe(bmcName):
         return 1
 
     path = "https://" + bmcName + "/redfish/v1/EventService"
-    dbgPrint(dbgMed, "checkRedfishEventService checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "checkRedfishEventService checking %s", path)
+    response, label, msg = getRedfishJSON(path)
 
-    if not payload:
+    if response is None:
         printError("checkRedfishEventService")
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     sub = {
-        'Context': "RFSubTest-%s-RFSubTest" % bmcName,
-        'Destination': "https://%s/receiver" % ipAddr,
+        'Context': eventContext(bmcName),
+        'Destination': "https://%s%s" % (ipAddr, destination_path(bmcName, RECEIVER)),
         'Protocol': 'Redfish',
     }
 
@@ -122,24 +112,19 @@ def eventSubscribe(bmcName):
 
 def eventTest(bmcName):
     dbgPrint(dbgMed, "eventTest")
-    global event
 
     hostPath = "https://" + bmcName
-    path = hostPath + "/redfish/v1/Chassis"
-    payload, label, msg = makeRedfishCall("GET", path)
+    profile = getBMCProfile(bmcName)
 
-    if not payload:
-        printError("telemetryPoll")
-        printExtraError(label, msg)
+    if profile is None:
+        printError("eventValidate")
+        printExtraError(hostPath, "could not determine the BMC type")
         return 1
 
-    chassisList = json.loads(payload)
-    chassis = chassisList['Members'][0]
-
     testEvent = {}
     path = hostPath + "/redfish/v1/EventService/Actions/EventService.SubmitTestEvent"
 
-    if isGigabyte(chassis['@odata.id']):
+    if profile['vendor'] == bmc_profile.GIGABYTE:
         evID = randrange(10000,99999)
         testEvent = {
             "EventTimestamp":       "2020-05-26T23:04:09+02:00",
@@ -149,7 +134,7 @@ def eventTest(bmcName):
             "MessageArgs":          ["Lit","IndicatorLED"],
             "Severity":             "Warning"
         }
-    elif isHPERiver(chassis['@odata.id']):
+    elif profile['vendor'] == bmc_profile.HPE:
         testEvent = {
             'EventID':           'Test Event',
             'Severity':          'OK',
@@ -160,28 +145,41 @@ def eventTest(bmcName):
             'Message':           'This is a test event',
             'MessageId':         'TestMsg.v0'
         }
-    elif isHPEMountain(chassis['@odata.id']):
+    elif profile['vendor'] == bmc_profile.CRAY:
         printInfo("eventValidate")
         printExtraInfo("Test Event","Not supported")
         return 1
 
-    if httpd is None:
-        startRedfishEventServer()
+    listener = startRedfishEventServer()
+    if listener is None:
+        return 1
 
-    payload, label, msg = makeRedfishCall("POST", path, json.dumps(testEvent))
+    # The events of the BMC arrive at its own path, or carry its Context,
+    # so the BMCs validated in parallel each wait for their own test event
+    log = listener.register(bmcName, destination_path(bmcName, RECEIVER),
+            eventContext(bmcName))
+    try:
+        sent = time.monotonic()
 
-    if not payload:
-        printError("eventValidate")
-        printExtraError(label, msg)
-        return 1
+        payload, label, msg = makeRedfishCall("POST", path, json.dumps(testEvent))
 
-    if event.wait(timeout=30):
-        printOK("eventValidate")
-        return 0
-    else:
-        printError("eventValidate")
-        printExtraError("event", "timed out waiting for Redfish test event")
-        return 1
+        if not payload:
+            printError("eventValidate")
+            printExtraError(label, msg)
+            return 1
+
+        received = log.wait(sent, config.eventTimeout)
+        if received is not None:
+            dbgPrint(dbgMed, "%s test event %s after %.2fs", bmcName,
+                    received[2].get('MessageId'), received[1] - sent)
+            printOK("eventValidate")
+            return 0
+        else:
+            printError("eventValidate")
+            printExtraError("event", "timed out waiting for Redfish test event")
+            return 1
+    finally:
+        listener.unregister(bmcName)
 
 def eventDelete(bmcName):
     dbgPrint(dbgMed, "eventDelete")
@@ -192,32 +190,28 @@ def eventDelete(bmcName):
         printExtraError("vlan004", "could not determine IP addr")
         return 1
 
-    path = "https://%s/redfish/v1/EventService/Subscriptions" % bmcName
-
-    payload, label, msg = makeRedfishCall("GET", path)
+    (subCollection, label, msg), subs = getRedfishCollection(bmcName,
+            "/redfish/v1/EventService/Subscriptions",
+            ["Context", "Destination"])
 
-    if not payload:
+    if subCollection is None:
         printError("eventDelete")
         printExtraError(label, msg)
         return 1
 
-    subCollection = json.loads(payload)
-
     count = 0
-    for subEntry in subCollection['Members']:
-        path = "https://%s%s" % (bmcName, subEntry['@odata.id'])
-
-        payload, label, msg = makeRedfishCall("GET", path)
+    for subURI, (sub, label, msg) in subs:
+        path = "https://%s%s" % (bmcName, subURI)
 
-        if not payload:
+        if sub is None:
             printError("eventDelete")
             printExtraError(label, msg)
             return 1
 
-        sub = json.loads(payload)
-
-        if (sub['Context'] == "RFSubTest-%s-RFSubTest" % bmcName and
-            sub['Destination'] == "https://%s/receiver" % ipAddr):
+        # Subscriptions of older versions all went to /receiver
+        if (sub['Context'] == eventContext(bmcName) and
+            sub['Destination'] in ("https://%s/receiver" % ipAddr,
+                "https://%s%s" % (ipAddr, destination_path(bmcName, RECEIVER)))):
             count += 1
 
             payload, label, msg = makeRedfishCall("DELETE", path)
@@ -227,7 +221,7 @@ def eventDelete(bmcName):
                 printExtraError(label, msg)
                 return 1
 
-    dbgPrint(dbgMed, "%d subscriptions deleted for %s" % (count, bmcName))
+    dbgPrint(dbgMed, "%d subscriptions deleted for %s", count, bmcName)
 
     printOK("eventDelete")
 
@@ -22,11 +22,9 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK, printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE
+from utils.redfish import getRedfishJSON, validateField, FIELD, TYPE
 
 eventServiceURIs_1_3 = [
     ["RegistryPrefixes", list],
@@ -44,16 +42,14 @@ def checkRedfishEventService(bmcName):
     badResults = 0
 
     path = "https://" + bmcName + "/redfish/v1/EventService"
-    dbgPrint(dbgMed, "checkRedfishEventService checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "checkRedfishEventService checking %s", path)
+    response, label, msg = getRedfishJSON(path)
 
-    if not payload:
+    if response is None:
         printError("checkRedfishEventService")
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     checkURIs = []
     if response["@odata.type"] < "#EventService.v1_3_0.EventService":
         checkURIs = eventServiceURIs_pre_1_3
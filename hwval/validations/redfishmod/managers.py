@@ -22,11 +22,9 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK, printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE
+from utils.redfish import getRedfishCollection, validateField, FIELD, TYPE
 
 managerURIs = [
     ["Name", str],
@@ -40,37 +38,30 @@ def checkRedfishManagers(bmcName):
     badResults = 0
 
     path = "https://" + bmcName + "/redfish/v1/Managers"
-    dbgPrint(dbgMed, "checkRedfishManagers checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "checkRedfishManagers checking %s", path)
+    (response, label, msg), members = getRedfishCollection(bmcName,
+            "/redfish/v1/Managers")
 
-    if not payload:
+    if response is None:
         printError("checkRedfishManagers")
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     if "Members" not in response:
         printError("checkRedfishManagers")
         printExtraError(path + " .Members", "missing")
         return 1
 
-    for member in response["Members"]:
-        path = "https://" + bmcName + member["@odata.id"]
-        dbgPrint(dbgMed, "checkRedfishManagers checking " + path)
-        payload, label, msg = makeRedfishCall("GET", path)
-
-        if not payload:
+    for memberURI, (mResponse, label, msg) in members:
+        if mResponse is None:
             printError("checkRedfishManagers")
             printExtraError(label, msg)
             badResults += 1
             continue
 
-        mResponse = json.loads(payload)
-
         for check in managerURIs:
             badResults += validateField("checkRedfishManagers",
-                                    member["@odata.id"], check[FIELD],
+                                    memberURI, check[FIELD],
                                     mResponse, check[TYPE])
 
     if badResults == 0:
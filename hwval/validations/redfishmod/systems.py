@@ -22,13 +22,12 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK
 from utils.health import printInfo, printExtraInfo
 from utils.health import printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE
+from utils.redfish import getRedfishJSON, getRedfishCollection
+from utils.redfish import validateField, FIELD, TYPE
 
 cpuURIs = [
     ["Manufacturer", str],
@@ -39,17 +38,18 @@ cpuURIs = [
     ["MaxSpeedMHz", int],
 ]
 
-def checkRedfishSystemsProcessorsCPU(bmcName, cpuURI):
+def checkRedfishSystemsProcessorsCPU(bmcName, cpuURI, rsp=None):
     fname = "checkRedfishSystemsProcessorsCPU"
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + cpuURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    if rsp is None:
+        path = "https://" + bmcName + cpuURI
+        dbgPrint(dbgMed, "%s checking %s", fname, path)
+        rsp = getRedfishJSON(path)
+    mResponse, label, msg = rsp
 
-    if payload:
-        mResponse = json.loads(payload)
+    if mResponse is not None:
         for check in cpuURIs:
             badResults += validateField(fname, cpuURI,
                                 check[FIELD], mResponse, check[TYPE])
@@ -70,20 +70,18 @@ def checkRedfishSystemsProcessors(bmcName, procURI):
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + procURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
-
-    if payload:
-        mResponse = json.loads(payload)
+    dbgPrint(dbgMed, "%s checking %s", fname, procURI)
+    rsp, members = getRedfishCollection(bmcName, procURI,
+            [check[FIELD] for check in cpuURIs])
+    mResponse, label, msg = rsp
 
-        for check in memoryURIs:
+    if mResponse is not None:
+        for check in processorURIs:
             badResults += validateField(fname, procURI,
                                     check[FIELD], mResponse, check[TYPE])
-            if check[FIELD] == "Members" and check[FIELD] in mResponse:
-                for member in mResponse[check[FIELD]]:
-                    badResults += checkRedfishSystemsProcessorsCPU(bmcName,
-                        member["@odata.id"])
+        for cpuURI, cpuRsp in members:
+            badResults += checkRedfishSystemsProcessorsCPU(bmcName,
+                cpuURI, cpuRsp)
     else:
         printError(fname)
         printExtraError(label, msg)
@@ -101,18 +99,18 @@ dimmURIs = [
     ["OperatingSpeedMhz", int],
 ]
 
-def checkRedfishSystemsMemoryDimms(bmcName, dimmURI):
+def checkRedfishSystemsMemoryDimms(bmcName, dimmURI, rsp=None):
     fname = "checkRedfishSystemsMemoryDimms"
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + dimmURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
-
-    if payload:
-        mResponse = json.loads(payload)
+    if rsp is None:
+        path = "https://" + bmcName + dimmURI
+        dbgPrint(dbgMed, "%s checking %s", fname, path)
+        rsp = getRedfishJSON(path)
+    mResponse, label, msg = rsp
 
+    if mResponse is not None:
         if "Status" in mResponse:
             if mResponse["Status"]["State"] != "Absent":
                 for check in dimmURIs:
@@ -138,20 +136,18 @@ def checkRedfishSystemsMemory(bmcName, memURI):
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + memURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
-
-    if payload:
-        mResponse = json.loads(payload)
+    dbgPrint(dbgMed, "%s checking %s", fname, memURI)
+    rsp, members = getRedfishCollection(bmcName, memURI,
+            [check[FIELD] for check in dimmURIs] + ["Status"])
+    mResponse, label, msg = rsp
 
+    if mResponse is not None:
         for check in memoryURIs:
             badResults += validateField(fname, memURI,
                                     check[FIELD], mResponse, check[TYPE])
-            if check[FIELD] == "Members" and check[FIELD] in mResponse:
-                for member in mResponse[check[FIELD]]:
-                    badResults += checkRedfishSystemsMemoryDimms(bmcName,
-                        member["@odata.id"])
+        for dimmURI, dimmRsp in members:
+            badResults += checkRedfishSystemsMemoryDimms(bmcName,
+                dimmURI, dimmRsp)
     else:
         printError(fname)
         printExtraError(label, msg)
@@ -182,36 +178,29 @@ def checkRedfishSystems(bmcName):
     badResults = 0
 
     path = "https://" + bmcName + "/redfish/v1/Systems"
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "%s checking %s", fname, path)
+    (response, label, msg), members = getRedfishCollection(bmcName,
+            "/redfish/v1/Systems")
 
-    if not payload:
+    if response is None:
         printError(fname)
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     if "Members" not in response:
         printError(fname)
         printExtraError(path + " .Members", "missing")
         return 1
 
-    for member in response["Members"]:
-        path = "https://" + bmcName + member["@odata.id"]
-        dbgPrint(dbgMed, fname + " checking " + path)
-        payload, label, msg = makeRedfishCall("GET", path)
-
-        if not payload:
+    for memberURI, (mResponse, label, msg) in members:
+        if mResponse is None:
             printError(fname)
             printExtraError(label, msg)
             badResults += 1
             continue
 
-        mResponse = json.loads(payload)
-
         for check in systemsURIs:
-            badResults += validateField(fname, member["@odata.id"],
+            badResults += validateField(fname, memberURI,
                                     check[FIELD], mResponse, check[TYPE])
             if check[FIELD] == "Memory" and check[FIELD] in mResponse:
                 badResults += checkRedfishSystemsMemory(bmcName,
@@ -22,11 +22,33 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
+import threading
+import time
 
-from utils.debug import dbgPrint, dbgMed, dbgHigh
+from utils.debug import dbgPrint, dbgMed, dbgHigh, outPrint
 from utils.health import printOK, printError, printExtraError
-from utils.redfish import makeRedfishCall, isGigabyte, isHPEMountain, isHPERiver
+from utils.health import printWarning, printExtraWarning
+from utils.redfish import getRedfishJSON, isGigabyte, isHPEMountain, isHPERiver
+from utils.redfish import getRedfishCollection, invalidateRedfishCache
+from utils.results import setResultContext
+from utils.timeseries import RingBuffer, SensorSeries
+import config
+
+"""
+The sensor lists of the Power and Thermal resources and the field of their
+readings, polled by telemetrySoak
+"""
+soakReadings = [
+        ("Voltages", "ReadingVolts"),
+        ("PowerSupplies", "LineInputVoltage"),
+        ("Fans", "Reading"),
+        ("Temperatures", "ReadingCelsius"),
+        ]
+
+"""
+Stale sensors named in the warning of a BMC, the others are counted
+"""
+soakStaleNames = 5
 
 def checkAvgConsumedWatts(power):
     dbgPrint(dbgMed, "checkAvgConsumedWatts")
@@ -94,40 +116,34 @@ def telemetryPoll(bmcName):
     hostPath = "https://" + bmcName
 
     path = hostPath + "/redfish/v1/Chassis"
-    payload, label, msg = makeRedfishCall("GET", path)
+    chassisList, label, msg = getRedfishJSON(path)
 
-    if not payload:
+    if chassisList is None:
         printError("telemetryPoll")
         printExtraError(label, msg)
         return 1
 
-    chassisList = json.loads(payload)
-
     badResults = 0
 
     for chassis in chassisList['Members']:
         chassisPath = hostPath + chassis['@odata.id']
 
         path = chassisPath + "/Power"
-        payload, label, msg = makeRedfishCall("GET", path)
+        Power, label, msg = getRedfishJSON(path)
 
-        if not payload:
+        if Power is None:
             printError("telemetryPoll power")
             printExtraError(label, msg)
             return 1
 
-        Power = json.loads(payload)
-
         path = chassisPath + "/Thermal"
-        payload, label, msg = makeRedfishCall("GET", path)
+        Thermal, label, msg = getRedfishJSON(path)
 
-        if not payload:
+        if Thermal is None:
             printError("telemetryPoll thermal")
             printExtraError(label, msg)
             return 1
 
-        Thermal = json.loads(payload)
-
         # Gigabyte
         #   /Power
         #       .PowerControl.PowerMetrics.AverageConsumedWatts
@@ -215,4 +231,284 @@ def telemetryPoll(bmcName):
     if badResults == 0:
         printOK("telemetryPoll")
 
-    return badResults
\ No newline at end of file
+    return badResults
+
+def sensorReadings(chassisId, power, thermal):
+    r""" sensorReadings(chassisId, power, thermal) - returns the numeric
+    readings of the Power and Thermal resources of a chassis as a list of
+    (sensor, reading), sensor being "<chassisId> <list>/<sensor name>" """
+    readings = []
+    for i, control in enumerate((power or {}).get('PowerControl') or []):
+        watts = (control.get('PowerMetrics') or {}).get('AverageConsumedWatts')
+        readings.append(("%s PowerControl/%s" % (chassisId,
+                control.get('Name') or control.get('MemberId') or i), watts))
+    for resource in (power or {}), (thermal or {}):
+        for name, field in soakReadings:
+            for i, sensor in enumerate(resource.get(name) or []):
+                readings.append(("%s %s/%s" % (chassisId, name,
+                        sensor.get('Name') or sensor.get('MemberId') or i),
+                        sensor.get(field)))
+    return [(sensor, value) for sensor, value in readings
+            if isinstance(value, (int, float)) and not isinstance(value, bool)]
+
+class SoakSeries:
+    r""" The telemetry of one BMC collected by telemetrySoak: a SensorSeries
+    per sensor, the mean response time of every poll, and the counts of the
+    polls, the failed ones, and the ones missed because the previous poll
+    took longer than the interval """
+
+    def __init__(self, xname, bmcName):
+        self.xname = xname
+        self.bmcName = bmcName
+        self.lock = threading.Lock()
+        self.resources = None
+        self.sensors = {}
+        self.response = RingBuffer(config.soakSamples)
+        self.baseline = RingBuffer(config.soakBaseline)
+        self.polls = 0
+        self.failed = 0
+        self.missed = 0
+        self.error = None
+
+    def record(self, now, response, readings):
+        r""" record(now, response, readings) - adds the readings of a poll
+        taken at now, whose GETs took response seconds on average """
+        with self.lock:
+            self.polls += 1
+            self.response.append(response)
+            if self.baseline.count < self.baseline.size:
+                self.baseline.append(response)
+            for sensor, value in readings:
+                series = self.sensors.get(sensor)
+                if series is None:
+                    series = self.sensors[sensor] = SensorSeries(config.soakSamples)
+                series.add(value, now)
+
+    def fail(self, label, msg):
+        r""" fail(label, msg) - counts a failed poll """
+        with self.lock:
+            self.polls += 1
+            self.failed += 1
+            self.error = "%s: %s" % (label, msg) if label else msg
+
+    def drift(self):
+        r""" drift() - returns the baseline and the recent mean response time,
+        the recent one None until the polls after the baseline are as many """
+        with self.lock:
+            baseline = self.baseline.stats()[3]
+            if self.response.count < 2 * config.soakBaseline:
+                return baseline, None
+            return baseline, self.response.stats(config.soakBaseline)[3]
+
+    def stale(self, now):
+        r""" stale(now) - returns the names of the sensors whose reading has
+        not changed for config.soakStaleAfter seconds at now """
+        with self.lock:
+            return sorted(sensor for sensor, series in self.sensors.items()
+                    if series.unchanged(now) >= config.soakStaleAfter)
+
+def soakResources(series):
+    r""" soakResources(series) - returns the (chassis id, URI) of the Power
+    and Thermal resources of the chassis of a BMC, label, msg. The list is
+    None if the chassis could not be read. """
+    rsp, members = getRedfishCollection(series.bmcName, "/redfish/v1/Chassis",
+            ["Id", "Power", "Thermal"])
+    if rsp[0] is None:
+        return None, rsp[1], rsp[2]
+
+    resources = []
+    for uri, (chassis, label, msg) in members:
+        if chassis is None:
+            return None, label, msg
+        chassisId = chassis.get('Id') or uri.rsplit('/', 1)[-1]
+        for link in ('Power', 'Thermal'):
+            target = (chassis.get(link) or {}).get('@odata.id')
+            if target:
+                resources.append((chassisId, target))
+    return resources, "", ""
+
+def soakPoll(series):
+    r""" soakPoll(series) - GETs the Power and Thermal resources of a BMC,
+    bypassing the cache, and records their readings and response time """
+    if series.resources is None:
+        resources, label, msg = soakResources(series)
+        if resources is None:
+            series.fail(label, msg)
+            return
+        if not resources:
+            series.fail("Chassis", "No Power or Thermal resources")
+            return
+        series.resources = resources
+
+    now = time.monotonic()
+    elapsed = 0.0
+    readings = {}
+    for chassisId, uri in series.resources:
+        path = "https://" + series.bmcName + uri
+        invalidateRedfishCache(path)
+        start = time.monotonic()
+        resource, label, msg = getRedfishJSON(path)
+        elapsed += time.monotonic() - start
+        if resource is None:
+            series.fail(label, msg)
+            return
+        readings[(chassisId, uri.rsplit('/', 1)[-1])] = resource
+
+    values = []
+    for chassisId in dict.fromkeys(c for c, _ in series.resources):
+        values.extend(sensorReadings(chassisId, readings.get((chassisId, 'Power')),
+                readings.get((chassisId, 'Thermal'))))
+    series.record(now, elapsed / len(series.resources), values)
+
+def soakBMC(series, start, deadline, interval, stop):
+    r""" soakBMC(series, start, deadline, interval, stop) - polls a BMC every
+    interval seconds from start until deadline or until stop is set. Polls
+    that are due while the one before is still running are skipped and
+    counted as missed. """
+    due = start
+    while due < deadline and not stop.wait(max(0.0, due - time.monotonic())):
+        soakPoll(series)
+        due += interval
+        late = time.monotonic() - due
+        if late > 0:
+            skipped = int(late // interval) + 1
+            with series.lock:
+                series.missed += skipped
+            due += skipped * interval
+
+def soakSeconds(value):
+    r""" soakSeconds(value) - returns the seconds value for a report, "-" if
+    there are none """
+    return "-" if value is None or value != value else "%.3f" % value
+
+def soakReport(bmcs, now):
+    r""" soakReport(bmcs, now) - returns the lines of a table of the polls,
+    sensors, stale sensors, and baseline, recent, and longest response time
+    of the SoakSeries in bmcs """
+    width = max([len(s.xname) for s in bmcs] + [4])
+    lines = ["%-*s %6s %6s %6s %7s %5s %9s %9s %9s %6s" % (width, "BMC",
+            "Polls", "Failed", "Missed", "Sensors", "Stale", "Base(s)",
+            "Recent(s)", "Max(s)", "Drift")]
+    for series in bmcs:
+        baseline, recent = series.drift()
+        with series.lock:
+            longest = series.response.stats()[2]
+            polls, failed, missed = series.polls, series.failed, series.missed
+            sensors = len(series.sensors)
+        drift = "-"
+        if recent is not None and baseline > 0:
+            drift = "%.2fx" % (recent / baseline)
+        lines.append("%-*s %6d %6d %6d %7d %5d %9s %9s %9s %6s" % (width,
+                series.xname, polls, failed, missed, sensors,
+                len(series.stale(now)), soakSeconds(baseline),
+                soakSeconds(recent), soakSeconds(longest), drift))
+    return lines
+
+def soakSensors(series, now):
+    r""" soakSensors(series, now) - prints the rolling min, max, and mean of
+    the sensors of a BMC and how long their readings have been unchanged """
+    with series.lock:
+        for sensor in sorted(series.sensors):
+            data = series.sensors[sensor]
+            count, low, high, mean = data.stats()
+            dbgPrint(dbgMed, "%s %s: %d readings, min %.2f max %.2f mean %.2f "
+                    "last %.2f, repeated %d times over %.0fs", series.xname,
+                    sensor, count, low, high, mean, data.last, data.repeats,
+                    data.unchanged(now))
+
+def soakResults(series, now):
+    r""" soakResults(series, now) - records the results of the soak of a BMC
+    and returns its number of failures """
+    outPrint("\033[1;36m%s(%s):\033[0m" % ("redfish", series.xname))
+    setResultContext("redfish", series.xname)
+    soakSensors(series, now)
+    baseline, recent = series.drift()
+    stale = series.stale(now)
+    failures = 0
+
+    if series.polls == series.failed:
+        printError("telemetrySoak")
+        printExtraError(series.bmcName, "No telemetry (%s)" % series.error)
+        return 1
+
+    if series.sensors and len(stale) == len(series.sensors):
+        printError("telemetrySoak")
+        printExtraError(series.bmcName, "No reading changed for %ds" %
+                config.soakStaleAfter)
+        failures += 1
+
+    if (recent is not None and recent >= baseline * config.soakDriftLimit
+            and recent - baseline >= config.soakDriftMin):
+        printError("telemetrySoak")
+        printExtraError(series.bmcName, "Response time grew from %.3fs to "
+                "%.3fs" % (baseline, recent))
+        failures += 1
+
+    warnings = []
+    if series.failed:
+        warnings.append("%d of %d polls failed, last: %s" % (series.failed,
+                series.polls, series.error))
+    if series.missed:
+        warnings.append("%d polls missed, polling took longer than the "
+                "interval" % series.missed)
+    if stale and len(stale) < len(series.sensors):
+        names = ", ".join(stale[:soakStaleNames])
+        if len(stale) > soakStaleNames:
+            names += " and %d more" % (len(stale) - soakStaleNames)
+        warnings.append("%d of %d sensors unchanged for %ds: %s" % (len(stale),
+                len(series.sensors), config.soakStaleAfter, names))
+    if warnings:
+        printWarning("telemetrySoak")
+        for warning in warnings:
+            printExtraWarning(series.bmcName, warning)
+    elif failures == 0:
+        printOK("telemetrySoak")
+
+    return failures
+
+def telemetrySoak(bmcs, duration, interval=None):
+    r""" telemetrySoak(bmcs, duration, interval) - polls the Power and Thermal
+    telemetry of the BMCs, a list of (xname, bmcName), every interval seconds,
+    config.soakInterval if None, for duration seconds or until interrupted.
+    Prints a report every config.soakReportInterval seconds and at the end,
+    and returns the number of failures of each xname. A BMC fails if it sent
+    no telemetry, none of its readings changed for config.soakStaleAfter
+    seconds, or its response time drifted, see config.py. """
+    dbgPrint(dbgMed, "telemetrySoak")
+    interval = max(interval or config.soakInterval, 0.1)
+    series = [SoakSeries(xname, bmcName) for xname, bmcName in bmcs]
+    stop = threading.Event()
+    start = time.monotonic()
+    deadline = start + duration
+
+    # The first polls of the BMCs are spread over the interval
+    threads = []
+    for i, s in enumerate(series):
+        thread = threading.Thread(target=soakBMC, args=(s,
+                start + interval * i / len(series), deadline, interval, stop),
+                daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    print("Soaking %d BMCs for %ds, polling every %gs" % (len(series),
+            duration, interval))
+    try:
+        while any(t.is_alive() for t in threads):
+            if stop.wait(min(config.soakReportInterval,
+                    max(deadline - time.monotonic(), 0.1))):
+                break
+            if time.monotonic() < deadline:
+                print("After %ds:" % (time.monotonic() - start))
+                for line in soakReport(series, time.monotonic()):
+                    print(line)
+    except KeyboardInterrupt:
+        print("Soak interrupted after %ds" % (time.monotonic() - start))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    now = time.monotonic()
+    for line in soakReport(series, now):
+        print(line)
+    return {s.xname: soakResults(s, now) for s in series}
@@ -22,13 +22,12 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK
 from utils.health import printInfo, printExtraInfo
 from utils.health import printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE
+from utils.redfish import getRedfishJSON, getRedfishCollection
+from utils.redfish import validateField, FIELD, TYPE
 
 fwInvFields = [
     ["@odata.id", str],
@@ -37,18 +36,18 @@ fwInvFields = [
     ["Name", str],
 ]
 
-def checkRedfishFirmwareInventoryComp(bmcName, fwURI):
+def checkRedfishFirmwareInventoryComp(bmcName, fwURI, rsp=None):
     fname = "checkRedfishFirmwareInventoryComp"
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + fwURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
-
-    if payload:
-        mResponse = json.loads(payload)
+    if rsp is None:
+        path = "https://" + bmcName + fwURI
+        dbgPrint(dbgMed, "%s checking %s", fname, path)
+        rsp = getRedfishJSON(path)
+    mResponse, label, msg = rsp
 
+    if mResponse is not None:
         for check in fwInvFields:
             badResults += validateField(fname, fwURI, check[FIELD], mResponse,
                                     check[TYPE])
@@ -64,18 +63,15 @@ def checkRedfishFirmwareInventory(bmcName, fwURI):
     dbgPrint(dbgMed, fname)
     badResults = 0
 
-    path = "https://" + bmcName + fwURI
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
-
-    if payload:
-        response = json.loads(payload)
+    dbgPrint(dbgMed, "%s checking %s", fname, fwURI)
+    (response, label, msg), members = getRedfishCollection(bmcName, fwURI,
+            [check[FIELD] for check in fwInvFields])
 
+    if response is not None:
         badResults += validateField(fname, fwURI, "Members", response, list)
-        if "Members" in response:
-            for member in response["Members"]:
-                badResults += checkRedfishFirmwareInventoryComp(bmcName,
-                    member["@odata.id"])
+        for compURI, rsp in members:
+            badResults += checkRedfishFirmwareInventoryComp(bmcName,
+                compURI, rsp)
     else:
         printError(fname)
         printExtraError(label, msg)
@@ -94,16 +90,14 @@ def checkRedfishUpdateService(bmcName):
     badResults = 0
 
     path = "https://" + bmcName + "/redfish/v1/UpdateService"
-    dbgPrint(dbgMed, fname + " checking " + path)
-    payload, label, msg = makeRedfishCall("GET", path)
+    dbgPrint(dbgMed, "%s checking %s", fname, path)
+    response, label, msg = getRedfishJSON(path)
 
-    if not payload:
+    if response is None:
         printError(fname)
         printExtraError(label, msg)
         return 1
 
-    response = json.loads(payload)
-
     # Check Actions structure
     aField = response["Actions"]["#UpdateService.SimpleUpdate"]
     for e in actionFields:
@@ -22,11 +22,9 @@
 # ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
 # OTHER DEALINGS IN THE SOFTWARE.
 
-import json
-
 from utils.debug import dbgPrint, dbgMed
 from utils.health import printOK, printError, printExtraError
-from utils.redfish import makeRedfishCall, validateField, FIELD, TYPE, URI
+from utils.redfish import getRedfishJSON, validateField, FIELD, TYPE, URI
 
 URIData = [
     # [ URI, [field1, expectedType1, [subField1, subExpectedType1]], ..., [fieldN, expectedN]]
@@ -48,17 +46,15 @@ def checkRedfishURIs(bmcName):
 
     for entry in URIData:
         path = hostPath + entry[URI]
-        dbgPrint(dbgMed, "checkRedfishURIs checking " + path)
-        payload, label, msg = makeRedfishCall("GET", path)
+        dbgPrint(dbgMed, "checkRedfishURIs checking %s", path)
+        response, label, msg = getRedfishJSON(path)
 
-        if not payload:
+        if response is None:
             printError("checkRedfishURIs")
             printExtraError(label, msg)
             badResults += 1
             continue
 
-        response = json.loads(payload)
-
         idx = 1
         while idx < len(entry):
             e = entry[idx]
@@ -0,0 +1,214 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+"""
+Durable on-disk log of the Redfish events received by a listener.
+
+The request handler only puts an event in a bounded in-memory queue and
+returns, so a burst of events from many BMCs is absorbed by the queue instead
+of backing up the listener's sockets. One background thread takes the events
+off the queue and appends them as JSON Lines to gzip files, which are rotated
+when they reach a size or an age. If the queue is full the event is dropped
+and counted, the listener keeps answering.
+
+Every line is an object with the time the event was received, the address it
+came from, the BMC from the destination path, and the event itself, or its raw
+text if it is not JSON. The writer flushes the gzip stream at least every
+second and whenever the queue is empty, so the files can be read with zcat
+while they are written and a crash loses at most the last second of events.
+
+Classes:
+    EventSink
+    RotatingJSONLWriter
+"""
+
+#pylint: disable=C0103
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+
+FLUSH_INTERVAL = 1.0
+
+
+class RotatingJSONLWriter:
+    """
+    Appends JSON objects as lines to gzip files in directory, starting a new
+    file when the current one has max_bytes compressed bytes or is
+    max_seconds old.
+    """
+
+    def __init__(self, directory, prefix="events", max_bytes=64 << 20,
+                 max_seconds=3600):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.raw = None
+        self.gz = None
+        self.opened = 0.0
+        self.files = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def open(self):
+        """Start a new file, named by the time it was started."""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        for n in range(1000):
+            name = f"{self.prefix}-{stamp}" + (f"-{n}" if n else "") + ".jsonl.gz"
+            try:
+                self.raw = open(os.path.join(self.directory, name), 'xb') # pylint: disable=consider-using-with
+                break
+            except FileExistsError:
+                continue
+        else:
+            raise FileExistsError(f"No free file name for {stamp}")
+        self.gz = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.opened = time.monotonic()
+        self.files += 1
+
+    def write(self, record):
+        """Append record as a line, rotating the file first if it is due."""
+        if self.gz is not None and (
+                self.raw.tell() >= self.max_bytes or
+                time.monotonic() - self.opened >= self.max_seconds):
+            self.close()
+        if self.gz is None:
+            self.open()
+        self.gz.write(json.dumps(record, separators=(',', ':')).encode() + b"\n")
+
+    def flush(self):
+        """Make the lines written so far readable from the file."""
+        if self.gz is not None:
+            self.gz.flush(zlib.Z_SYNC_FLUSH)
+            self.raw.flush()
+
+    def close(self):
+        """Finish the current file and sync it to disk."""
+        if self.gz is None:
+            return
+        self.gz.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.raw.close()
+        self.gz = self.raw = None
+
+
+class EventSink:
+    """
+    Bounded queue of received events, written to disk by a background
+    RotatingJSONLWriter, with counters of the events received, dropped
+    because the queue was full, and written.
+    """
+
+    def __init__(self, writer, max_queue=10000):
+        self.writer = writer
+        self.queue = queue.Queue(max_queue)
+        self.lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """Start the writer thread."""
+        self.thread.start()
+
+    def put(self, source, path, body):
+        """
+        Queue an event without waiting. Returns False if it was dropped.
+
+        Parameters:
+            source (string): Address the event came from.
+            path (string): Destination path the event was POSTed to.
+            body (bytes): The event.
+        """
+        received = time.time()
+        try:
+            self.queue.put_nowait((received, source, path, body))
+        except queue.Full:
+            with self.lock:
+                self.received += 1
+                self.dropped += 1
+            return False
+        with self.lock:
+            self.received += 1
+        return True
+
+    def run(self):
+        """Write queued events until stop() queues None."""
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = False
+            if item is None:
+                break
+            if item:
+                self.write(*item)
+            now = time.monotonic()
+            if self.queue.empty() or now - last_flush >= FLUSH_INTERVAL:
+                self.writer.flush()
+                last_flush = now
+
+    def write(self, received, source, path, body):
+        """Write one event."""
+        record = {
+            'received': datetime.fromtimestamp(received, timezone.utc).isoformat(),
+            'source': source,
+            'bmc': path.split('?')[0].strip('/'),
+        }
+        try:
+            record['event'] = json.loads(body)
+        except ValueError:
+            record['raw'] = body.decode(errors='replace')
+        try:
+            self.writer.write(record)
+        except OSError:
+            with self.lock:
+                self.errors += 1
+            return
+        with self.lock:
+            self.written += 1
+
+    def stop(self):
+        """Write the events still queued and close the file."""
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.close()
+
+    def stats(self):
+        """Returns the counters of the sink."""
+        with self.lock:
+            return {
+                'received': self.received,
+                'dropped': self.dropped,
+                'queued': self.queue.qsize(),
+                'written': self.written,
+                'errors': self.errors,
+                'files': self.writer.files,
+            }
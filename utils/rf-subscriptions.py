@@ -25,29 +25,32 @@
 """
 Support creating, deleting, and listening for subscriptions
 
-Classes:
-    HandleRequest
+The listener is the asyncio EventListener of hwval/utils/event_listener.py, which
+keeps thousands of BMC connections open on one event loop and lets the BMCs
+resume their TLS sessions. It hands the events to an EventSink, which writes
+them to rotating gzip JSON Lines files from a background thread, see
+event_sink.py. The counters of both are logged every --stats-interval seconds.
+
+create, delete, and list take a hostlist of BMCs, such as x3000c0s[1-32]b0, and
+run on up to --parallel BMCs at the same time. A table of the result of every
+BMC is logged at the end.
 
 Functions:
-    determine_bmc_type(object) -> string
-    determine_scheme(object) -> string
-    event_delete(object) -> int
-    event_subscribe(object, string, string, bool) -> int
-    list_subscriptions(object) -> object
+    create_subscription(object, string) -> int, string
+    determine_profile(object, string) -> object
+    event_delete(object, string) -> int, int
+    event_subscribe(object, string, string, string, bool) -> int
+    get_subscriptions(object, string) -> list
+    list_subscriptions(object, string) -> int, list
+    log_listener_stats(object)
+    log_sink_stats(object)
     main() -> int
     make_redfish_call(object, string, string, object, bool) -> string
-    start_redfish_event_server(object)
-
-Misc Variables:
-    event
-    httpd
-    http_thread
+    run_on_bmcs(object, list, function) -> list
+    start_redfish_event_server(object, string)
 """
 
 # pylint: disable=invalid-name
-# pylint: disable=global-statement
-# pylint: disable=global-variable-not-assigned
-# pylint: disable=deprecated-method
 
 from datetime import datetime
 
@@ -55,14 +58,28 @@ import os
 import sys
 import argparse
 import logging
-import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import ssl
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
 import json
 import requests
 import urllib3
 
-VERSION = "0.0.1"
+from event_sink import EventSink, RotatingJSONLWriter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "validation"))
+from request_profile import add_profile_arguments, start_profile # pylint: disable=wrong-import-position
+from redfish_session import add_session_arguments, configure_session, get_session # pylint: disable=wrong-import-position
+from redfish_session import expand_query, get_bmc_profile # pylint: disable=wrong-import-position
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+from utils.hostlist import compress, expand # pylint: disable=wrong-import-position
+from utils import bmc_profile # pylint: disable=wrong-import-position
+from utils.bmc_profile import disable_expand, is_expanded # pylint: disable=wrong-import-position
+from utils.event_listener import EventListener, server_context # pylint: disable=wrong-import-position
+
+VERSION = "0.7.1"
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -78,30 +95,6 @@ VERBOSE2 = logging.INFO - 2
 logging.addLevelName(VERBOSE1, "VERBOSE1")
 logging.addLevelName(VERBOSE2, "VERBOSE2")
 
-CRAY_BMC = "Cray"
-GIGABYTE_BMC = "Gigabyte"
-HPE_BMC = "HPE"
-INTEL_BMC = "Intel"
-OPEN_BMC = "OpenBmc" # Foxconn Paradise
-UNKNOWN_BMC = "Unknown"
-
-event = threading.Event()
-
-
-class HandleRequest(BaseHTTPRequestHandler):
-    """Simple HTTP server to receive streaming telemetry."""
-
-    def do_POST(self):
-        """Handler for POSTs from Redfish endpoint."""
-        content_len = int(self.headers.get('Content-Length'))
-        post_body = self.rfile.read(content_len)
-        logger.info(post_body)
-        global event
-        event.set()
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-
 
 def make_redfish_call(args, action, targPath, reqData=None, suppress_logs=False):
     """
@@ -134,15 +127,19 @@ def make_redfish_call(args, action, targPath, reqData=None, suppress_logs=False)
 
     logger.debug(f"request: {action}, url: {targPath}, headers: {headers}, request_body: {reqData}")
 
-    if action == "GET":
-        r = requests.get(url=targPath, auth=auth, headers=headers,
-                         verify=False, timeout=30)
-    elif action == "POST":
-        r = requests.post(url=targPath, auth=auth, headers=headers,
-                          data=reqData, verify=False, timeout=30)
-    elif action == "DELETE":
-        r = requests.delete(url=targPath, auth=auth, verify=False, timeout=30)
-    else:
+    try:
+        if action == "GET":
+            r = get_session().get(url=targPath, auth=auth, headers=headers,
+                                  verify=False)
+        elif action == "POST":
+            r = get_session().post(url=targPath, auth=auth, headers=headers,
+                                   data=reqData, verify=False)
+        elif action == "DELETE":
+            r = get_session().delete(url=targPath, auth=auth, verify=False)
+        else:
+            return None
+    except requests.RequestException as e:
+        logger.warning(f"Redfish {action} for {targPath} failed: {e}")
         return None
 
     json_body = r.text
@@ -161,9 +158,33 @@ def make_redfish_call(args, action, targPath, reqData=None, suppress_logs=False)
     return json_body
 
 
+def log_sink_stats(sink):
+    """Log the counters of an EventSink."""
+    stats = sink.stats()
+    logger.info("Events received: %d, dropped: %d, queued: %d, written: %d, "
+                "write errors: %d, files: %d", stats['received'],
+                stats['dropped'], stats['queued'], stats['written'],
+                stats['errors'], stats['files'])
+
+
+def log_listener_stats(listener):
+    """Log the counters of an EventListener and start its peaks over."""
+    stats = listener.stats(reset=True)
+    logger.info("Connections open: %d, peak: %d, accepted: %d, refused: %d, "
+                "idle closed: %d, TLS sessions resumed: %d of %d",
+                stats['connections'], stats['peak'], stats['accepted'],
+                stats['refused'], stats['timeouts'], stats['resumed'],
+                stats['handshakes'])
+    logger.info("Requests: %d, bytes: %d, failed: %d, max event loop lag: "
+                "%.3fs, max handling time: %.3fs", stats['requests'],
+                stats['bytes'], stats['errors'], stats['lag'],
+                stats['handler'])
+
+
 def start_redfish_event_server(args, scheme):
     """
-    Start an HTTP server to receive streaming telemetry.
+    Receive Redfish events and write them to args.event_dir until
+    interrupted.
 
     Parameters:
         args (object): Command line arguments.
@@ -171,28 +192,52 @@ def start_redfish_event_server(args, scheme):
     """
     logger.debug("Starting %s Redfish event server.", scheme)
     logger.debug("ip %s port %s", args.ip, args.port)
-    httpd = HTTPServer((args.ip, int(args.port)), HandleRequest)
+    context = None
     if scheme == "https":
-        httpd.socket = ssl.wrap_socket(httpd.socket, certfile="cert/tls.crt",
-                                       keyfile="cert/tls.key", server_side=True)
-
-    def serve_forever(httpd):
-        with httpd:
-            httpd.serve_forever()
-
-    http_thread = threading.Thread(target=serve_forever, args=(httpd,))
-    http_thread.daemon = True
-    http_thread.start()
-    logger.info(f"Started http server. scheme: {scheme}, ip: {args.ip}, port: {args.port}")
-    http_thread.join()
-
-
-def event_subscribe(args, scheme, bmc_type, is_telemetry_subscription):
+        context = server_context("cert/tls.crt", "cert/tls.key")
+
+    writer = RotatingJSONLWriter(args.event_dir,
+                                 max_bytes=int(args.rotate_size * (1 << 20)),
+                                 max_seconds=args.rotate_interval)
+    sink = EventSink(writer, args.queue_size)
+
+    def queue_event(source, path, body):
+        logger.debug("%s %s: %s", source, path, body)
+        # The event is acknowledged even when it is dropped, BMCs such as iLO
+        # delete a subscription whose deliveries keep failing
+        sink.put(source, path, body)
+
+    # No BMC is registered, every event goes to the sink
+    listener = EventListener((args.ip, int(args.port)), context, queue_event,
+                             args.max_connections)
+    sink.start()
+    listener.start()
+    logger.info(f"Started http server. scheme: {scheme}, ip: {args.ip}, port: {args.port}, events: {args.event_dir}")
+
+    # Stop on SIGTERM as on Ctrl-C, so the queued events are written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            time.sleep(args.stats_interval)
+            log_listener_stats(listener)
+            log_sink_stats(sink)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        listener.shutdown()
+        listener.server_close()
+        sink.stop()
+        log_listener_stats(listener)
+        log_sink_stats(sink)
+
+
+def event_subscribe(args, bmc, scheme, bmc_type, is_telemetry_subscription):
     """
     Sends a subscribe request to the Redfish endpoint.
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
         scheme (string): Secure or unsecure http protocol.
         bmc_type (string): The bmc type (cray, gigabyte, hpe, intel, or openBmc)
         is_telemetry_subscription: true if the subscription should be for telemetry
@@ -200,14 +245,14 @@ def event_subscribe(args, scheme, bmc_type, is_telemetry_subscription):
     Returns:
         result (int): 0 for success, 1 for failure
     """
-    logger.debug("Subscribing to Redfish events with %s.", scheme)
+    logger.debug("Subscribing to Redfish events on %s with %s.", bmc, scheme)
 
     event_types = ["Alert"]
-    if bmc_type == CRAY_BMC:
+    if bmc_type == bmc_profile.CRAY:
         event_types = ["StatusChange", "Alert", "ResourceUpdated", "ResourceAdded", "ResourceRemoved"]
 
-    destination = f"{scheme}://{args.ip}:{args.port}/{args.bmc}"
-    context = f"{args.bmc}-sub-tool"
+    destination = f"{scheme}://{args.ip}:{args.port}/{bmc}"
+    context = f"{bmc}-sub-tool"
 
     sub = {
         'Context': context,
@@ -218,174 +263,184 @@ def event_subscribe(args, scheme, bmc_type, is_telemetry_subscription):
     if is_telemetry_subscription:
         sub['RegistryPrefixes'] = ["CrayTelemetry"]
 
-    path = f"https://{args.bmc}/redfish/v1/EventService/Subscriptions"
+    path = f"https://{bmc}/redfish/v1/EventService/Subscriptions"
 
     rsp = make_redfish_call(args, "POST", path, json.dumps(sub))
 
     if not rsp:
-        logger.warning("Redfish call to create subscription failed.")
+        logger.warning(f"Redfish call to create subscription on {bmc} failed.")
         return 1
 
-    logger.info(f"Created subscription. bmc: {bmc_type}, scheme: {scheme}, Context: {context}, Destination: {destination}, EventTypes: {event_types}")
+    logger.debug(f"Created subscription. bmc: {bmc_type}, scheme: {scheme}, Context: {context}, Destination: {destination}, EventTypes: {event_types}")
     return 0
 
 
-def list_subscriptions(args):
+# Properties of a subscription that list and delete use
+SUBSCRIPTION_FIELDS = ["Context", "Destination", "EventTypes", "RegistryPrefixes"]
+
+
+def get_subscriptions(args, bmc):
     """
-    List all the subscriptions for a BMC
+    Get all the subscriptions of a BMC
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
     Returns:
-        result (int): 0 for success, 1 for failure
+        sub_list (list): The subscriptions, None on failure.
     """
     sub_list = []
-    path = f"https://{args.bmc}/redfish/v1/EventService/Subscriptions"
-
-    rsp = make_redfish_call(args, "GET", path)
+    path = f"https://{bmc}/redfish/v1/EventService/Subscriptions"
+
+    # Fetch the subscriptions with the collection if the BMC can expand it
+    query = expand_query(bmc, requests.auth.HTTPBasicAuth(args.user, args.passwd),
+                         SUBSCRIPTION_FIELDS)
+    rsp = make_redfish_call(args, "GET", path + query) if query else None
+    if query and not rsp:
+        disable_expand(bmc)
+    if not rsp:
+        rsp = make_redfish_call(args, "GET", path)
     if not rsp:
         logger.warning(f"Redfish call to list subscriptions failed. {path}")
-        return 1
+        return None
 
     subscriptions = json.loads(rsp)
     for subscription in subscriptions['Members']:
+        if is_expanded(subscription):
+            sub_list.append(subscription)
+            continue
         entry = subscription['@odata.id']
-        path = f"https://{args.bmc}{entry}"
+        path = f"https://{bmc}{entry}"
 
         rsp = make_redfish_call(args, "GET", path)
 
         if not rsp:
-            logger.warning("Redfish call to get subscription entry %s failed.", entry)
-            return 1
+            logger.warning("Redfish call to get subscription entry %s on %s failed.", entry, bmc)
+            return None
 
         sub = json.loads(rsp)
         sub_list.append(sub)
 
-    # print results
-    for sub in sub_list:
-        logger.info(f'{sub.get("Context"):<20} {sub.get("Destination"):<40} {sub.get("EventTypes", "")} {sub.get("RegistryPrefixes", "")}')
-
-    return 0
+    return sub_list
 
 
-def event_delete(args):
+def list_subscriptions(args, bmc):
     """
-    Finds and deletes the subscription that this test created.
+    List all the subscriptions for a BMC
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
     Returns:
         result (int): 0 for success, 1 for failure
+        lines (list): A line for each subscription
     """
-    logger.debug("Deleting subscriptions created by this test.")
-    path = f"https://{args.bmc}/redfish/v1/EventService/Subscriptions"
-
-    rsp = make_redfish_call(args, "GET", path)
-
-    if not rsp:
-        logger.warning(f"Redfish call to list subscriptions failed. {path}")
-        return 1
+    sub_list = get_subscriptions(args, bmc)
+    if sub_list is None:
+        return 1, ["list failed"]
 
-    subCollection = json.loads(rsp)
+    lines = [f'{sub.get("Context") or "-":<20} {sub.get("Destination") or "-":<40} {sub.get("EventTypes", "")} {sub.get("RegistryPrefixes", "")}'
+             for sub in sub_list]
+    return 0, lines or ["(none)"]
 
-    count = 0
-    for subEntry in subCollection['Members']:
-        entry = subEntry['@odata.id']
-        path = f"https://{args.bmc}{entry}"
 
-        rsp = make_redfish_call(args, "GET", path)
+def event_delete(args, bmc):
+    """
+    Finds and deletes the subscription that this test created.
 
-        if not rsp:
-            logger.warning("Redfish call to get subscription entry %s failed.", entry)
-            return 1
+    Parameters:
+        args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
-        sub = json.loads(rsp)
+    Returns:
+        result (int): 0 for success, 1 for failure
+        count (int): Number of subscriptions deleted
+    """
+    logger.debug("Deleting subscriptions created by this test on %s.", bmc)
 
-        if sub['Context'] == f"{args.bmc}-sub-tool":
-            count += 1
+    sub_list = get_subscriptions(args, bmc)
+    if sub_list is None:
+        return 1, 0
 
+    count = 0
+    for sub in sub_list:
+        if sub.get('Context') == f"{bmc}-sub-tool":
+            path = f"https://{bmc}{sub['@odata.id']}"
             rsp = make_redfish_call(args, "DELETE", path)
 
             if not rsp:
-                logger.warning("Redfish call to delete subscription entry %s failed.", entry)
-                return 1
+                logger.warning("Redfish call to delete subscription entry %s failed.", path)
+                return 1, count
 
-            logger.info(f"Deleted url: {path}, context: {sub['Context']}")
-    return 0
+            count += 1
+            logger.debug(f"Deleted url: {path}, context: {sub['Context']}")
+    return 0, count
 
 
-def determine_bmc_type(args):
+def create_subscription(args, bmc):
     """
-    Determine the BMC type by getting /redfish/v1/Chassis
+    Determine the BMC type and scheme of a BMC and subscribe to its events.
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
     Returns:
-        bmc_type (string): The bmc type (cray, gigabyte, hpe, intel, or openBmc)
+        result (int): 0 for success, 1 for failure
+        detail (string): The BMC type and scheme of the subscription
     """
-    cray_redfish_path = "/redfish/v1/Chassis/Enclosure"
-    gigabyte_redfish_path = "/redfish/v1/Chassis/Self"
-    hpe_redfish_path = "/redfish/v1/Chassis/1"
-    intel_redfish_path = "/redfish/v1/Chassis/RackMount"
-    open_bmc_redfish_path = "/redfish/v1/Chassis/BMC_0"
-
-    path = f"https://{args.bmc}/redfish/v1/Chassis"
-    rsp = make_redfish_call(args, "GET", path)
-    if not rsp:
-        return ""
-    chassis = json.loads(rsp)
-
-    for member in chassis['Members']:
-        url = member["@odata.id"]
-        if url == cray_redfish_path:
-            logger.debug("Cray BMC")
-            return CRAY_BMC
-        elif url == gigabyte_redfish_path:
-            logger.debug("Gigabyte BMC")
-            return GIGABYTE_BMC
-        elif url == hpe_redfish_path:
-            logger.debug("HPE BMC")
-            return HPE_BMC
-        elif url == intel_redfish_path:
-            logger.debug("Intel BMC")
-            return INTEL_BMC
-        elif url == open_bmc_redfish_path:
-            logger.debug("OpenBmc BMC")
-            return OPEN_BMC
-    logger.debug(f"Unknown BMC Type. Redfish Chassis: {rsp}")
-    return UNKNOWN_BMC
-
-
-def determine_scheme(args):
+    profile = determine_profile(args, bmc)
+    if profile is None:
+        return 1, "unreachable"
+    detail = f"{profile['vendor']} {profile['scheme']}"
+    return event_subscribe(args, bmc, profile['scheme'], profile['vendor'],
+                           args.telemetry), detail
+
+
+def run_on_bmcs(args, bmcs, func):
     """
-    Check if we are talking to an iLO device. If we are, we need to use https
-    instead of http for the server.
+    Run func(args, bmc) for every BMC, up to args.parallel at the same time.
+    An exception raised for one BMC is its failed result, the other BMCs are
+    still run.
 
     Parameters:
         args (object): Command line arguments.
+        bmcs (list): BMC names or IPs.
+        func (function): Returns the result (0 or 1) and details for a BMC.
 
     Returns:
-        scheme (string): Secure or unsecure http protocol.
+        results (list): The result and details of each BMC, in order.
     """
-    logger.debug("Determining which http scheme to use.")
-    path = f"https://{args.bmc}/redfish/v1/Registries/iLO"
-
-    rsp = make_redfish_call(args, "GET", path, suppress_logs=True)
+    def run(bmc):
+        try:
+            return func(args, bmc)
+        except Exception as e: # pylint: disable=broad-except
+            logger.debug("%s on %s", func.__name__, bmc, exc_info=True)
+            return 1, f"error: {e}"
 
-    if rsp:
-        return "https"
+    with ThreadPoolExecutor(max_workers=max(1, min(args.parallel, len(bmcs)))) as pool:
+        return list(pool.map(run, bmcs))
 
-    path = f"https://{args.bmc}/redfish/v1/Registries/OpenBMC"
 
-    rsp = make_redfish_call(args, "GET", path, suppress_logs=True)
+def determine_profile(args, bmc):
+    """
+    Get the profile of a BMC, with its vendor and the scheme its events must be
+    sent with. It is probed only if no run of the HMS tools did within
+    --bmc-cache-age seconds.
 
-    if rsp:
-        return "https"
+    Parameters:
+        args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
-    return "http"
+    Returns:
+        profile (object): The BMC profile, None if the BMC could not be probed.
+    """
+    profile = get_bmc_profile(bmc, requests.auth.HTTPBasicAuth(args.user, args.passwd))
+    if profile is not None:
+        logger.debug("%s BMC, events over %s", profile['vendor'], profile['scheme'])
+    return profile
 
 
 def main(argslist=None):
@@ -396,7 +451,7 @@ def main(argslist=None):
                         nargs="?")
     parser.add_argument('-i', '--ip', help='IP address to listen on.')
     parser.add_argument('-r', '--port', help='Port to listen on.')
-    parser.add_argument('-b', '--bmc', help='BMC name or IP.')
+    parser.add_argument('-b', '--bmc', help='BMC names or IPs, hostlist style: x3000c0s[1-8]b0.')
     parser.add_argument('-u', '--user', help='Redfish user name.')
     parser.add_argument('-p', '--passwd', help='Redfish password.')
     parser.add_argument('-v', '--verbose', action='store_true',
@@ -407,6 +462,24 @@ def main(argslist=None):
                         help='Directory for log files')
     parser.add_argument('-t', '--telemetry', action='store_true',
                         help='Create a telemetry subscription')
+    parser.add_argument('-P', '--parallel', type=int, default=32,
+                        help='Number of BMCs to create, delete, or list at the same time.')
+    parser.add_argument('--event-dir', default="events",
+                        help='Directory listen writes the events to.')
+    parser.add_argument('--queue-size', type=int, default=10000,
+                        help='Events listen holds in memory for the writer, '
+                        'more are dropped.')
+    parser.add_argument('--rotate-size', type=float, default=64,
+                        help='MiB after which listen starts a new event file.')
+    parser.add_argument('--rotate-interval', type=float, default=3600,
+                        help='Seconds after which listen starts a new event file.')
+    parser.add_argument('--stats-interval', type=float, default=60,
+                        help='Seconds between the event counters listen logs.')
+    parser.add_argument('--max-connections', type=int, default=0,
+                        help='BMC connections listen serves at the same time, '
+                        'more are closed as they arrive, 0 for no limit.')
+    add_profile_arguments(parser)
+    add_session_arguments(parser)
     args = parser.parse_args(argslist)
 
     if args.verbose:
@@ -436,32 +509,57 @@ def main(argslist=None):
         logger.info("%s: %s", __file__, VERSION)
         return 0
 
+    start_profile(args, logger)
+    configure_session(args)
+
+    try:
+        bmcs = expand(args.bmc).split(",") if args.bmc else []
+    except ValueError as e:
+        logger.error("Invalid BMC list %s: %s", args.bmc, e)
+        return 1
+
     if args.command == "listen":
-        scheme = determine_scheme(args)
-        start_redfish_event_server(args, scheme)
-        return 0
-    elif args.command == "create":
-        bmc_type = determine_bmc_type(args)
-        scheme = determine_scheme(args)
-        rsp = event_subscribe(args, scheme, bmc_type, args.telemetry)
-        if rsp != 0:
-            logger.error("FAIL: Could not subscribe to Redfish event notifications.")
+        profile = determine_profile(args, bmcs[0]) if bmcs else None
+        scheme = profile['scheme'] if profile else "http"
+        try:
+            start_redfish_event_server(args, scheme)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error("FAIL: Could not listen for Redfish events: %s", e)
             return 1
         return 0
-    elif args.command == "delete":
-        rsp = event_delete(args)
-        if rsp != 0:
-            logger.error("Failed to delete Redfish event notification subscription.")
+    elif args.command in ("create", "delete", "list"):
+        if not bmcs:
+            logger.error("No BMC given.")
             return 1
-        return 0
-    elif args.command == "list":
-        list_subscriptions(args)
-        return 0
+        func = {"create": create_subscription, "delete": event_delete,
+                "list": list_subscriptions}[args.command]
+        results = run_on_bmcs(args, bmcs, func)
     else:
         if not args.version:
             parser.print_help()
         return 1
 
+    width = max(len(bmc) for bmc in bmcs)
+    for bmc, (rsp, detail) in zip(bmcs, results):
+        if args.command == "list":
+            for line in [detail] if isinstance(detail, str) else detail:
+                logger.info(f"{bmc:<{width}} {line}")
+        elif args.command == "delete":
+            logger.info(f"{bmc:<{width}} {'deleted ' + str(detail) if rsp == 0 else 'failed, deleted ' + str(detail)}")
+        else:
+            logger.info(f"{bmc:<{width}} {'created' if rsp == 0 else 'failed'} {detail}")
+
+    failed = [bmc for bmc, (rsp, _) in zip(bmcs, results) if rsp != 0]
+    if failed:
+        if args.command == "create":
+            logger.error("FAIL: Could not subscribe to Redfish event notifications on %s.", compress(failed))
+        elif args.command == "delete":
+            logger.error("Failed to delete Redfish event notification subscription on %s.", compress(failed))
+        else:
+            logger.error("Failed to list subscriptions on %s.", compress(failed))
+        return 1
+    return 0
+
 
 if __name__ == "__main__":
     result = main()
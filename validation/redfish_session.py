@@ -0,0 +1,222 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+"""
+The shared session of the Redfish requests of a run.
+
+Every request has the connect and read timeouts of hwval's config.py, and
+follows the retry policy and circuit breaker of utils.resilience in hwval, the
+same as hwval's own requests: a request to a BMC whose circuit is open fails at
+once with CircuitOpenError. The options of add_session_arguments() change
+those config.py settings for the run.
+
+The session also records its requests while profiling is enabled, see
+request_profile.
+
+Each BMC is probed once for its profile, see get_bmc_profile(), which is saved
+for later runs of all the tools. Collections can be fetched together with their
+members from BMCs whose profile says they support $expand, and limited to some
+properties if they also support $select; expand_query() returns the query
+string to use for a BMC, from the helper shared with hwval.
+
+Classes:
+    BMCPrefix
+    RedfishSession
+
+Functions:
+    add_session_arguments(object)
+    bmc_getter(string, object) -> function
+    configure_session(object)
+    expand_query(string, object, list) -> string
+    get_bmc_profile(string, object) -> object
+    get_session() -> object
+
+Misc Variables:
+    SETTINGS - The connection pools of the session
+"""
+
+#pylint: disable=C0103
+
+import logging
+import os
+import sys
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+# pylint: disable=wrong-import-position
+import config
+from utils import bmc_profile
+from utils.resilience import BREAKER, CircuitOpenError, retry_policy
+from utils.timing import TimedHTTPAdapter, TimedSession
+
+SETTINGS = {
+    'bmc_pools': 1024,        # BMCs whose connections are kept alive
+}
+
+
+class BMCPrefix(logging.Filter):
+    """
+    Prefixes the log messages of a thread with the BMC it is testing, when
+    several BMCs are tested at the same time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.local = threading.local()
+
+    def filter(self, record):
+        bmc = getattr(self.local, 'bmc', None)
+        if bmc is not None:
+            record.msg = f"{bmc}: {record.msg}"
+        return True
+
+
+class RedfishSession(TimedSession):
+    """
+    TimedSession with the timeouts, retry policy, and circuit breaker of the
+    run.
+    """
+
+    def __init__(self, breaker):
+        super().__init__()
+        self.breaker = breaker
+        adapter = TimedHTTPAdapter(pool_connections=SETTINGS['bmc_pools'],
+                                   max_retries=retry_policy())
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs): # pylint: disable=W0221
+        bmc = urlsplit(url).netloc
+        if self.breaker.is_open(bmc):
+            raise CircuitOpenError("%s is unreachable, skipped %s %s"
+                                   % (bmc, method, url))
+        kwargs.setdefault('timeout', (config.rfConnectTimeout,
+                                      config.rfReadTimeout))
+        try:
+            r = super().request(method, url, *args, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.breaker.record(bmc, False)
+            raise
+        self.breaker.record(bmc, True)
+        return r
+
+
+session_lock = threading.Lock()
+session = None
+
+
+def get_session():
+    """
+    Returns the session shared by the run's requests. It keeps connections
+    to the BMC alive, applies the resilience policy, and records requests
+    once profiling is started.
+    """
+    global session # pylint: disable=W0603
+    with session_lock:
+        if session is None:
+            session = RedfishSession(BREAKER)
+        return session
+
+
+def add_session_arguments(parser):
+    """Add the --timeout, --retries, and --bmc-cache-age options to parser."""
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='Seconds to wait for a Redfish response '
+                        '(default %d).' % config.rfReadTimeout)
+    parser.add_argument('--retries', type=int,
+                        help='Times a Redfish GET is retried after a 429, '
+                        '502, 503, or 504 response (default %d).'
+                        % config.rfRetries)
+    parser.add_argument('--bmc-cache-age', type=int, metavar='SECONDS',
+                        help='Seconds the vendor and features probed from a '
+                        'BMC are reused by later runs, 0 disables the cache '
+                        'file (default %d).' % config.bmcProfileMaxAge)
+
+
+def configure_session(args):
+    """
+    Apply the --timeout, --retries, and --bmc-cache-age options. Must be
+    called before the first get_session().
+
+    Parameters:
+        args (object): Command line arguments.
+    """
+    if args.timeout is not None:
+        config.rfReadTimeout = args.timeout
+    if args.retries is not None:
+        config.rfRetries = args.retries
+    if args.bmc_cache_age is not None:
+        config.bmcProfileMaxAge = args.bmc_cache_age
+
+
+def bmc_getter(bmc, auth):
+    """
+    Returns the function utils.bmc_profile in hwval GETs the URIs of bmc with:
+    it sends them with the session and returns the JSON response, or None.
+    """
+    def get(uri):
+        try:
+            r = get_session().get(f"https://{bmc}{uri}", auth=auth, verify=False)
+            return r.json() if r.ok else None
+        except (requests.RequestException, ValueError):
+            return None
+
+    return get
+
+
+def get_bmc_profile(bmc, auth):
+    """
+    Returns the profile of bmc, see utils.bmc_profile in hwval: its vendor,
+    event scheme, supported query parameters, and power capping. It is probed
+    with the session unless this run or, within --bmc-cache-age seconds, an
+    earlier run of any of the tools already did.
+
+    Parameters:
+        bmc (string): BMC name or IP.
+        auth (object): Authentication of the requests to bmc.
+
+    Returns:
+        profile (object): The profile, None if the BMC could not be probed.
+    """
+    return bmc_profile.get_profile(bmc, bmc_getter(bmc, auth))
+
+
+def expand_query(bmc, auth, fields=None):
+    """
+    Returns the query string that makes bmc return the members of a collection
+    with the collection, see expand_query() of utils.bmc_profile in hwval.
+    Members that are not expanded are detected with is_expanded(), and a BMC
+    that failed an expanded request is passed to disable_expand(), both also
+    from utils.bmc_profile.
+
+    Parameters:
+        bmc (string): BMC name or IP.
+        auth (object): Authentication of the requests to bmc.
+        fields (list): Properties of the members that are needed.
+
+    Returns:
+        query (string): "?$expand=..." or "".
+    """
+    return bmc_profile.expand_query(bmc, bmc_getter(bmc, auth), fields)
@@ -0,0 +1,90 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+
+"""
+Time every Redfish request of a run and report where the time went.
+
+The requests are timed by utils.timing in hwval, the same instrumentation as
+hwval --profile: the session from redfish_session.get_session() is a
+TimedSession whose adapter times new connections, so each request is recorded
+with its method, URI template, BMC, status, response size, and the DNS,
+connect, TLS, time to first byte, and total times. Profiling is off until
+start_profile() is called, the session works the same either way.
+
+At the end of the run the profile is logged as a report of the slowest URI
+templates, per vendor latency histograms, and retries, and optionally written
+as a Chrome trace event file for chrome://tracing or Perfetto.
+
+Functions:
+    add_profile_arguments(object)
+    start_profile(object, object)
+"""
+
+#pylint: disable=C0103
+
+import atexit
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+# pylint: disable=wrong-import-position
+from utils.timing import enableProfile, profileReport, writeProfileTrace
+
+
+def add_profile_arguments(parser):
+    """Add the --profile and --trace options to parser."""
+    parser.add_argument('--profile', action='store_true',
+                        help='Log a report of the time spent in Redfish '
+                        'requests at the end of the run.')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Also write the requests as a Chrome trace event '
+                        'file.')
+
+
+def start_profile(args, logger):
+    """
+    Start profiling if --profile or --trace was given. The report is logged
+    and the trace written when the program exits.
+
+    Parameters:
+        args (object): Command line arguments.
+        logger (object): Logger for the report.
+    """
+    if not args.profile and not args.trace:
+        return
+
+    enableProfile()
+
+    def finish():
+        if args.profile:
+            for line in profileReport():
+                logger.info("%s", line)
+        if args.trace:
+            try:
+                writeProfileTrace(args.trace)
+                logger.info("Request trace written to %s.", args.trace)
+            except OSError as e:
+                logger.warning("Could not write request trace %s: %s",
+                               args.trace, e)
+
+    atexit.register(finish)
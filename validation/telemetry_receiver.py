@@ -0,0 +1,173 @@
+# MIT License
+#
+# (C) Copyright [2026] Hewlett Packard Enterprise Development LP
+#
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR
+# OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+# ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+# OTHER DEALINGS IN THE SOFTWARE.
+"""
+Receive streaming telemetry from many BMCs at once and measure it.
+
+Every BMC is subscribed with its own destination path, from destination_path(),
+so each POST is attributed to the BMC it is for whatever address it came from.
+The messages arrive at the EventListener of the port, shared with the other
+tests of the process, which serves all connections from a single asyncio event
+loop and keeps them alive, so BMCs streaming at the same time do not wait for
+each other. A message is only parsed when its path matches no BMC, to route it
+by the Context of its subscription. The messages are not kept, only counters
+are kept per BMC: when it was subscribed, the arrival of its first and last
+message, the message count and bytes, and the gaps between messages.
+
+Classes:
+    BMCTelemetry
+    TelemetryReceiver
+
+Functions:
+    destination_path(string) -> string
+"""
+
+#pylint: disable=C0103
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+from utils import event_listener # pylint: disable=wrong-import-position
+
+PATH_PREFIX = "/telemetry/"
+
+
+def destination_path(bmc):
+    """Returns the destination path of the subscription of bmc."""
+    return event_listener.destination_path(bmc, PATH_PREFIX)
+
+
+class BMCTelemetry:
+    """The telemetry received from one BMC."""
+
+    def __init__(self):
+        self.subscribed = None
+        self.first = None
+        self.last = None
+        self.messages = 0
+        self.bytes = 0
+        self.max_gap = 0.0
+        self.long_gaps = 0
+
+    def arrived(self, now, size, gap_limit):
+        """Count a message of size bytes that arrived at now."""
+        if self.first is None:
+            self.first = now
+        else:
+            gap = now - self.last
+            self.max_gap = max(self.max_gap, gap)
+            if gap > gap_limit:
+                self.long_gaps += 1
+        self.last = now
+        self.messages += 1
+        self.bytes += size
+
+    def first_latency(self):
+        """Returns the seconds from the subscription to the first message."""
+        if self.first is None or self.subscribed is None:
+            return None
+        return self.first - self.subscribed
+
+    def rate(self):
+        """Returns the messages per second after the first one."""
+        if self.messages < 2:
+            return 0.0
+        return (self.messages - 1) / (self.last - self.first)
+
+
+class TelemetryReceiver:
+    """
+    Receives the telemetry of the BMCs in bmcs on the EventListener of
+    address. Gaps between messages longer than gap_limit seconds are counted
+    as long gaps.
+    """
+
+    def __init__(self, address, bmcs, gap_limit=10.0):
+        self.listener = event_listener.get_listener(address)
+        self.lock = threading.Lock()
+        self.gap_limit = gap_limit
+        self.bmcs = {bmc: BMCTelemetry() for bmc in bmcs}
+        self.silent = set(bmcs)
+        self.all_arrived = threading.Event()
+
+    @property
+    def unknown(self):
+        """The number of messages that were for no known BMC."""
+        return self.listener.unknown
+
+    def start(self):
+        """Route the telemetry of the BMCs to this receiver."""
+        for bmc in self.bmcs:
+            self.listener.register(bmc, destination_path(bmc),
+                                   f"TelemetryTest-{bmc}-TelemetryTest",
+                                   self.record, keep=False)
+
+    def shutdown(self):
+        """Stop receiving the telemetry of the BMCs."""
+        for bmc in self.bmcs:
+            self.listener.unregister(bmc)
+
+    def subscribed(self, bmc):
+        """Note that the subscription of bmc is being made."""
+        with self.lock:
+            self.bmcs[bmc].subscribed = time.monotonic()
+
+    def ignore(self, bmc):
+        """Stop waiting for bmc, its subscription failed."""
+        with self.lock:
+            self.silent.discard(bmc)
+            if not self.silent:
+                self.all_arrived.set()
+
+    def record(self, bmc, body):
+        """Count a message body of bmc."""
+        now = time.monotonic()
+        with self.lock:
+            self.bmcs[bmc].arrived(now, len(body), self.gap_limit)
+            self.silent.discard(bmc)
+            if not self.silent:
+                self.all_arrived.set()
+
+    def wait(self, timeout):
+        """
+        Wait up to timeout seconds for every subscribed BMC to send
+        telemetry. Returns True if all did.
+        """
+        return self.all_arrived.wait(timeout)
+
+    def report(self):
+        """Returns the lines of a table of the telemetry of each BMC."""
+        lines = ["%-24s %9s %8s %9s %10s %10s %9s" % (
+            "BMC", "First(s)", "Msgs", "Msgs/s", "KiB", "MaxGap(s)", "LongGaps")]
+        with self.lock:
+            for bmc, t in sorted(self.bmcs.items()):
+                latency = t.first_latency()
+                lines.append("%-24s %9s %8d %9.2f %10.1f %10.2f %9d" % (
+                    bmc, "-" if latency is None else "%.2f" % latency,
+                    t.messages, t.rate(), t.bytes / 1024, t.max_gap,
+                    t.long_gaps))
+            if self.unknown:
+                lines.append("%d messages were for no known BMC." % self.unknown)
+        return lines
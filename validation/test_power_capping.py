@@ -25,20 +25,30 @@
 """
 Check to make sure the power capping for the node can be set and stays set.
 
+-b takes a hostlist of BMCs, which are tested up to --parallel at the same time.
+A table of the result of every phase on every BMC is logged at the end. The
+power cap of every BMC that was changed is reset and power capping disabled
+again, also when a phase fails or the test is interrupted with SIGINT or
+SIGTERM.
+
 Functions:
-    determinePowerCapType(object, string) -> int, string
+    determinePowerCapType(object) -> int, string
     disablePowerCapping(object, int, string) -> boolean
     enablePowerCapping(object, int, string) -> boolean
-    getChassisPath(object) -> string
     getCurrentPowerCap(object, int, string) -> object
     main() -> int
     makeRedfishCall(object, string, string, object) -> string
+    reportResults(list, object) -> list
     setPowerCap(object, int, string, object) -> int
+    testPowerCapping(object, string, object, bool) -> object
 
 Misc Variables:
     CONTROLS - Olympus style power capping controls
     POWERCTL - Standard power capping controls
     POWERSVC - HPE Apollo 6500 style power capping controls
+    PHASES - The phases of the test of a BMC
+    PROFILE_TYPES - The power capping types of the BMC profile mechanisms
+    TYPE_NAMES - The BMC profile mechanism of each power capping type
 """
 
 #pylint: disable=C0103
@@ -47,15 +57,28 @@ Misc Variables:
 
 from datetime import datetime
 
+import copy
 import os
+import signal
 import sys
 import argparse
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import urllib3
 
-VERSION="1.1.0"
+from redfish_session import add_session_arguments, configure_session, get_session
+from redfish_session import BMCPrefix, get_bmc_profile
+from request_profile import add_profile_arguments, start_profile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+from utils import bmc_profile # pylint: disable=wrong-import-position
+from utils.hostlist import compress, expand # pylint: disable=wrong-import-position
+
+VERSION="1.5.1"
 
 my_logger = logging.getLogger()
 my_logger.setLevel(logging.DEBUG)
@@ -99,30 +122,34 @@ def makeRedfishCall(args, action, targPath, reqData=None):
             'Content-Type': 'application/json',
     }
 
-    if action == "GET":
-        r = requests.get(url = targPath, auth = auth, headers = headers,
-                verify = False, timeout=30)
-    elif action == "POST":
-        r = requests.post(url = targPath, auth = auth, headers = headers,
-                data = reqData, verify = False, timeout=30)
-    elif action == "DELETE":
-        r = requests.delete(url = targPath, auth = auth, verify = False, timeout=30)
-    elif action == "PATCH":
-        # Olympus nodes don't need the etag for the PATCH
-        if ".Deep" not in targPath:
-            rsp = requests.get(url = targPath, auth = auth, headers = headers,
-                    verify = False, timeout=30)
-
-            if rsp.status_code >= 300:
-                my_logger.warning("Redfish call to get power structure failed for %s.", targPath)
-                return None
-
-            power = json.loads(rsp.text)
-            headers['If-Match'] = power['@odata.etag']
-
-        r = requests.patch(url = targPath, auth = auth, headers = headers,
-                data = reqData, verify = False, timeout=30)
-    else:
+    try:
+        if action == "GET":
+            r = get_session().get(url = targPath, auth = auth, headers = headers,
+                    verify = False)
+        elif action == "POST":
+            r = get_session().post(url = targPath, auth = auth, headers = headers,
+                    data = reqData, verify = False)
+        elif action == "DELETE":
+            r = get_session().delete(url = targPath, auth = auth, verify = False)
+        elif action == "PATCH":
+            # Olympus nodes don't need the etag for the PATCH
+            if ".Deep" not in targPath:
+                rsp = get_session().get(url = targPath, auth = auth, headers = headers,
+                        verify = False)
+
+                if rsp.status_code >= 300:
+                    my_logger.warning("Redfish call to get power structure failed for %s.", targPath)
+                    return None
+
+                power = json.loads(rsp.text)
+                headers['If-Match'] = power['@odata.etag']
+
+            r = get_session().patch(url = targPath, auth = auth, headers = headers,
+                    data = reqData, verify = False)
+        else:
+            return None
+    except requests.RequestException as e:
+        my_logger.warning("Redfish %s for %s failed: %s", action, targPath, e)
         return None
 
     json_body = r.text
@@ -139,113 +166,55 @@ def makeRedfishCall(args, action, targPath, reqData=None):
     return json_body
 
 
-def getChassisPath(args):
-    """
-    Select the first available node from the Chassis to perform power capping on.
+CONTROLS = 0
+POWERCTL = 1
+POWERSVC = 2
 
-    Parameters:
-        args (object): Command line arguments.
+PROFILE_TYPES = {
+    bmc_profile.CONTROLS: CONTROLS,
+    bmc_profile.POWERCTL: POWERCTL,
+    bmc_profile.POWERSVC: POWERSVC,
+}
+TYPE_NAMES = {pcType: name for name, pcType in PROFILE_TYPES.items()}
 
-    Returns:
-        path (string): URI of a chassis member to perform power capping on.
-    """
-    my_logger.info("Finding node to use for test.")
-    path = f"https://{args.bmc}/redfish/v1/Chassis"
-    rsp = makeRedfishCall(args, "GET", path)
-    if not rsp:
-        my_logger.warning("Redfish call to get Chassis failed.")
-        return None
+# The phases of the test of a BMC. reset and disable run whenever set and
+# enable were tried.
+PHASES = ["discover", "enable", "get", "set", "verify", "reset", "disable"]
 
-    chassisCollection = json.loads(rsp)
 
-    if "Members" in chassisCollection and len(chassisCollection['Members']) > 0:
-        for member in chassisCollection['Members']:
-            if ("Mezz" not in member['@odata.id'] and
-                    "Enclosure" not in member['@odata.id']):
-                path = member['@odata.id']
-                my_logger.info("Using node %s.", path)
-                return path
+bmc_prefix = BMCPrefix()
 
-    return None
 
-CONTROLS = 0
-POWERCTL = 1
-POWERSVC = 2
-
-def determinePowerCapType(args, path):
+def determinePowerCapType(args):
     """
-    Check to see which type of power capping the target is using.
+    Check to see which type of power capping the target is using, from the
+    BMC profile, which is probed unless a run of the HMS tools already did.
             Chassis/{id}/Control                Olympus (Deep PATCH)
             Chassis/{id}/Power .PowerControl    GB, HPE DL
             Chassis/{id}/Power .Oem.Hpe         HPE Apollo 6500
 
     Parameters:
         args (object): Command line arguments.
-        path (string): Path to valid chassis entry.
 
     Returns:
         Type (int): Which power cap payload type to use.
         path (string): Power capping URI.
     """
     my_logger.info("Determining which power cap scheme and URI to use.")
-    path = f"https://{args.bmc}{path}"
-
-    rsp = makeRedfishCall(args, "GET", path)
+    profile = get_bmc_profile(args.bmc,
+                              requests.auth.HTTPBasicAuth(args.user, args.passwd))
 
-    if not rsp:
-        my_logger.warning("Redfish call to get chassis information for %s failed.", path)
+    if profile is None:
+        my_logger.warning("Redfish calls to determine the BMC type of %s failed.", args.bmc)
         return None, None
 
-    chassis = json.loads(rsp)
-
-    if "Controls" in chassis:
-        path = f"https://{args.bmc}{chassis['Controls']['@odata.id']}"
-        rsp = makeRedfishCall(args, "GET", path)
-
-        if not rsp:
-            my_logger.warning("Redfish call to get chassis controls information for %s failed.",
-                path)
-            return None, None
-
-        controlsCollection = json.loads(rsp)
-
-        if "Members" in controlsCollection and len(controlsCollection['Members']) > 0:
-            for member in controlsCollection['Members']:
-                if "NodePowerLimit" in member['@odata.id']:
-                    my_logger.info("Using Chassis Controls for power capping.")
-                    return CONTROLS, member['@odata.id']
-
-    path = f"https://{args.bmc}{chassis['Power']['@odata.id']}"
-
-    rsp = makeRedfishCall(args, "GET", path)
-
-    if not rsp:
-        my_logger.info("Redfish call to get chassis power information for %s failed.", path)
+    if profile['chassis'] is None or profile['power_cap'] is None:
+        my_logger.warning("No node chassis with power capping found on %s.", args.bmc)
         return None, None
 
-    power = json.loads(rsp)
-
-    if ("Oem" in power and
-            "Hpe" in power['Oem'] and
-            "Links" in power['Oem']['Hpe'] and
-            "PowerLimit" in power['Oem']['Hpe']['Links']):
-        path = power['Oem']['Hpe']['Links']['PowerLimit']['@odata.id']
-        rsp = makeRedfishCall(args, "GET", path)
-
-        if not rsp:
-            my_logger.warning("Redfish call to get power limit information for %s failed.", path)
-            return None, None
-
-        powerLimit = json.loads(rsp)
-
-        plActions = powerLimit['Actions']
-        configLimit = plActions['#HpeServerAccPowerLimit.ConfigurePowerLimit']
-
-        my_logger.info("Using HPE ServerAccPowerLimit for power capping.")
-        return POWERSVC, configLimit['target']
-
-    my_logger.info("Using Chassis Power PowerControl for power capping.")
-    return POWERCTL, chassis['Power']['@odata.id']
+    my_logger.info("Using node %s.", profile['chassis'])
+    my_logger.info("Using %s for power capping.", profile['power_cap'])
+    return PROFILE_TYPES[profile['power_cap']], profile['power_cap_uri']
 
 
 def enablePowerCapping(args, pcType, pcURI):
@@ -536,10 +505,160 @@ def setPowerCap(args, pcType, pcURI, pcSettings):
     return 0
 
 
+def testPowerCapping(args, bmc, stop, fleet=False):
+    """
+    Run the power capping test on a BMC: determine the power capping type,
+    enable power capping, get the power cap, set it, and verify it. Whatever
+    was changed is then always reset and disabled again, even if a phase failed
+    or the test was interrupted.
+
+    Parameters:
+        args (object): Command line arguments.
+        bmc (string): BMC name or IP.
+        stop (object): threading.Event that is set when the test is interrupted.
+        fleet (bool): True if several BMCs are tested at the same time.
+
+    Returns:
+        results (object): The power capping type, the result of each phase,
+            "ok", "FAIL", or "-" if it did not run, and the overall result.
+    """
+    args = copy.copy(args)
+    args.bmc = bmc
+    if fleet:
+        bmc_prefix.local.bmc = bmc
+
+    results = dict.fromkeys(PHASES, "-")
+    results['type'] = "-"
+    results['result'] = "FAIL"
+    phase = None
+    pcType, pcURI, pcSettings = None, None, None
+    enabled, capped = False, False
+
+    try:
+        for phase in PHASES[:5]:
+            if stop.is_set():
+                results['result'] = "stopped"
+                return results
+            results[phase] = "FAIL"
+
+            if phase == "discover":
+                pcType, pcURI = determinePowerCapType(args)
+                if pcType is None:
+                    my_logger.error("FAIL: Unable to determine which type of power capping to use.")
+                    return results
+                results['type'] = TYPE_NAMES[pcType]
+
+            elif phase == "enable":
+                # Undo a partly successful enable too
+                enabled = True
+                if not enablePowerCapping(args, pcType, pcURI):
+                    my_logger.error("FAIL: Could not enable power capping.")
+                    # The saved profile may be out of date, probe the BMC again next time
+                    bmc_profile.forget_profile(bmc)
+                    return results
+
+            elif phase == "get":
+                pcSettings = getCurrentPowerCap(args, pcType, pcURI)
+                my_logger.log(VERBOSE1, "Power cap settings: %s", pcSettings)
+                if pcSettings is None:
+                    my_logger.error("FAIL: Unable to determine current power cap settings.")
+                    bmc_profile.forget_profile(bmc)
+                    return results
+
+            elif phase == "set":
+                newSettings = dict(pcSettings, value=pcSettings['max'] - 100)
+                capped = True
+                if setPowerCap(args, pcType, pcURI, newSettings) == 1:
+                    my_logger.error("FAIL: Could not set power cap.")
+                    return results
+
+            elif phase == "verify":
+                curSettings = getCurrentPowerCap(args, pcType, pcURI)
+                if curSettings is None:
+                    my_logger.error("FAIL: Unable to determine new power cap settings.")
+                    return results
+
+                my_logger.info("\tMin: %d expected %d", curSettings['min'], pcSettings['min'])
+                my_logger.info("\tMax: %d expected %d", curSettings['max'], pcSettings['max'])
+                my_logger.info("\tCurrent: %d expected %d", curSettings['current'],
+                               newSettings['value'])
+
+                if (curSettings['min'] != newSettings['min'] or
+                        curSettings['max'] != newSettings['max'] or
+                        curSettings['current'] != newSettings['value']):
+                    my_logger.error("FAIL: Currently set power cap settings does not match expected.")
+                    return results
+
+                my_logger.info("PASS: Power capping succeeded.")
+
+            results[phase] = "ok"
+        results['result'] = "PASS"
+
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        my_logger.error("FAIL: Unexpected Redfish response during %s: %r", phase, e)
+        results['result'] = "FAIL"
+
+    finally:
+        # Each cleanup phase runs even if the one before it raised
+        if capped:
+            results['reset'] = "FAIL"
+            try:
+                # Put back the original power cap, or the maximum if it had none
+                value = pcSettings['current']
+                if not pcSettings['min'] <= value <= pcSettings['max']:
+                    value = pcSettings['max']
+                if setPowerCap(args, pcType, pcURI, dict(pcSettings, value=value)) == 1:
+                    my_logger.error("FAIL: Could not reset power cap.")
+                else:
+                    results['reset'] = "ok"
+            except Exception as e: # pylint: disable=broad-except
+                my_logger.error("FAIL: Could not reset power cap: %r", e)
+            if results['reset'] != "ok":
+                results['result'] = "FAIL"
+
+        if enabled:
+            results['disable'] = "FAIL"
+            try:
+                if not disablePowerCapping(args, pcType, pcURI):
+                    my_logger.error("FAIL: Could not disable power capping.")
+                else:
+                    results['disable'] = "ok"
+            except Exception as e: # pylint: disable=broad-except
+                my_logger.error("FAIL: Could not disable power capping: %r", e)
+            if results['disable'] != "ok":
+                results['result'] = "FAIL"
+
+        bmc_prefix.local.bmc = None
+
+    return results
+
+
+def reportResults(bmcs, results):
+    """
+    Format the results of the BMCs as a table.
+
+    Parameters:
+        bmcs (list): BMC names or IPs, in the order to report them.
+        results (object): The testPowerCapping() results of each BMC.
+
+    Returns:
+        lines (list): Header and a line per BMC.
+    """
+    lines = ["%-24s %-22s " % ("BMC", "Type") +
+             " ".join("%-8s" % phase.capitalize() for phase in PHASES) + " Result"]
+    for bmc in bmcs:
+        r = results[bmc]
+        lines.append("%-24s %-22s " % (bmc, r['type']) +
+                     " ".join("%-8s" % r[phase] for phase in PHASES) + " " + r['result'])
+    return lines
+
+
 def main():
     """Main program"""
     parser = argparse.ArgumentParser(description='Power Cap Testing.')
-    parser.add_argument('-b', '--bmc', help='BMC name or IP.')
+    parser.add_argument('-b', '--bmc', help='BMC names or IPs, hostlist style: x3000c0s[1-8]b0.')
+    parser.add_argument('-P', '--parallel', type=int, default=32,
+            help='Number of BMCs to test at the same time (default 32).')
     parser.add_argument('-u', '--user', help='Redfish user name.')
     parser.add_argument('-p', '--passwd', help='Redfish password.')
     parser.add_argument('-v', '--verbose', action='store_true',
@@ -548,6 +667,8 @@ def main():
             help='Print the script version information and exit.')
     parser.add_argument('-l', '--logdir', default='./logs',
             help='Directory for log files')
+    add_profile_arguments(parser)
+    add_session_arguments(parser)
     args = parser.parse_args()
 
     # set logging file
@@ -570,71 +691,45 @@ def main():
         my_logger.info("%s: %s", __file__, VERSION)
         return 0
 
-    path = getChassisPath(args)
-
-    if path is None:
-        my_logger.error("FAIL: Unable to determine which chassis entry to use for power capping.")
-        return 1
-
-    pcType, pcURI = determinePowerCapType(args, path)
-
-    if pcType is None:
-        my_logger.error("FAIL: Unable to determine which type of power capping to use.")
-        return 1
-
-    enabled = enablePowerCapping(args, pcType, pcURI)
-
-    if not enabled:
-        my_logger.error("FAIL: Could not enable power capping.")
-        return 1
-
-    pcSettings = getCurrentPowerCap(args, pcType, pcURI)
-
-    print(pcSettings)
-    if pcSettings is None:
-        my_logger.error("FAIL: Unable to determine current power cap settings.")
-        return 1
-
-    newSettings = pcSettings
-    newSettings['value'] = pcSettings['max'] - 100
-    ret = setPowerCap(args, pcType, pcURI, newSettings)
-
-    if ret == 1:
-        my_logger.error("FAIL: Could not set power cap.")
-        return 1
-
-    curSettings = getCurrentPowerCap(args, pcType, pcURI)
-
-    if curSettings is None:
-        my_logger.error("FAIL: Unable to determine new power cap settings.")
-        return 1
-
-    my_logger.info("\tMin: %d expected %d", curSettings['min'], pcSettings['min'])
-    my_logger.info("\tMax: %d expected %d", curSettings['max'], pcSettings['max'])
-    my_logger.info("\tCurrent: %d expected %d", curSettings['current'], newSettings['value'])
+    start_profile(args, my_logger)
+    configure_session(args)
 
-    if (curSettings['min'] != newSettings['min'] or
-            curSettings['max'] != newSettings['max'] or
-            curSettings['current'] != newSettings['value']):
-        my_logger.error("FAIL: Currently set power cap settings does not match expected.")
+    try:
+        bmcs = expand(args.bmc).split(",") if args.bmc else []
+    except ValueError as e:
+        my_logger.error("Invalid BMC list %s: %s", args.bmc, e)
         return 1
-
-    my_logger.info("PASS: Power capping succeeded.")
-
-    pcSettings['value'] = pcSettings['max']
-    ret = setPowerCap(args, pcType, pcURI, pcSettings)
-
-    if ret == 1:
-        my_logger.error("FAIL: Could not reset power cap.")
+    if not bmcs:
+        my_logger.error("No BMC given.")
         return 1
 
-    disabled = disablePowerCapping(args, pcType, pcURI)
-
-    if not disabled:
-        my_logger.error("FAIL: Could not disable power capping.")
-        return 1
-
-    return 0
+    # Let the BMCs being tested restore their power caps before exiting
+    stop = threading.Event()
+    def interrupt(signum, frame): # pylint: disable=unused-argument
+        if not stop.is_set():
+            my_logger.warning("Interrupted, restoring the power caps that were changed.")
+        stop.set()
+    signal.signal(signal.SIGINT, interrupt)
+    signal.signal(signal.SIGTERM, interrupt)
+
+    fleet = len(bmcs) > 1
+    if fleet:
+        my_logger.addFilter(bmc_prefix)
+    with ThreadPoolExecutor(max_workers=max(1, min(args.parallel, len(bmcs)))) as pool:
+        results = dict(zip(bmcs, pool.map(
+            lambda bmc: testPowerCapping(args, bmc, stop, fleet), bmcs)))
+
+    failed = [bmc for bmc in bmcs if results[bmc]['result'] != "PASS"]
+    if fleet:
+        for line in reportResults(bmcs, results):
+            my_logger.info("%s", line)
+        if failed:
+            my_logger.error("FAIL: Power capping failed on %s.", compress(failed))
+        if len(failed) < len(bmcs):
+            my_logger.info("PASS: Power capping succeeded on %d of %d BMCs.",
+                           len(bmcs) - len(failed), len(bmcs))
+
+    return 1 if failed or stop.is_set() else 0
 
 
 if __name__ == "__main__":
@@ -26,31 +26,43 @@
 Turn power to a node On and Off, validating events are properly flowing and the
 node makes it to the target states.
 
-If node is Off, turns node On, checks state, turns node Off, checks state.
+If node is Off, turns node On, checks state, forces node Off, checks state.
 If node is On, turns node Off, checks state, turns node On, checks state.
-Verifies at least 1 Redfish On event and 1 Redfish Off event.
+Verifies a Redfish event for every power change.
+
+The BMCs to test are given as a hostlist and are power cycled at the same time,
+one node per BMC. Every BMC is subscribed with its own destination path, so
+the events of all of them arrive at one EventListener and are matched to the BMC
+they are for. The power commands of all BMCs are spaced by a CommandPacer to
+avoid inrush spikes. For each power change the seconds from the command to the
+first event and to the target power state are reported.
 
 Classes:
-    handleRequest
+    CommandPacer
 
 Functions:
     determineScheme(object) -> string
-    eventDelete(object) -> int
+    eventDelete(object, string) -> int
     eventSubscribe(object, string) -> int
-    forceNodeOff(object, string)
+    forceNodeOff(object, string) -> float
     getFirstNodePath(object) -> string
     getPowerState(object, string) -> string
+    logEvents(string, bytes)
     main() -> int
     makeRedfishCall(object, string, string, object) -> string
-    startRedfishEventServer(object)
-    turnNodeOff(object, string)
-    turnNodeOn(object, string)
-    waitForState(object, string, string) -> string
+    powerStep(object, string, string, object, object, object) -> object
+    reportResults(list, object) -> list
+    startRedfishEventServer(object, string, int) -> object
+    testPowerControl(object, string, string, int, object, object, object, bool) -> object
+    turnNodeOff(object, string) -> float
+    turnNodeOn(object, string) -> float
+    waitForState(object, string, string, float, object, object) -> string, float, float
 
 Misc Variables:
-    event
-    httpd
-    httpThread
+    COMMAND_RETRY - Seconds a refused power command is retried for
+    POLL_FIRST - Seconds between the first power state queries
+    STEPS - The power changes a node can go through, in report order
+    bmc_prefix
 """
 
 # pylint: disable=invalid-name
@@ -60,19 +72,33 @@ Misc Variables:
 
 from datetime import datetime
 
+import copy
 import os
+import signal
 import sys
 import argparse
 import logging
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
 import ssl
 import json
 import time
 import requests
 import urllib3
 
-VERSION="1.1.0"
+from redfish_session import add_session_arguments, configure_session, get_session
+from redfish_session import BMCPrefix, get_bmc_profile
+from request_profile import add_profile_arguments, start_profile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+from utils.hostlist import compress, expand # pylint: disable=wrong-import-position
+from utils.event_listener import destination_path, get_listener, server_context # pylint: disable=wrong-import-position
+from utils.event_listener import stop_listeners # pylint: disable=wrong-import-position
+from utils.redfish_events import is_state_event, parse_events # pylint: disable=wrong-import-position
+from utils.redfish_events import wait_for_state # pylint: disable=wrong-import-position
+
+VERSION="1.6.2"
 
 my_logger = logging.getLogger()
 my_logger.setLevel(logging.DEBUG)
@@ -88,14 +114,53 @@ VERBOSE2 = logging.INFO - 2
 logging.addLevelName(VERBOSE1, "VERBOSE1")
 logging.addLevelName(VERBOSE2, "VERBOSE2")
 
-event = threading.Event()
+# Seconds before the second power state query, the interval then doubles up to
+# --poll-interval
+POLL_FIRST = 0.5
+
+# Seconds a refused power command is retried for
+COMMAND_RETRY = 60
+
+# Power change -> (ResetType, target power state). Off tries GracefulShutdown
+# or Off, ForceOff follows when the node does not turn Off.
+STEPS = {
+    "Off": (None, "Off"),
+    "ForceOff": ("ForceOff", "Off"),
+    "On": ("On", "On"),
+}
+
+
+bmc_prefix = BMCPrefix()
+
+
+class CommandPacer:
+    """
+    Spaces the power commands sent to all BMCs: at most group commands start
+    every stagger seconds, so a rack does not draw the inrush current of all
+    its nodes at once.
+    """
 
-class handleRequest(BaseHTTPRequestHandler):
-    """Simple HTTP server to receive streaming telemetry."""
-    def do_POST(self):
-        """Handler for POSTs from Redfish endpoint."""
-        global event
-        event.set()
+    def __init__(self, stagger, group=1):
+        self.lock = threading.Lock()
+        self.stagger = stagger
+        self.group = max(1, group)
+        self.window = None
+        self.used = 0
+
+    def wait(self, stop):
+        """
+        Wait for the turn of the next command. Returns False if stop was set
+        while waiting.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.window is None or now >= self.window + self.stagger:
+                self.window, self.used = now, 0
+            elif self.used >= self.group:
+                self.window, self.used = self.window + self.stagger, 0
+            self.used += 1
+            slot = self.window
+        return not stop.wait(max(0.0, slot - time.monotonic()))
 
 
 def makeRedfishCall(args, action, targPath, reqData=None):
@@ -126,15 +191,19 @@ def makeRedfishCall(args, action, targPath, reqData=None):
             'Content-Type': 'application/json',
     }
 
-    if action == "GET":
-        r = requests.get(url = targPath, auth = auth, headers = headers,
-                verify = False, timeout = 30)
-    elif action == "POST":
-        r = requests.post(url = targPath, auth = auth, headers = headers,
-                data = reqData, verify = False, timeout = 30)
-    elif action == "DELETE":
-        r = requests.delete(url = targPath, auth = auth, verify = False, timeout = 30)
-    else:
+    try:
+        if action == "GET":
+            r = get_session().get(url = targPath, auth = auth, headers = headers,
+                    verify = False)
+        elif action == "POST":
+            r = get_session().post(url = targPath, auth = auth, headers = headers,
+                    data = reqData, verify = False)
+        elif action == "DELETE":
+            r = get_session().delete(url = targPath, auth = auth, verify = False)
+        else:
+            return None
+    except requests.RequestException as e:
+        my_logger.warning("Redfish %s for %s failed: %s", action, targPath, e)
         return None
 
     json_body = r.text
@@ -182,6 +251,10 @@ def turnNodeOff(args, nPath):
     Parameters:
         args (object): Command line arguments.
         nPath (string): Systems URI for target node.
+
+    Returns:
+        sent (float): time.monotonic() when the request was sent, None if it
+            failed.
     """
     my_logger.info("Turning node at %s Off.", nPath)
     path = f"https://{args.bmc}{nPath}"
@@ -189,12 +262,12 @@ def turnNodeOff(args, nPath):
 
     if not rsp:
         my_logger.warning("Redfish call to get computer system information for %s failed.", nPath)
-        return
+        return None
 
     compSystem = json.loads(rsp)
     compSysReset = compSystem['Actions']['#ComputerSystem.Reset']
 
-    aVals = None
+    aVals = []
     if "ResetType@Redfish.AllowableValues" in compSysReset:
         aVals = compSysReset['ResetType@Redfish.AllowableValues']
     elif "@Redfish.ActionInfo" in compSysReset:
@@ -204,7 +277,7 @@ def turnNodeOff(args, nPath):
 
         if not rsp:
             my_logger.warning("Redfish call to get ActionInfo for %s failed.", aiPath)
-            return
+            return None
 
         resetActionInfo = json.loads(rsp)
         for param in resetActionInfo['Parameters']:
@@ -223,17 +296,21 @@ def turnNodeOff(args, nPath):
 
     if resetType is None:
         my_logger.warning("Could not determine ResetType for power Off.")
-        return
+        return None
 
     reset = {
             'ResetType': resetType,
             }
 
     path = f"https://{args.bmc}{compSysReset['target']}"
+    sent = time.monotonic()
     rsp = makeRedfishCall(args, "POST", path, json.dumps(reset))
 
     if not rsp:
         my_logger.warning("Redfish call to perform Off power action failed.")
+        return None
+
+    return sent
 
 def forceNodeOff(args, nPath):
     """
@@ -242,6 +319,10 @@ def forceNodeOff(args, nPath):
     Parameters:
         args (object): Command line arguments.
         nPath (string): Systems URI for target node.
+
+    Returns:
+        sent (float): time.monotonic() when the request was sent, None if it
+            failed.
     """
     my_logger.info("Forcing node at %s Off.", nPath)
     path = f"https://{args.bmc}{nPath}"
@@ -249,7 +330,7 @@ def forceNodeOff(args, nPath):
 
     if not rsp:
         my_logger.warning("Redfish call to get computer system information for %s failed.", nPath)
-        return
+        return None
 
     compSystem = json.loads(rsp)
     compSysReset = compSystem['Actions']['#ComputerSystem.Reset']
@@ -259,10 +340,14 @@ def forceNodeOff(args, nPath):
             }
 
     path = f"https://{args.bmc}{compSysReset['target']}"
+    sent = time.monotonic()
     rsp = makeRedfishCall(args, "POST", path, json.dumps(reset))
 
     if not rsp:
         my_logger.warning("Redfish call to perform force Off power action failed.")
+        return None
+
+    return sent
 
 
 def turnNodeOn(args, nPath):
@@ -272,6 +357,10 @@ def turnNodeOn(args, nPath):
     Parameters:
         args (object): Command line arguments.
         nPath (string): Systems URI for target node.
+
+    Returns:
+        sent (float): time.monotonic() when the request was sent, None if it
+            failed.
     """
     my_logger.info("Turning node at %s On.", nPath)
     path = f"https://{args.bmc}{nPath}"
@@ -279,7 +368,7 @@ def turnNodeOn(args, nPath):
 
     if not rsp:
         my_logger.warning("Redfish call to get computer system information for %s failed.", nPath)
-        return
+        return None
 
     compSystem = json.loads(rsp)
     compSysReset = compSystem['Actions']['#ComputerSystem.Reset']
@@ -289,10 +378,14 @@ def turnNodeOn(args, nPath):
             }
 
     path = f"https://{args.bmc}{compSysReset['target']}"
+    sent = time.monotonic()
     rsp = makeRedfishCall(args, "POST", path, json.dumps(reset))
 
     if not rsp:
         my_logger.warning("Redfish call to perform On power action failed.")
+        return None
+
+    return sent
 
 
 def getPowerState(args, nPath):
@@ -318,50 +411,83 @@ def getPowerState(args, nPath):
     return compSystem['PowerState']
 
 
-def waitForState(args, nPath, state):
+def waitForState(args, nPath, state, sent, log, stop):
     """
-    Wait for target node to transition to expected state.
+    Wait for target node to transition to expected state and for the Redfish
+    event of the change. The power state is queried right away, then at
+    intervals growing from POLL_FIRST to args.poll_interval seconds, and at
+    once when a StatusChange or ResourceUpdated event for the node arrives.
 
     Parameters:
         args (object): Command line arguments.
         nPath (string): Systems URI for target node.
         state (string): Power state of the node to wait for.
+        sent (float): time.monotonic() when the power command was sent.
+        log (object): EventLog of the events of the BMC.
+        stop (object): threading.Event that is set when the test is interrupted.
 
     Returns:
         state (string): Last power state queried from the node.
+        eventLatency (float): Seconds from the command to the first event for
+            the node after it, None if none arrived.
+        stateLatency (float): Seconds from the command until the state was
+            seen, None if it was not.
     """
-    nstate = getPowerState(args, nPath)
+    def match(event):
+        return is_state_event(event, nPath)
 
-    count = 0
-    while (nstate != state and count < 30):
-        time.sleep(10)
-        nstate = getPowerState(args, nPath)
-        count += 1
+    nstate, eventAt, stateAt = wait_for_state(
+        lambda: getPowerState(args, nPath), state, log, since=sent,
+        timeout=args.power_timeout, match=match, first=POLL_FIRST,
+        cap=args.poll_interval, stop=stop)
 
-    return nstate
+    # The event may follow the state
+    if stateAt is not None and eventAt is None and not stop.is_set():
+        received = log.wait(sent, max(0.0, sent + args.power_timeout - time.monotonic()),
+                            match)
+        if received is not None:
+            eventAt = received[1]
 
-def startRedfishEventServer(args, scheme):
+    return (nstate, None if eventAt is None else eventAt - sent,
+            None if stateAt is None else stateAt - sent)
+
+
+def startRedfishEventServer(args, scheme, port):
     """
-    Start an HTTP server to receive streaming telemetry.
+    Start the listener that receives the Redfish events of the BMCs, or
+    return it if it is running already.
 
     Parameters:
         args (object): Command line arguments.
         scheme (string): Secure or unsecure http protocol.
+        port (int): Port to listen on.
+
+    Returns:
+        listener (object): The running EventListener.
     """
     my_logger.info("Starting %s Redfish event server.", scheme)
-    my_logger.info("ip %s port %s", args.ip, args.port)
-    httpd = HTTPServer((args.ip, int(args.port)), handleRequest)
+    my_logger.info("ip %s port %s", args.ip, port)
+    context = None
     if scheme == "https":
-        httpd.socket = ssl.wrap_socket(httpd.socket, certfile="cert/tls.crt",
-                keyfile="cert/tls.key", server_side=True)
+        context = server_context(args.cert, args.key)
+
+    return get_listener((args.ip, port), context)
 
-    def serve_forever(httpd):
-        with httpd:
-            httpd.serve_forever()
 
-    httpThread = threading.Thread(target=serve_forever, args=(httpd,))
-    httpThread.daemon = True
-    httpThread.start()
+def logEvents(bmc, body):
+    """
+    Log the Redfish events of a BMC as they arrive.
+
+    Parameters:
+        bmc (string): BMC name or IP.
+        body (bytes): Event payload the BMC POSTed.
+    """
+    for event in parse_events(body):
+        origin = event.get('OriginOfCondition') or "-"
+        if isinstance(origin, dict):
+            origin = origin.get('@odata.id')
+        my_logger.log(VERBOSE1, "%s: Received Redfish %s event %s from %s.", bmc,
+                      event.get('EventType', "-"), event.get('MessageId'), origin)
 
 
 def eventSubscribe(args, scheme):
@@ -377,7 +503,7 @@ def eventSubscribe(args, scheme):
     """
     my_logger.info("Subscribing to Redfish events with %s.", scheme)
     eventTypes = ["StatusChange", "Alert", "ResourceUpdated", "ResourceAdded", "ResourceRemoved"]
-    destination = f"{scheme}://{args.ip}:{args.port}/{args.bmc}"
+    destination = f"{scheme}://{args.ip}:{args.port}{destination_path(args.bmc)}"
 
     sub = {
         'Context': f"PowerTest-{args.bmc}-PowerTest",
@@ -397,12 +523,13 @@ def eventSubscribe(args, scheme):
     return 0
 
 
-def eventDelete(args):
+def eventDelete(args, scheme):
     """
     Finds and deletes the subscription that this test created.
 
     Parameters:
         args (object): Command line arguments.
+        scheme (string): Secure or unsecure http protocol of the subscription.
 
     Returns:
         result (int): 0 for success, 1 for failure
@@ -431,8 +558,8 @@ def eventDelete(args):
 
         sub = json.loads(rsp)
 
-        if (sub['Context'] == f"PowerTest-{args.bmc}-PowerTest" and
-                sub['Destination'] == f"http://{args.ip}:{args.port}/{args.bmc}"):
+        if (sub.get('Context') == f"PowerTest-{args.bmc}-PowerTest" and
+                sub.get('Destination') == f"{scheme}://{args.ip}:{args.port}{destination_path(args.bmc)}"):
             count += 1
 
             rsp = makeRedfishCall(args, "DELETE", path)
@@ -456,28 +583,253 @@ def determineScheme(args):
         scheme (string): Secure or unsecure http protocol.
     """
     my_logger.info("Determining which http scheme to use.")
-    path = f"https://{args.bmc}/redfish/v1/Registries/iLO"
+    profile = get_bmc_profile(args.bmc,
+                              requests.auth.HTTPBasicAuth(args.user, args.passwd))
 
-    rsp = makeRedfishCall(args, "GET", path)
+    if profile is None:
+        my_logger.warning("Could not determine the BMC type of %s.", args.bmc)
+        return "http"
 
-    if rsp:
-        return "https"
+    return profile['scheme']
 
-    path = f"https://{args.bmc}/redfish/v1/Registries/OpenBMC"
+def powerStep(args, nPath, step, log, pacer, stop):
+    """
+    Make one power change of the node, when the pacer lets it, and wait for
+    the node to reach the target state and send its event.
 
-    rsp = makeRedfishCall(args, "GET", path)
+    Parameters:
+        args (object): Command line arguments.
+        nPath (string): Systems URI for target node.
+        step (string): One of STEPS.
+        log (object): EventLog of the events of the BMC.
+        pacer (object): CommandPacer shared by all BMCs.
+        stop (object): threading.Event that is set when the test is interrupted.
+
+    Returns:
+        result (object): 'result' "ok", "no-event" if the state was reached
+            without an event, "timeout" if a graceful Off did not turn the node
+            Off, "FAIL", or "stopped", the 'event' and 'state' latencies, and
+            the last 'power' state seen.
+    """
+    target = STEPS[step][1]
+    result = {'result': "FAIL", 'event': None, 'state': None, 'power': None}
+    # A BMC may refuse a command while the last power change settles
+    retryUntil = time.monotonic() + COMMAND_RETRY
+    delay = POLL_FIRST
+    while True:
+        if not pacer.wait(stop):
+            result['result'] = "stopped"
+            return result
+
+        if step == "Off":
+            sent = turnNodeOff(args, nPath)
+        elif step == "ForceOff":
+            sent = forceNodeOff(args, nPath)
+        else:
+            sent = turnNodeOn(args, nPath)
+        if sent is not None:
+            break
+
+        if time.monotonic() + delay > retryUntil:
+            my_logger.error("FAIL: Could not send the %s power command.", step)
+            return result
+        my_logger.info("The %s power command was refused, retrying in %.1fs.",
+                       step, delay)
+        if stop.wait(delay):
+            result['result'] = "stopped"
+            return result
+        delay = min(delay * 2, args.poll_interval)
+
+    state, result['event'], result['state'] = waitForState(args, nPath, target,
+                                                           sent, log, stop)
+    result['power'] = state
+    forced = "forced" if step == "ForceOff" else "turned"
+
+    if result['state'] is not None and result['event'] is not None:
+        my_logger.info("PASS: Node was %s %s, event after %.2fs, %s after %.2fs.",
+                       forced, target, result['event'], target, result['state'])
+        result['result'] = "ok"
+    elif result['state'] is not None:
+        my_logger.error("FAIL: Node turned %s but did not send a Redfish event.", target)
+        result['result'] = "no-event"
+    elif stop.is_set():
+        result['result'] = "stopped"
+    elif step == "Off":
+        my_logger.info("INFO: Node failed to turn Off in the alloted time,"
+            " attempting force Off.")
+        result['result'] = "timeout"
+    elif result['event'] is not None:
+        my_logger.error("FAIL: Node sent Redfish event but is not %s.", target)
+    else:
+        my_logger.error("FAIL: Node failed to be %s %s in the alloted time.",
+                        forced, target)
+
+    return result
+
+
+def testPowerControl(args, bmc, scheme, port, listener, pacer, stop, fleet=False):
+    """
+    Power cycle the first node of a BMC: subscribe to its events, turn the node
+    Off and On again, or On and forced Off again if it starts Off, and delete
+    the subscription again, even if a step failed or the test was interrupted.
+
+    Parameters:
+        args (object): Command line arguments.
+        bmc (string): BMC name or IP.
+        scheme (string): Secure or unsecure http protocol of the subscription.
+        port (int): Port the events of the BMC are received at.
+        listener (object): EventListener the events of the BMC arrive at.
+        pacer (object): CommandPacer shared by all BMCs.
+        stop (object): threading.Event that is set when the test is interrupted.
+        fleet (bool): True if several BMCs are tested at the same time.
+
+    Returns:
+        results (object): The 'node', its 'start' and 'end' states, the
+            powerStep() result of each of STEPS that ran, and the overall
+            'result'.
+    """
+    args = copy.copy(args)
+    args.bmc = bmc
+    args.port = port
+    if fleet:
+        bmc_prefix.local.bmc = bmc
+
+    results = dict.fromkeys(STEPS)
+    results.update(node="-", start="-", end="-", result="FAIL")
+    subscribed = False
+    log = listener.register(bmc, destination_path(bmc),
+                            f"PowerTest-{bmc}-PowerTest", logEvents)
+
+    def run(step):
+        results[step] = powerStep(args, nPath, step, log, pacer, stop)
+        results['end'] = results[step]['power'] or "-"
+        return results[step]
+
+    try:
+        if eventSubscribe(args, scheme) != 0:
+            my_logger.error("FAIL: Could not subscribe to Redfish event notifications.")
+            return results
+        subscribed = True
+
+        nPath = getFirstNodePath(args)
+        if nPath is None:
+            my_logger.error("FAIL: No node found, cannot perform power actions.")
+            return results
+        results['node'] = nPath.rstrip('/').rsplit('/', 1)[-1]
+        my_logger.info("Using node %s.", nPath)
+
+        state = getPowerState(args, nPath)
+        if state not in ("On", "Off"):
+            my_logger.error("FAIL: Could not query power state of target node %s.", nPath)
+            return results
+        results['start'] = results['end'] = state
+        my_logger.info("Starting with node in the %s state.", state)
+
+        if state == "On":
+            step = run("Off")
+            if step['result'] == "timeout":
+                step = run("ForceOff")
+            if step['state'] is None or stop.wait(args.off_dwell):
+                return results
+            run("On")
+        else:
+            step = run("On")
+            if step['state'] is None or stop.wait(args.on_dwell):
+                return results
+            run("ForceOff")
+
+        ran = [results[step] for step in STEPS if results[step] is not None]
+        if all(r['result'] in ("ok", "timeout") for r in ran) and \
+                ran[-1]['result'] == "ok":
+            results['result'] = "PASS"
+
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        my_logger.error("FAIL: Unexpected Redfish response: %r", e)
+
+    finally:
+        if stop.is_set() and results['result'] != "PASS":
+            results['result'] = "stopped"
+
+        try:
+            if subscribed and eventDelete(args, scheme) != 0:
+                my_logger.error("Failed to delete Redfish event notification subscription.")
+                results['result'] = "FAIL"
+        except Exception as e: # pylint: disable=broad-except
+            my_logger.error("Failed to delete Redfish event notification subscription: %r", e)
+            results['result'] = "FAIL"
+
+        listener.unregister(bmc)
+        bmc_prefix.local.bmc = None
+
+    return results
+
+
+def reportResults(bmcs, results):
+    """
+    Format the results of the BMCs as a table of the seconds from each power
+    command to the first event and to the target state, and the median and
+    maximum of those per power change.
 
-    if rsp:
-        return "https"
+    Parameters:
+        bmcs (list): BMC names or IPs, in the order to report them.
+        results (object): The testPowerControl() results of each BMC.
+
+    Returns:
+        lines (list): Header, a line per BMC, and a line per power change.
+    """
+    def cell(r):
+        if r is None:
+            return "-"
+        if r['result'] not in ("ok", "no-event"):
+            return r['result']
+        return "%s/%.2f" % ("-" if r['event'] is None else "%.2f" % r['event'],
+                            r['state'])
+
+    lines = ["%-24s %-10s %-5s %-5s " % ("BMC", "Node", "Start", "End") +
+             " ".join("%-14s" % (step + " ev/st") for step in STEPS) + " Result"]
+    for bmc in bmcs:
+        r = results[bmc]
+        lines.append("%-24s %-10s %-5s %-5s " % (bmc, r['node'], r['start'], r['end']) +
+                     " ".join("%-14s" % cell(r[step]) for step in STEPS) +
+                     " " + r['result'])
+
+    for step in STEPS:
+        for kind in ("event", "state"):
+            values = sorted(results[bmc][step][kind] for bmc in bmcs
+                            if results[bmc][step] is not None and
+                            results[bmc][step][kind] is not None)
+            if values:
+                lines.append("%s to %s: %d nodes, median %.2fs, max %.2fs." % (
+                    step, kind, len(values), values[len(values) // 2], values[-1]))
+    return lines
 
-    return "http"
 
 def main(argslist=None):
     """Main program"""
-    parser = argparse.ArgumentParser(description='Echo server.')
+    parser = argparse.ArgumentParser(description='Power Control Testing.')
     parser.add_argument('-i', '--ip', help='IP address to listen on.')
-    parser.add_argument('-r', '--port', help='Port to listen on.')
-    parser.add_argument('-b', '--bmc', help='BMC name or IP.')
+    parser.add_argument('-r', '--port', type=int,
+            help='Port to listen on, https uses the next one if both are needed.')
+    parser.add_argument('-b', '--bmc', help='BMC names or IPs, hostlist style: x3000c0s[1-8]b0.')
+    parser.add_argument('-P', '--parallel', type=int, default=32,
+            help='Number of BMCs to test at the same time (default 32).')
+    parser.add_argument('--stagger', type=float, default=1.0,
+            help='Seconds between power commands to different nodes (default 1).')
+    parser.add_argument('--group', type=int, default=1,
+            help='Number of power commands sent together every --stagger seconds (default 1).')
+    parser.add_argument('--power-timeout', type=float, default=300,
+            help='Seconds a node has to reach a power state (default 300).')
+    parser.add_argument('--poll-interval', type=float, default=10,
+            help='Most seconds between power state queries, they start %gs apart '
+            'and back off (default 10).' % POLL_FIRST)
+    parser.add_argument('--off-dwell', type=float, default=0,
+            help='Seconds a node stays Off before it is turned On (default 0).')
+    parser.add_argument('--on-dwell', type=float, default=0,
+            help='Seconds a node stays On before it is forced Off (default 0).')
+    parser.add_argument('--cert', default='cert/tls.crt',
+            help='TLS certificate of the https event server (default cert/tls.crt).')
+    parser.add_argument('--key', default='cert/tls.key',
+            help='TLS private key of the https event server (default cert/tls.key).')
     parser.add_argument('-u', '--user', help='Redfish user name.')
     parser.add_argument('-p', '--passwd', help='Redfish password.')
     parser.add_argument('-v', '--verbose', action='store_true',
@@ -486,6 +838,8 @@ def main(argslist=None):
             help='Print the script version information and exit.')
     parser.add_argument('-l', '--logdir', default='./logs',
             help='Directory for log files')
+    add_profile_arguments(parser)
+    add_session_arguments(parser)
     args = parser.parse_args(argslist)
 
     # set logging file
@@ -508,136 +862,89 @@ def main(argslist=None):
         my_logger.info("%s: %s", __file__, VERSION)
         return 0
 
-    scheme = determineScheme(args)
+    start_profile(args, my_logger)
+    configure_session(args)
 
-    rsp = eventSubscribe(args, scheme)
-    if rsp != 0:
-        my_logger.error("FAIL: Could not subscribe to Redfish event notifications.")
+    try:
+        bmcs = expand(args.bmc).split(",") if args.bmc else []
+    except ValueError as e:
+        my_logger.error("Invalid BMC list %s: %s", args.bmc, e)
         return 1
-
-    startRedfishEventServer(args, scheme)
-
-    nPath = getFirstNodePath(args)
-    if nPath is None:
-        my_logger.error("FAIL: No node found, cannot perform power actions.")
+    if not bmcs:
+        my_logger.error("No BMC given.")
         return 1
 
-    my_logger.info("Using node %s.", nPath)
-
-    state = getPowerState(args, nPath)
-    ret = 0
-    if state is None:
-        my_logger.error("FAIL: Could not query power state of target node %s.", nPath)
-        ret = 1
-
-    failures = 0
-    if state == "On" and ret == 0:
-        my_logger.info("Starting with node in the On state.")
-        turnNodeOff(args, nPath)
-        notOff = True
-        if event.wait(timeout=300):
-            state = waitForState(args, nPath, "Off")
-            if state == "Off":
-                my_logger.info("PASS: Node properly turned Off.")
-                notOff = False
-            else:
-                failures += 1
-                my_logger.error("FAIL: Node sent Redfish event but is not Off.")
-        if notOff:
-            my_logger.info("INFO: Node failed to turn Off in the alloted time,"
-                " attempting force Off.")
-            forceNodeOff(args, nPath)
-            if event.wait(timeout=60):
-                state = waitForState(args, nPath, "Off")
-                if state == "Off":
-                    my_logger.info("PASS: Node was forced Off.")
-                else:
-                    failures += 1
-                    ret = 1
-                    my_logger.error("FAIL: Node sent Redfish event but is not Off.")
-            else:
-                failures += 1
-                state = getPowerState(args, nPath)
-                if state == "Off":
-                    my_logger.error("FAIL: Node turned Off but did not send a Redfish event.")
-                else:
-                    my_logger.error("FAIL: Node failed to be forced Off in the alloted time.")
-                    ret = 1
-
-        if ret == 0:
-            time.sleep(15)
-            turnNodeOn(args, nPath)
-            if event.wait(timeout=60):
-                state = waitForState(args, nPath, "On")
-                if state == "On":
-                    my_logger.info("PASS: Node properly turned On.")
-                else:
-                    failures += 1
-                    ret = 1
-                    my_logger.error("FAIL: Node sent Redfish event but is not On.")
-            else:
-                failures += 1
-                ret = 1
-                state = getPowerState(args, nPath)
-                if state == "On":
-                    my_logger.error("FAIL: Node turned On but did not send a Redfish event.")
-                else:
-                    my_logger.error("FAIL: Node failed to turn On in the alloted time.")
-
-    if state == "Off" and ret == 0:
-        my_logger.info("Starting with node in the Off state.")
-        turnNodeOn(args, nPath)
-        if event.wait(timeout=60):
-            state = waitForState(args, nPath, "On")
-            if state == "On":
-                my_logger.info("PASS: Node properly turned On.")
-            else:
-                failures += 1
-                ret = 1
-                my_logger.error("FAIL: Node sent Redfish event but is not On.")
-        else:
-            failures += 1
-            state = getPowerState(args, nPath)
-            if state == "On":
-                my_logger.error("FAIL: Node turned On but did not send a Redfish event.")
-            else:
-                my_logger.error("FAIL: Node failed to turn On in the alloted time.")
-                ret = 1
-
-        if ret == 0:
-            time.sleep(30)
-            my_logger.info("INFO: Attempting force Off.")
-            forceNodeOff(args, nPath)
-            if event.wait(timeout=60):
-                state = waitForState(args, nPath, "Off")
-                if state == "Off":
-                    my_logger.info("PASS: Node was forced Off.")
-                else:
-                    failures += 1
-                    ret = 1
-                    my_logger.error("FAIL: Node sent Redfish event but is not Off.")
-            else:
-                failures += 1
-                ret = 1
-                state = getPowerState(args, nPath)
-                if state == "Off":
-                    my_logger.error("FAIL: Node turned Off but did not send a Redfish event.")
-                else:
-                    my_logger.error("FAIL: Node failed to be forced Off in the alloted time.")
-
-    rsp = eventDelete(args)
-    if rsp != 0:
-        my_logger.error("Failed to delete Redfish event notification subscription.")
-        ret = 1
-
-    if ret == 0:
+    # Let the BMCs being tested delete their subscriptions before exiting
+    stop = threading.Event()
+    def interrupt(signum, frame): # pylint: disable=unused-argument
+        if not stop.is_set():
+            my_logger.warning("Interrupted, no more power commands are sent.")
+        stop.set()
+    signal.signal(signal.SIGINT, interrupt)
+    signal.signal(signal.SIGTERM, interrupt)
+
+    fleet = len(bmcs) > 1
+    if fleet:
+        my_logger.addFilter(bmc_prefix)
+
+    def schemeOf(bmc):
+        bmcArgs = copy.copy(args)
+        bmcArgs.bmc = bmc
+        if fleet:
+            bmc_prefix.local.bmc = bmc
+        scheme = determineScheme(bmcArgs)
+        bmc_prefix.local.bmc = None
+        return scheme
+
+    pacer = CommandPacer(args.stagger, args.group)
+    with ThreadPoolExecutor(max_workers=max(1, min(args.parallel, len(bmcs)))) as pool:
+        schemes = dict(zip(bmcs, pool.map(schemeOf, bmcs)))
+
+        ports = {scheme: args.port + i
+                 for i, scheme in enumerate(sorted(set(schemes.values())))}
+        listeners = {}
+        try:
+            for scheme, port in ports.items():
+                listeners[scheme] = startRedfishEventServer(args, scheme, port)
+        except (OSError, ssl.SSLError) as e:
+            my_logger.error("FAIL: Could not start the Redfish event server: %s", e)
+            return 1
+
+        results = dict(zip(bmcs, pool.map(
+            lambda bmc: testPowerControl(args, bmc, schemes[bmc],
+                                         ports[schemes[bmc]], listeners[schemes[bmc]],
+                                         pacer, stop, fleet), bmcs)))
+
+    unknown = sum(listener.unknown for listener in listeners.values())
+    for scheme, listener in listeners.items():
+        my_logger.debug("%s event listener: %s", scheme, listener.stats())
+    stop_listeners()
+
+    failed = [bmc for bmc in bmcs if results[bmc]['result'] != "PASS"]
+    changed = [bmc for bmc in bmcs if results[bmc]['end'] != results[bmc]['start']]
+    if changed:
+        my_logger.warning("The power state of the node was not restored on %s.",
+                          compress(changed))
+    if fleet:
+        for line in reportResults(bmcs, results):
+            my_logger.info("%s", line)
+        if unknown:
+            my_logger.warning("%d Redfish events were for no known BMC.", unknown)
+        if failed:
+            my_logger.error("FAIL: Power control failed on %s.", compress(failed))
+        if len(failed) < len(bmcs):
+            my_logger.info("PASS: Power control succeeded on %d of %d BMCs.",
+                           len(bmcs) - len(failed), len(bmcs))
+    elif not failed:
         my_logger.info("SUCCESS: All tests passed.")
-    elif failures > 0:
+    else:
+        failures = max(1, sum(1 for r in map(results[bmcs[0]].get, STEPS)
+                              if r is not None and r['result'] not in ("ok", "timeout")))
         my_logger.error("FAILED: There %s %d test failure%s.",
                 ("was" if failures == 1 else "were"), failures,
                     ("s" if failures > 1 else ""))
 
-    return ret
+    return 1 if failed or stop.is_set() else 0
 
 
 if __name__ == "__main__":
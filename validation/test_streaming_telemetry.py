@@ -29,19 +29,16 @@ On Olympus class hardware, the controllers are capable of sending telemetry
 information to a requested destination. This test will attempt to setup
 streaming telemetry and wait for streaming telemetry to be received.
 
-Classes:
-    handleRequest
+Any number of BMCs can be tested at once, given as a hostlist. They are
+subscribed concurrently, each with its own destination path, and their
+telemetry is received by one TelemetryReceiver, which reports the first
+arrival latency, message rate, and gaps of every BMC.
 
 Functions:
-    eventDelete(object) -> int
-    eventSubscribe(object) -> int
+    eventDelete(object, string) -> int
+    eventSubscribe(object, string, object) -> int
     main() -> int
     makeRedfishCall(object, string, string, object) -> string
-    startRedfishEventServer(object)
-
-Misc Variables:
-    event
-    httpThread
 """
 
 # pylint: disable=line-too-long
@@ -63,13 +60,23 @@ import os
 import sys
 import argparse
 import logging
-import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import time
+from concurrent.futures import ThreadPoolExecutor
 import json
 import requests
 import urllib3
 
-VERSION="1.1.0"
+from redfish_session import add_session_arguments, configure_session, get_session
+from redfish_session import expand_query
+from request_profile import add_profile_arguments, start_profile
+from telemetry_receiver import TelemetryReceiver, destination_path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "hwval"))
+from utils.bmc_profile import disable_expand, is_expanded # pylint: disable=wrong-import-position
+from utils.hostlist import compress, expand # pylint: disable=wrong-import-position
+
+VERSION="1.5.1"
 
 my_logger = logging.getLogger()
 my_logger.setLevel(logging.DEBUG)
@@ -85,15 +92,6 @@ VERBOSE2 = logging.INFO - 2
 logging.addLevelName(VERBOSE1, "VERBOSE1")
 logging.addLevelName(VERBOSE2, "VERBOSE2")
 
-event = threading.Event()
-
-class handleRequest(BaseHTTPRequestHandler):
-    """Simple HTTP server to receive streaming telemetry."""
-    def do_POST(self):
-        """Handler for POSTs from Redfish endpoint."""
-        global event
-        event.set()
-
 def makeRedfishCall(args, action, targPath, reqData=None):
     """
     Hub to communicating with a Redfish endpoint. Returns a json payload of a
@@ -122,17 +120,20 @@ def makeRedfishCall(args, action, targPath, reqData=None):
             'Content-Type': 'application/json',
     }
 
-    if action == "GET":
-        r = requests.get(url = targPath, auth = auth, headers = headers,
-                verify = False, timeout = 30)
-    elif action == "POST":
-        r = requests.post(url = targPath, auth = auth, headers = headers,
-                data = reqData, verify = False, timeout = 30)
-    elif action == "DELETE":
-        r = requests.delete(url = targPath, auth = auth, verify = False,
-                timeout = 30)
-    else:
-        return None, "Redfish Operation", "Bad Request"
+    try:
+        if action == "GET":
+            r = get_session().get(url = targPath, auth = auth, headers = headers,
+                    verify = False)
+        elif action == "POST":
+            r = get_session().post(url = targPath, auth = auth, headers = headers,
+                    data = reqData, verify = False)
+        elif action == "DELETE":
+            r = get_session().delete(url = targPath, auth = auth, verify = False)
+        else:
+            return None, "Redfish Operation", "Bad Request"
+    except requests.RequestException as e:
+        my_logger.warning("Redfish %s for %s failed: %s", action, targPath, e)
+        return None
 
     json_body = r.text
 
@@ -146,97 +147,89 @@ def makeRedfishCall(args, action, targPath, reqData=None):
     return json_body
 
 
-def startRedfishEventServer(args):
-    """
-    Start an HTTP server to receive streaming telemetry.
-
-    Parameters:
-        args (object): Command line arguments.
-    """
-    my_logger.info("Starting Redfish event server.")
-    httpd = HTTPServer(('', int(args.port)), handleRequest)
-
-    def serve_forever(httpd):
-        with httpd:
-            httpd.serve_forever()
-
-    httpThread = threading.Thread(target=serve_forever, args=(httpd,))
-    httpThread.daemon = True
-    httpThread.start()
-
-
-def eventSubscribe(args):
+def eventSubscribe(args, bmc, receiver):
     """
     Sends a subscribe request to the Redfish endpoint.
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
+        receiver (object): TelemetryReceiver the BMC streams to.
 
     Returns:
         success/failure (int): 0 for success, 1 for failure
     """
-    my_logger.info("Subscribing to CrayTelemetry event")
+    my_logger.log(VERBOSE1, "Subscribing %s to CrayTelemetry event", bmc)
     registryPrefixes = ["CrayTelemetry"]
     eventTypes = ["StatusChange"]
-    destination = f"http://{args.ip}:{args.port}"
+    destination = f"http://{args.ip}:{args.port}{destination_path(bmc)}"
 
     sub = {
-        'Context': f"TelemetryTest-{args.bmc}-TelemetryTest",
+        'Context': f"TelemetryTest-{bmc}-TelemetryTest",
         'Destination': destination,
         'Protocol': 'Redfish',
         'RegistryPrefixes': registryPrefixes,
         'EventTypes': eventTypes,
     }
 
-    path = f"https://{args.bmc}/redfish/v1/EventService/Subscriptions"
+    path = f"https://{bmc}/redfish/v1/EventService/Subscriptions"
 
+    receiver.subscribed(bmc)
     rsp = makeRedfishCall(args, "POST", path, json.dumps(sub))
 
     if not rsp:
-        my_logger.error("Redfish call to create subscription failed.")
+        my_logger.error("Redfish call to create subscription on %s failed.", bmc)
+        receiver.ignore(bmc)
         return 1
 
     return 0
 
 
-def eventDelete(args):
+def eventDelete(args, bmc):
     """
     Finds and deletes the subscription that this test created.
 
     Parameters:
         args (object): Command line arguments.
+        bmc (string): BMC name or IP.
 
     Returns:
         success/failure (int): 0 for success, 1 for failure
     """
-    my_logger.info("Deleting subscriptions created by this test.")
-    path = f"https://{args.bmc}/redfish/v1/EventService/Subscriptions"
-
-    rsp = makeRedfishCall(args, "GET", path)
+    my_logger.log(VERBOSE1, "Deleting subscriptions created by this test on %s.", bmc)
+    path = f"https://{bmc}/redfish/v1/EventService/Subscriptions"
+
+    query = expand_query(bmc, requests.auth.HTTPBasicAuth(args.user, args.passwd),
+                         ["Context", "Destination"])
+    rsp = makeRedfishCall(args, "GET", path + query) if query else None
+    if query and not rsp:
+        disable_expand(bmc)
+    if not rsp:
+        rsp = makeRedfishCall(args, "GET", path)
 
     if not rsp:
-        my_logger.error("Redfish call to list subscriptions failed.")
+        my_logger.error("Redfish call to list subscriptions on %s failed.", bmc)
         return 1
 
     subCollection = json.loads(rsp)
 
-    count = 0
     for subEntry in subCollection['Members']:
         entry = subEntry['@odata.id']
-        path = f"https://{args.bmc}{entry}"
-
-        rsp = makeRedfishCall(args, "GET", path)
+        path = f"https://{bmc}{entry}"
 
-        if not rsp:
-            my_logger.error("Redfish call to get subscription entry %s failed.", entry)
-            return 1
+        if is_expanded(subEntry):
+            sub = subEntry
+        else:
+            rsp = makeRedfishCall(args, "GET", path)
 
-        sub = json.loads(rsp)
+            if not rsp:
+                my_logger.error("Redfish call to get subscription entry %s failed.", entry)
+                return 1
 
-        if (sub['Context'] == "TelemetryTest-{args.bmc}-TelemetryTest" and
-                sub['Destination'] == f"http://{args.ip}:{args.port}"):
-            count += 1
+            sub = json.loads(rsp)
 
+        if (sub.get('Context') == f"TelemetryTest-{bmc}-TelemetryTest" and
+                sub.get('Destination') == f"http://{args.ip}:{args.port}{destination_path(bmc)}"):
             rsp = makeRedfishCall(args, "DELETE", path)
 
             if not rsp:
@@ -251,15 +244,26 @@ def main(argslist=None):
     parser = argparse.ArgumentParser(description='Streaming telemetry test')
     parser.add_argument('-i', '--ip', help='IP address to listen on')
     parser.add_argument('-r', '--port', help='Port to listen on')
-    parser.add_argument('-b', '--bmc', help='BMC name or IP')
+    parser.add_argument('-b', '--bmc', help='BMC names or IPs, hostlist style: x3000c0s[1-8]b0')
     parser.add_argument('-u', '--user', help='Redfish user name')
     parser.add_argument('-p', '--passwd', help='Redfish password')
+    parser.add_argument('-w', '--wait', type=float, default=30,
+            help='Seconds to wait for the first telemetry of every BMC (default 30)')
+    parser.add_argument('-d', '--duration', type=float, default=0,
+            help='Keep receiving for at least this many seconds to measure '
+            'the message rate and gaps (default 0, stop once every BMC sent)')
+    parser.add_argument('--max-gap', type=float, default=10,
+            help='Report gaps between messages longer than this many seconds (default 10)')
+    parser.add_argument('-P', '--parallel', type=int, default=32,
+            help='Number of BMCs to subscribe or unsubscribe at the same time (default 32)')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Verbosity of tool in stdout')
     parser.add_argument('-V', '--version', action="store_true",
             help='Print the script version information and exit')
     parser.add_argument('-l', '--logdir', default='./logs',
             help='Directory for log files')
+    add_profile_arguments(parser)
+    add_session_arguments(parser)
     args = parser.parse_args(argslist)
 
     # set logging file
@@ -280,23 +284,66 @@ def main(argslist=None):
         my_logger.info("%s: %s", __file__, VERSION)
         return 0
 
-    rsp = eventSubscribe(args)
-    if rsp != 0:
-        my_logger.error("Failed to subscribe to streaming telemetry events.")
+    start_profile(args, my_logger)
+    configure_session(args)
+
+    try:
+        bmcs = expand(args.bmc).split(",") if args.bmc else []
+    except ValueError as e:
+        my_logger.error("Invalid BMC list %s: %s", args.bmc, e)
         return 1
+    if not bmcs:
+        my_logger.error("No BMC given.")
+        return 1
+
+    my_logger.info("Starting Redfish event server.")
+    try:
+        receiver = TelemetryReceiver(('', int(args.port)), bmcs, args.max_gap)
+    except (OSError, TypeError, ValueError) as e:
+        my_logger.error("Could not listen on port %s: %s", args.port, e)
+        return 1
+    receiver.start()
 
-    startRedfishEventServer(args)
+    my_logger.info("Subscribing %d BMCs to CrayTelemetry events.", len(bmcs))
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        results = dict(zip(bmcs, pool.map(lambda bmc: eventSubscribe(args, bmc, receiver), bmcs)))
+    subscribed = [bmc for bmc in bmcs if results[bmc] == 0]
+    if not subscribed:
+        my_logger.error("Failed to subscribe to streaming telemetry events.")
+        receiver.shutdown()
+        return 1
 
-    ret = 1
+    ret = 0
     my_logger.info("Waiting for streaming telemetry.")
-    if event.wait(timeout=30):
-        my_logger.info("PASS: Telemetry streaming is successful.")
-        ret = 0
-    else:
-        my_logger.error("FAIL: Did not receive streaming telemetry in the alloted time.")
-
-    rsp = eventDelete(args)
-    if rsp != 0:
+    start = time.monotonic()
+    receiver.wait(args.wait)
+    remaining = start + args.duration - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+    for line in receiver.report():
+        my_logger.info("%s", line)
+
+    silent = [bmc for bmc in subscribed if receiver.bmcs[bmc].messages == 0]
+    if len(subscribed) < len(bmcs):
+        my_logger.error("FAIL: Could not subscribe %s.",
+                        compress(bmc for bmc in bmcs if results[bmc] != 0))
+        ret = 1
+    if silent:
+        my_logger.error("FAIL: Did not receive streaming telemetry from %s in the alloted time.",
+                        compress(silent))
+        ret = 1
+    if len(silent) < len(subscribed):
+        my_logger.info("PASS: Telemetry streaming is successful on %d of %d BMCs.",
+                       len(subscribed) - len(silent), len(bmcs))
+    gappy = [bmc for bmc in subscribed if receiver.bmcs[bmc].long_gaps]
+    if gappy:
+        my_logger.warning("Gaps longer than %g seconds from %s.", args.max_gap, compress(gappy))
+
+    with ThreadPoolExecutor(max_workers=max(1, args.parallel)) as pool:
+        deleted = list(pool.map(lambda bmc: eventDelete(args, bmc), subscribed))
+    receiver.shutdown()
+    if any(deleted):
         my_logger.error("Failed to delete streaming telemetry subscription.")
         ret = 1
 